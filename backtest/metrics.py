@@ -0,0 +1,172 @@
+"""Lightweight, batched portfolio metrics computed directly with NumPy.
+
+`pf.stats()` evaluates dozens of metrics (plus per-call overhead) even when a
+caller needs four numbers. The functions here compute only the requested
+metrics from the equity curve and trade PnL, for every column at once,
+and use vectorbt's conventions (returns per bar, `year_freq` of 365 days,
+sample std) so the values agree with the corresponding `pf.*` accessors.
+"""
+from __future__ import annotations
+
+
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+METRICS = ("total_return", "cagr", "max_drawdown", "win_rate", "sharpe_ratio")
+YEAR = pd.Timedelta("365 days")
+
+
+class Metrics(NamedTuple):
+    """Per-column metric arrays; metrics that were not requested are None."""
+
+    columns: pd.Index
+    total_return: Optional[np.ndarray] = None
+    cagr: Optional[np.ndarray] = None
+    max_drawdown: Optional[np.ndarray] = None
+    win_rate: Optional[np.ndarray] = None
+    sharpe_ratio: Optional[np.ndarray] = None
+
+    def to_frame(self) -> pd.DataFrame:
+        """Requested metrics as a (columns x metrics) float frame."""
+        data = {m: getattr(self, m) for m in METRICS if getattr(self, m) is not None}
+        return pd.DataFrame(data, index=self.columns)
+
+
+def ann_factor(freq) -> float:
+    """Bars per year for a bar frequency such as "H" or "1d"."""
+    return YEAR / pd.Timedelta(pd.tseries.frequencies.to_offset(freq))
+
+
+def compute_metrics(
+    value: np.ndarray,
+    init_cash,
+    freq,
+    metrics: Sequence[str] = METRICS,
+    trade_pnl: Optional[np.ndarray] = None,
+    trade_col: Optional[np.ndarray] = None,
+    columns: Optional[pd.Index] = None,
+) -> Metrics:
+    """Compute `metrics` for every column of an equity curve.
+
+
+    Parameters
+    ----------
+    value : np.ndarray
+    Portfolio value, shape (bars,) or (bars, columns).
+    init_cash : float or np.ndarray
+    Starting value per column (first-bar return is relative to it).
+    freq : str or pd.Timedelta
+    Bar frequency used to annualize CAGR and Sharpe.
+    metrics : Sequence[str]
+    Subset of METRICS to compute.
+    trade_pnl, trade_col : np.ndarray, optional
+    PnL and column index per trade (needed for `win_rate`).
+    columns : pd.Index, optional
+    Column labels for the result.
+
+
+    Returns
+    -------
+    Metrics
+    """
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unknown metrics {sorted(unknown)}; choose from {METRICS}")
+    v = np.asarray(value, dtype=np.float64)
+    if v.ndim == 1:
+        v = v[:, None]
+    n_bars, n_cols = v.shape
+    start = np.broadcast_to(np.asarray(init_cash, dtype=np.float64), (n_cols,))
+    out = {}
+
+    if "total_return" in metrics or "cagr" in metrics:
+        total = v[-1] / start - 1.0
+        if "total_return" in metrics:
+            out["total_return"] = total
+        if "cagr" in metrics:
+            with np.errstate(invalid="ignore"):
+                out["cagr"] = (1.0 + total) ** (ann_factor(freq) / n_bars) - 1.0
+
+    if "max_drawdown" in metrics:
+        peak = np.maximum.accumulate(np.vstack([start, v]), axis=0)[1:]
+        out["max_drawdown"] = (v / peak - 1.0).min(axis=0)
+
+    if "sharpe_ratio" in metrics:
+        prev = np.vstack([start, v[:-1]])
+        rets = v / prev - 1.0
+        mean = rets.mean(axis=0)
+        std = rets.std(axis=0, ddof=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["sharpe_ratio"] = np.where(std > 0, mean / std * np.sqrt(ann_factor(freq)), np.inf * np.sign(mean))
+
+    if "win_rate" in metrics:
+        if trade_pnl is None or trade_col is None:
+            raise ValueError("win_rate needs trade_pnl and trade_col")
+        trade_col = np.asarray(trade_col, dtype=np.int64)
+        n_trades = np.bincount(trade_col, minlength=n_cols)
+        n_wins = np.bincount(trade_col[np.asarray(trade_pnl) > 0], minlength=n_cols)
+        with np.errstate(invalid="ignore"):
+            out["win_rate"] = np.where(n_trades > 0, n_wins / np.maximum(n_trades, 1), np.nan)
+
+    if columns is None:
+        columns = pd.RangeIndex(n_cols)
+    return Metrics(columns=columns, **out)
+
+
+def portfolio_value(pf) -> np.ndarray:
+    """Equity curve (bars x columns/groups) rebuilt from order records.
+
+    Same values as `pf.value()`, but computed as cumulative cash and position
+    flows times forward-filled close in a few array passes, which is several
+    times cheaper on wide portfolios.
+    """
+    close = np.asarray(pf.close, dtype=np.float64)
+    if close.ndim == 1:
+        close = close[:, None]
+    close = pd.DataFrame(close).ffill().to_numpy()
+    recs = pf.order_records
+    signed = np.where(recs["side"] == 0, recs["size"], -recs["size"])
+
+    # per-(bar, column) flows; bincount on the flat index is much faster than np.add.at
+    flat = recs["idx"] * close.shape[1] + recs["col"]
+    size = close.size
+    # astype: bincount returns int64 when there are no orders at all
+    cash = np.bincount(flat, -signed * recs["price"] - recs["fees"], minlength=size).astype(np.float64).reshape(close.shape)
+    shares = np.bincount(flat, signed, minlength=size).astype(np.float64).reshape(close.shape)
+    np.cumsum(cash, axis=0, out=cash)
+    np.cumsum(shares, axis=0, out=shares)
+    # flat columns contribute nothing even where close is still NaN
+    cash += np.where(shares != 0.0, shares * close, 0.0)
+
+    if pf.wrapper.grouper.is_grouped():
+        group_lens = pf.wrapper.grouper.get_group_lens()
+        starts = np.concatenate([[0], np.cumsum(group_lens)[:-1]])
+        cash = np.add.reduceat(cash, starts, axis=1)
+    init_cash = pf.init_cash
+    return cash + np.asarray(init_cash, dtype=np.float64)
+
+
+def portfolio_metrics(pf, metrics: Sequence[str] = METRICS) -> Metrics:
+    """`compute_metrics` for a vectorbt Portfolio (per column, or per group)."""
+    trade_pnl = trade_col = None
+    if "win_rate" in metrics:
+        # all trades, open ones marked to the last close (as vectorbt's win_rate)
+        recs = pf.trades.values
+        trade_pnl = recs["pnl"]
+        trade_col = recs["col"]
+        if pf.wrapper.grouper.is_grouped():
+            trade_col = np.asarray(pf.wrapper.grouper.get_groups())[trade_col]
+    columns = pf.wrapper.get_columns()
+    init_cash = pf.init_cash
+    return compute_metrics(
+        portfolio_value(pf),
+        init_cash.to_numpy() if isinstance(init_cash, pd.Series) else init_cash,
+        pf.wrapper.freq,
+        metrics=metrics,
+        trade_pnl=trade_pnl,
+        trade_col=trade_col,
+        columns=columns,
+    )
@@ -2,17 +2,102 @@
 from __future__ import annotations
 
 
-from typing import Tuple, Optional
+from typing import TYPE_CHECKING, Sequence, Tuple, Optional, Union
 import numpy as np
 import pandas as pd
 import vectorbt as vbt
 
+from backtest.metrics import portfolio_metrics
+from profiling import stage
+
+if TYPE_CHECKING:
+    from backtest.costs import HKEXCostModel
+
+
+def simulate_with_costs(
+    close: Union[pd.Series, pd.DataFrame],
+    entries: Union[pd.Series, pd.DataFrame],
+    exits: Union[pd.Series, pd.DataFrame],
+    costs: "HKEXCostModel",
+    volume: Union[pd.Series, pd.DataFrame, None] = None,
+    lot_size: Union[int, pd.Series, np.ndarray] = 1,
+    cash: float = 100_000.0,
+    freq: str = "H",
+    max_position: float = 1.0,
+    cash_sharing: bool = False,
+) -> vbt.portfolio.base.Portfolio:
+    """Long-only signal backtest with HKEX costs, slippage and board lots.
+
+
+    Parameters
+    ----------
+    close, entries, exits : pd.Series or pd.DataFrame
+    Same layout as for `from_signals`; wide frames give one column per symbol.
+    costs : HKEXCostModel
+    Fee schedule and slippage parameters, applied per order in the kernel.
+    volume : pd.Series or pd.DataFrame, optional
+    Bar volume for the participation-based slippage; None charges
+    `slippage_max` on every order.
+    lot_size : int, pd.Series or np.ndarray
+    Board lot per column (a Series is matched by column label).
+    cash : float
+    Initial cash (per column, or per universe with `cash_sharing`).
+    freq : str
+    Bar frequency string to help annualization in stats.
+    max_position : float
+    Fraction of current (group) value a single entry may spend.
+    cash_sharing : bool
+    Simulate all columns as one portfolio sharing `cash`.
+
+
+    Returns
+    -------
+    vectorbt Portfolio
+    """
+    from backtest.costs import as_2d, lot_array, simulate_signals_nb
+    from vectorbt.portfolio.enums import log_dt
+
+    shape = (len(close), 1 if close.ndim == 1 else close.shape[1])
+    columns = close.columns if isinstance(close, pd.DataFrame) else None
+    entries_arr = as_2d(entries, shape, np.bool_)
+    exits_arr = as_2d(exits, shape, np.bool_)
+    if volume is None:
+        volume = np.full(shape, np.nan)
+    group_lens = np.array([shape[1]] if cash_sharing else [1] * shape[1], dtype=np.int64)
+
+    records = simulate_signals_nb(
+        as_2d(close, shape, np.float64),
+        entries_arr,
+        exits_arr,
+        as_2d(volume, shape, np.float64),
+        lot_array(lot_size, columns, shape[1]),
+        float(max_position),
+        costs.params,
+        np.full(len(group_lens), float(cash)),
+        group_lens,
+        int(entries_arr.sum() + exits_arr.sum()),  # every order needs a signal
+    )
+    wrapper = vbt.base.array_wrapper.ArrayWrapper.from_obj(close, freq=freq, group_by=True if cash_sharing else None)
+    return vbt.Portfolio(
+        wrapper,
+        close,
+        records,
+        np.empty(0, dtype=log_dt),
+        init_cash=float(cash) if cash_sharing or shape[1] == 1 else np.full(shape[1], float(cash)),
+        cash_sharing=cash_sharing,
+    )
+
+
 def run_backtest(
     close: pd.Series,
     entries: pd.Series,
     exits: pd.Series,
     cash: float = 100_000.0,
     freq: str = "H",
+    costs: Optional["HKEXCostModel"] = None,
+    volume: Optional[pd.Series] = None,
+    lot_size: int = 1,
+    metrics: Optional[Sequence[str]] = None,
 ) -> Tuple[vbt.portfolio.base.Portfolio, pd.Series, Optional[float]]:
     """Run a simple long-only backtest using entries/exits.
 
@@ -29,41 +114,247 @@ def run_backtest(
     Initial cash.
     freq : str
     Bar frequency string to help annualization in stats.
+    costs : HKEXCostModel, optional
+    Charge HKEX fees/slippage and trade whole board lots (see
+    `simulate_with_costs`); None keeps the frictionless simulation.
+    volume : pd.Series, optional
+    Bar volume for volume-based slippage (with `costs`).
+    lot_size : int
+    Board lot in shares (with `costs`).
+    metrics : Sequence[str], optional
+    Compute only these `backtest.metrics.METRICS` instead of `pf.stats()`.
 
 
     Returns
     -------
     (pf, stats, win_rate)
     pf : vectorbt Portfolio
-    stats : pd.Series of summary metrics
+    stats : pd.Series of summary metrics (only `metrics` when given)
     win_rate : float in [0,1] or None if no trades
     """
-    pf = vbt.Portfolio.from_signals(
-        close=close,
-        entries=entries,
-        exits=exits,
-        init_cash=cash,
-        fees=0.0,
-        slippage=0.0,
-        freq=freq,
-    )
+    with stage("simulate", rows=len(close)):
+        if costs is not None:
+            pf = simulate_with_costs(
+                close, entries, exits, costs, volume=volume, lot_size=lot_size, cash=cash, freq=freq
+            )
+        else:
+            pf = vbt.Portfolio.from_signals(
+                close=close,
+                entries=entries,
+                exits=exits,
+                init_cash=cash,
+                fees=0.0,
+                slippage=0.0,
+                freq=freq,
+            )
 
 
-    stats = pf.stats()
+    with stage("stats", rows=len(close)):
+        if metrics is None:
+            stats = pf.stats()
+            win_rate = portfolio_metrics(pf, ["win_rate"]).win_rate[0]
+        else:
+            # lightweight path: only the requested metrics, straight from NumPy
+            requested = list(metrics)
+            result = portfolio_metrics(pf, requested if "win_rate" in requested else requested + ["win_rate"])
+            stats = result.to_frame().iloc[0][requested]
+            win_rate = result.win_rate[0]
+    win_rate = None if np.isnan(win_rate) else float(win_rate)
 
 
-    # Defensive win-rate calculation across vectorbt versions
-    win_rate = None
-    try:
-        recs = pf.trades.records
-        if isinstance(recs, (pd.DataFrame,)) and not recs.empty:
-            # columns are version-dependent; "pnl" is common
-            pnl_col = next((c for c in recs.columns if c.lower() == "pnl"), None)
-            if pnl_col is not None:
-                win_rate = float((recs[pnl_col] > 0).mean())
-    except Exception:
-        pass
+    return pf, stats, win_rate
 
 
-    return pf, stats, win_rate
 
+SWEEP_METRICS = ["total_return", "sharpe_ratio", "max_drawdown", "trades", "win_rate"]
+
+
+def run_sweep(
+    close: pd.Series,
+    entries: pd.DataFrame,
+    exits: pd.DataFrame,
+    cash: float = 100_000.0,
+    freq: str = "H",
+    sort_by: str = "sharpe_ratio",
+    costs: Optional["HKEXCostModel"] = None,
+    volume: Optional[pd.Series] = None,
+    lot_size: int = 1,
+    metrics: Optional[Sequence[str]] = None,
+) -> Tuple[vbt.portfolio.base.Portfolio, pd.DataFrame]:
+    """Backtest every parameter column in one broadcast `from_signals` call.
+
+
+    Parameters
+    ----------
+    close : pd.Series
+    Price series shared by all columns (broadcast against entries/exits).
+    entries, exits : pd.DataFrame
+    Boolean frames with one column per parameter combination, e.g. from
+    `signals.adapter.to_entries_exits_grid`.
+    cash : float
+    Initial cash per column.
+    freq : str
+    Bar frequency string to help annualization in stats.
+    sort_by : str
+    Metric (a column of the table) to rank by, descending.
+    costs : HKEXCostModel, optional
+    Charge HKEX fees/slippage and trade whole board lots in every column
+    (one `simulate_with_costs` call); None keeps the frictionless simulation.
+    volume : pd.Series, optional
+    Bar volume for volume-based slippage (with `costs`).
+    lot_size : int
+    Board lot in shares (with `costs`).
+    metrics : Sequence[str], optional
+    `backtest.metrics.METRICS` to report instead of the default
+    SWEEP_METRICS; a `trades` count is always added.
+
+
+    Returns
+    -------
+    (pf, table)
+    pf : vectorbt Portfolio with one column per combination
+    table : pd.DataFrame of the metrics indexed like the columns, ranked
+    """
+    close = close.reindex(entries.index)
+    if costs is not None:
+        wide = pd.DataFrame(
+            np.broadcast_to(close.to_numpy(dtype=np.float64)[:, None], entries.shape),
+            index=entries.index,
+            columns=entries.columns,
+        )
+        pf = simulate_with_costs(
+            wide,
+            entries,
+            exits,
+            costs,
+            volume=None if volume is None else volume.reindex(entries.index),
+            lot_size=lot_size,
+            cash=cash,
+            freq=freq,
+        )
+    else:
+        pf = vbt.Portfolio.from_signals(
+            close=close,
+            entries=entries,
+            exits=exits,
+            init_cash=cash,
+            fees=0.0,
+            slippage=0.0,
+            freq=freq,
+        )
+
+
+    # batched NumPy metrics for all columns (no per-column stats() calls)
+    names = [m for m in SWEEP_METRICS if m != "trades"] if metrics is None else list(metrics)
+    table = portfolio_metrics(pf, names).to_frame()[names]
+    table["trades"] = np.bincount(pf.trades.values["col"], minlength=len(table))
+    table = table[SWEEP_METRICS] if metrics is None else table
+    if sort_by not in table.columns:
+        raise ValueError(f"sort_by must be one of {list(table.columns)}, got {sort_by!r}")
+    table = table.sort_values(sort_by, ascending=False, na_position="last")
+    table.insert(0, "rank", np.arange(1, len(table) + 1))
+    return pf, table
+
+
+def _limit_weights(weights: np.ndarray, max_position: float) -> np.ndarray:
+    """Clip to [0, max_position] per asset and scale rows down to sum <= 1."""
+    w = np.clip(np.nan_to_num(weights, nan=0.0), 0.0, max_position)
+    gross = w.sum(axis=1, keepdims=True)
+    np.divide(w, gross, out=w, where=gross > 1.0)
+    return w
+
+
+def run_universe_backtest(
+    close: pd.DataFrame,
+    entries: Optional[pd.DataFrame] = None,
+    exits: Optional[pd.DataFrame] = None,
+    weights: Optional[pd.DataFrame] = None,
+    cash: float = 100_000.0,
+    freq: str = "H",
+    max_position: float = 0.1,
+    fees: float = 0.0,
+    slippage: float = 0.0,
+) -> Tuple[vbt.portfolio.base.Portfolio, pd.DataFrame, pd.Series]:
+    """Backtest a whole universe as one cash-sharing portfolio.
+
+
+    Parameters
+    ----------
+    close : pd.DataFrame
+    Wide price matrix (time x symbol); NaN where a symbol has no bar.
+    entries, exits : pd.DataFrame, optional
+    Wide boolean signals; each held symbol targets `max_position` of equity
+    (see `signals.adapter.entries_exits_to_weights`) and cash limits fills.
+    weights : pd.DataFrame, optional
+    Wide target weights (fraction of equity) instead of entries/exits;
+    clipped to `max_position` and scaled so gross exposure <= 1.
+    cash : float
+    Initial cash shared by all symbols.
+    freq : str
+    Bar frequency string to help annualization in stats.
+    max_position : float
+    Per-symbol weight cap (fraction of equity at order time).
+    fees, slippage : float
+    Proportional costs per order.
+
+
+    Returns
+    -------
+    (pf, asset_stats, stats)
+    pf : grouped vectorbt Portfolio (one group, shared cash)
+    asset_stats : pd.DataFrame of per-symbol trades / win_rate / pnl / contribution
+    stats : pd.Series of aggregate metrics (SWEEP_METRICS)
+    """
+    if weights is None:
+        if entries is None or exits is None:
+            raise ValueError("Pass either `weights` or both `entries` and `exits`.")
+        from signals.adapter import entries_exits_to_weights
+
+        target = entries_exits_to_weights(entries, exits, position_size=max_position)
+        target = target.reindex(index=close.index, columns=close.columns, fill_value=0.0).to_numpy(dtype=np.float64)
+    else:
+        weights = weights.reindex(index=close.index, columns=close.columns)
+        target = _limit_weights(weights.to_numpy(dtype=np.float64), max_position)
+    # no bar -> no order; keep the target pending until the symbol trades again
+    target[np.isnan(close.to_numpy())] = np.nan
+    # order only when the target changes, instead of re-balancing drift every
+    # bar; this keeps the order/trade records (the bulk of memory) sparse
+    prev = pd.DataFrame(target).ffill().shift(1).to_numpy()
+    size = np.where(target == prev, np.nan, target)
+
+    pf = vbt.Portfolio.from_orders(
+        close=close,
+        size=size,
+        size_type="targetpercent",
+        group_by=True,
+        cash_sharing=True,
+        call_seq="auto",  # sells before buys so freed cash funds new positions
+        init_cash=cash,
+        fees=fees,
+        slippage=slippage,
+        freq=freq,
+    )
+
+
+    trades = pf.get_trades(group_by=False)
+    pnl = trades.pnl.sum()
+    asset_stats = pd.DataFrame(
+        {
+            "trades": trades.count(),
+            "win_rate": trades.win_rate(),
+            "pnl": pnl,
+            "contribution": pnl / cash,
+        }
+    )
+    agg = portfolio_metrics(pf, ["total_return", "sharpe_ratio", "max_drawdown", "win_rate"])
+    stats = pd.Series(
+        {
+            "total_return": agg.total_return[0],
+            "sharpe_ratio": agg.sharpe_ratio[0],
+            "max_drawdown": agg.max_drawdown[0],
+            "trades": int(asset_stats["trades"].sum()),
+            "win_rate": agg.win_rate[0],
+        },
+        name="universe",
+    )
+    return pf, asset_stats, stats
@@ -0,0 +1,71 @@
+"""Memory benchmark of compact mode (float32 / int32 / uint8) vs the float64 path.
+
+Loads every symbol's CSV and builds its feature table, keeping all of them
+in memory as a multi-symbol run would, then fits/predicts one symbol. Each
+(mode, spec) runs in a fresh process; reported are the bytes held by the
+frames, the peak RSS growth over the run and its wall time.
+
+Usage (from project root):
+
+.venv/bin/python -m benchmarks.bench_compact --symbols 50 --bars 100000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from typing import Dict, Optional
+
+from benchmarks.bench_pipeline import symbols_for, write_universe
+from benchmarks.common import current_rss_mb, peak_rss_mb, print_table, reset_peak_rss, run_isolated
+from data.downloader import load_local_ohlcv
+from models.logistic_model import build_features, train_predict
+
+
+def _held_mb(frames: Dict) -> float:
+    return sum(df.memory_usage(deep=True).sum() for df in frames.values()) / 2**20
+
+
+def run_mode(data_dir: str, n_symbols: int, compact: bool, spec: Optional[str]) -> Dict[str, float]:
+    """Load + features for every symbol, then one train_predict (child process)."""
+    syms = symbols_for(n_symbols)
+    # warm-up: imports and numba compilation stay out of the numbers
+    warm = load_local_ohlcv(syms[0], data_dir, compact=compact).iloc[:2000]
+    train_predict(warm, feature_spec=spec, compact=compact)
+
+    base = current_rss_mb()
+    reset_peak_rss()
+    t0 = time.perf_counter()
+    bars = {s: load_local_ohlcv(s, data_dir, compact=compact) for s in syms}
+    feats = {s: build_features(df, spec, compact) for s, df in bars.items()}
+    train_predict(bars[syms[0]], feature_spec=spec, compact=compact)
+    wall = time.perf_counter() - t0
+    return {
+        "bars_mb": _held_mb(bars),
+        "features_mb": _held_mb(feats),
+        "peak_delta_mb": max(peak_rss_mb() - base, 0.0),
+        "wall_s": wall,
+    }
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--symbols", type=int, default=50)
+    p.add_argument("--bars", type=int, default=100_000)
+    p.add_argument("--specs", nargs="+", default=["logistic_minimal", "technical"])
+    args = p.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_universe(data_dir, args.bars, args.symbols)
+        for spec in args.specs:
+            for compact in (False, True):
+                res = run_isolated(run_mode, data_dir, args.symbols, compact, spec)
+                rows.append({"spec": spec, "mode": "compact" if compact else "float64", **res})
+                print(f"  {spec:<17} {rows[-1]['mode']:<8} peak +{res['peak_delta_mb']:.1f}MB", flush=True)
+    print(f"symbols={args.symbols} bars={args.bars}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark the in-kernel HKEX cost model against the frictionless simulation.
+
+Usage (from project root):
+
+.venv/bin/python -m benchmarks.bench_costs --symbols 200 --bars 16000
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+import pandas as pd
+import vectorbt as vbt
+
+from backtest.costs import HKEXCostModel
+from backtest.vectorbt_engine import simulate_with_costs
+from benchmarks.common import best_of, print_table
+
+
+def make_inputs(n_symbols: int, n_bars: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2015-01-02 09:30", periods=n_bars, freq="h", tz="Asia/Hong_Kong")
+    cols = [f"{i:04d}.HK" for i in range(n_symbols)]
+    close = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_bars, n_symbols)), axis=0)), index=idx, columns=cols)
+    volume = pd.DataFrame(rng.integers(10_000, 1_000_000, (n_bars, n_symbols)).astype(float), index=idx, columns=cols)
+    entries = pd.DataFrame(rng.random((n_bars, n_symbols)) > 0.9, index=idx, columns=cols)
+    exits = pd.DataFrame(rng.random((n_bars, n_symbols)) > 0.9, index=idx, columns=cols)
+    return close, volume, entries, exits
+
+
+def frictionless(close, volume, entries, exits) -> None:
+    vbt.Portfolio.from_signals(close, entries, exits, init_cash=100_000.0, freq="h")
+
+
+def zero_cost_kernel(close, volume, entries, exits) -> None:
+    simulate_with_costs(close, entries, exits, HKEXCostModel.zero(), volume=volume, freq="h")
+
+
+def hkex_kernel(close, volume, entries, exits) -> None:
+    simulate_with_costs(close, entries, exits, HKEXCostModel(), volume=volume, lot_size=100, freq="h")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--symbols", type=int, default=200)
+    p.add_argument("--bars", type=int, default=16000)
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    inputs = make_inputs(args.symbols, args.bars)
+    small = tuple(x.iloc[:50, :2] for x in inputs)
+    rows = []
+    base = None
+    for name, fn in [
+        ("from_signals, no costs", frictionless),
+        ("cost kernel, zero model", zero_cost_kernel),
+        ("cost kernel, HKEX model + lots", hkex_kernel),
+    ]:
+        fn(*small)  # compile outside the timing
+        t = best_of(fn, *inputs, repeat=args.repeat)
+        base = base or t
+        rows.append({"engine": name, "wall_s": t, "vs_baseline": t / base})
+    print(f"symbols={args.symbols} bars={args.bars}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
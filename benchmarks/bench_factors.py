@@ -0,0 +1,43 @@
+"""Benchmark the fused numba factor kernel against the equivalent pandas code.
+
+Times `compute_factors` (one compiled pass) and `compute_factors_pandas` (one
+pandas expression per factor) on the `technical` spec, and the full
+`build_features` table for both feature specs.
+
+Usage (from project root):
+
+.venv/bin/python -m benchmarks.bench_factors --bars 1000000
+"""
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.bench_pipeline import make_ohlcv
+from benchmarks.common import best_of, print_table
+from models.factors import compute_factors, compute_factors_pandas
+from models.logistic_model import TECHNICAL_SPEC, build_features
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--bars", type=int, default=1_000_000)
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    df = make_ohlcv(args.bars)
+    factors = TECHNICAL_SPEC["factors"]
+    compute_factors(df.iloc[:1000], factors)  # compile outside the timing
+
+    ref = best_of(compute_factors_pandas, df, factors, repeat=args.repeat)
+    rows = [{"engine": f"pandas ({len(factors)} factors)", "wall_s": ref, "speedup": 1.0}]
+    t = best_of(compute_factors, df, factors, repeat=args.repeat)
+    rows.append({"engine": f"numba kernel ({len(factors)} factors)", "wall_s": t, "speedup": ref / t})
+    for name, spec in [("build_features minimal", None), ("build_features technical", TECHNICAL_SPEC)]:
+        t = best_of(build_features, df, spec, repeat=args.repeat)
+        rows.append({"engine": name, "wall_s": t, "speedup": ref / t})
+    print(f"bars={args.bars}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Benchmark the live signal service: per-stage latency over a replayed universe.
+
+Usage (from project root):
+
+.venv/bin/python -m benchmarks.bench_live_service --symbols 500 --bars 200 --model logistic
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from benchmarks.bench_panel_features import make_universe
+from live.service import ReplaySource, SignalService
+from models.logistic_model import FEATURE_LOOKBACK
+from models.panel_features import build_features_panel
+from models.registry import get_model
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--symbols", type=int, default=500)
+    p.add_argument("--bars", type=int, default=200, help="Bars replayed per symbol")
+    p.add_argument("--model", default="logistic")
+    args = p.parse_args()
+
+    history = 300
+    data = make_universe(args.symbols, history + args.bars)
+    panel = build_features_panel({s: df.iloc[:history] for s, df in data.items()})
+    model = get_model(args.model).fit(panel.drop(columns="y"), panel["y"])
+
+    service = SignalService(model, th=0.55)
+    service.warm_up({s: df.iloc[history - FEATURE_LOOKBACK:history] for s, df in data.items()})
+    n = asyncio.run(service.run(ReplaySource({s: df.iloc[history:] for s, df in data.items()})))
+
+    print(f"symbols={args.symbols} bars={args.bars} model={args.model} signals={n}")
+    print("latency per stage (ms; 'per_bar' = one symbol's share of a tick)")
+    print(service.latency_report().round(4).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark the single-pass local CSV loader against the previous loader.
+
+Also times a warm open of the memory-mapped bar cache (`data.bar_cache`).
+
+Writes a synthetic minute-bar CSV in yfinance's multi-line header format and
+loads it with both implementations, each in a fresh process, reporting wall
+time and peak RSS.
+
+Usage (from project root):
+
+.venv/bin/python -m benchmarks.bench_local_loader --rows 2000000
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import re
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import measure, print_table
+from data.downloader import iter_local_ohlcv, load_local_ohlcv
+
+
+SYMBOL = "BENCH.HK"
+
+
+def write_csv(data_dir: str, rows: int, seed: int = 0) -> str:
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2015-01-02 09:30", periods=rows, freq="min")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 1e-3, rows)))
+    df = pd.DataFrame(
+        {
+            "Close": close.round(4),
+            "High": (close * 1.001).round(4),
+            "Low": (close * 0.999).round(4),
+            "Open": close.round(4),
+            "Volume": rng.integers(1_000, 100_000, rows),
+        },
+        index=idx,
+    )
+    path = os.path.join(data_dir, f"{SYMBOL}_historical_data.csv")
+    with open(path, "w") as fh:
+        fh.write("Price,Close,High,Low,Open,Volume\n")
+        fh.write("Ticker," + ",".join([SYMBOL] * 5) + "\n")
+        fh.write("Date,,,,,\n")
+        df.to_csv(fh, header=False, date_format="%Y-%m-%d %H:%M:%S")
+    return path
+
+
+def legacy_load(data_dir: str) -> pd.DataFrame:
+    """The previous `load_local_ohlcv` (readlines + regex scan + StringIO re-parse)."""
+    path = os.path.join(data_dir, f"{SYMBOL}_historical_data.csv")
+    with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+        lines = fh.readlines()
+    data_start = None
+    date_re = re.compile(r"^\d{4}-\d{2}-\d{2}")
+    for i, line in enumerate(lines):
+        if date_re.match(line.strip()):
+            data_start = i
+            break
+    data_text = "".join(lines[data_start:])
+    df = pd.read_csv(io.StringIO(data_text), header=None)
+    df = df.iloc[:, :6]
+    df.columns = ["date", "Close", "High", "Low", "Open", "Volume"]
+    df = df.set_index("date")
+    df = df[["Open", "High", "Low", "Close", "Volume"]].copy()
+    df.index = pd.to_datetime(df.index)
+    return df
+
+
+def new_load(data_dir: str) -> pd.DataFrame:
+    return load_local_ohlcv(SYMBOL, data_dir=data_dir)
+
+
+def new_load_float32(data_dir: str) -> pd.DataFrame:
+    return load_local_ohlcv(SYMBOL, data_dir=data_dir, price_dtype=np.float32)
+
+
+def bar_cache_warm(data_dir: str) -> float:
+    df = load_local_ohlcv(SYMBOL, data_dir=data_dir, bar_cache_dir=os.path.join(data_dir, "bars"))
+    return float(df["Close"].iloc[-1])
+
+
+def new_stream(data_dir: str) -> int:
+    return sum(len(c) for c in iter_local_ohlcv(SYMBOL, data_dir=data_dir, chunksize=250_000))
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--rows", type=int, default=1_000_000)
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_csv(tmp, args.rows)
+        size_mb = os.path.getsize(path) / 2**20
+        print(f"CSV rows={args.rows:,} size={size_mb:.1f} MiB")
+        # build the memory-mapped cache once so the timed run is a warm open
+        load_local_ohlcv(SYMBOL, data_dir=tmp, bar_cache_dir=os.path.join(tmp, "bars"))
+        rows = []
+        for name, fn in [
+            ("legacy", legacy_load),
+            ("single_pass", new_load),
+            ("single_pass_f32", new_load_float32),
+            ("stream_250k", new_stream),
+            ("bar_cache_warm", bar_cache_warm),
+        ]:
+            rows.append({"loader": name, **measure(fn, tmp)})
+        print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
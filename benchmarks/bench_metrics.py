@@ -0,0 +1,59 @@
+"""Benchmark the NumPy metrics set against `pf.stats()` on a wide portfolio.
+
+Usage (from project root):
+
+.venv/bin/python -m benchmarks.bench_metrics --columns 1000 --bars 2000
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+import pandas as pd
+import vectorbt as vbt
+
+from backtest.metrics import METRICS, portfolio_metrics
+from benchmarks.common import best_of, print_table
+
+
+def make_pf(n_cols: int, n_bars: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2020-01-02 09:30", periods=n_bars, freq="h", tz="Asia/Hong_Kong")
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars))), index=idx)
+    proba = rng.random((n_bars, 1))
+    th = np.linspace(0.3, 0.7, n_cols)
+    entries = pd.DataFrame(proba > th, index=idx)
+    exits = pd.DataFrame(proba <= th, index=idx)
+    return vbt.Portfolio.from_signals(close, entries, exits, init_cash=100_000.0, freq="H")
+
+
+def full_stats(pf) -> None:
+    pf.stats(agg_func=None, silence_warnings=True)
+
+
+def metrics_set(pf) -> None:
+    portfolio_metrics(pf, METRICS)
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--columns", type=int, default=1000)
+    p.add_argument("--bars", type=int, default=2000)
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    rows = []
+    for name, fn in [("pf.stats(agg_func=None)", full_stats), ("portfolio_metrics", metrics_set)]:
+        # fresh portfolio per candidate: vectorbt caches intermediate results
+        t = best_of(lambda: fn(make_pf(args.columns, args.bars)), repeat=args.repeat)
+        rows.append({"path": name, "wall_s": t})
+    build = best_of(make_pf, args.columns, args.bars, repeat=args.repeat)
+    for row in rows:
+        row["wall_s"] -= build  # report the stats cost only
+        row["speedup"] = rows[0]["wall_s"] / row["wall_s"]
+    print(f"columns={args.columns} bars={args.bars} metrics={','.join(METRICS)}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark registry backends: fit / batched predict time and peak memory.
+
+Usage (from project root):
+
+.venv/bin/python -m benchmarks.bench_models --symbols 200 --bars 2000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.bench_panel_features import make_universe
+from benchmarks.common import measure, print_table
+from models.panel_features import build_features_panel
+from models.registry import get_model, predict_panel
+
+
+def fit_predict(name: str, n_symbols: int, n_bars: int, n_threads) -> None:
+    panel = build_features_panel(make_universe(n_symbols, n_bars))
+    model = get_model(name, n_threads=n_threads)
+    t0 = time.perf_counter()
+    model.fit(panel.drop(columns="y"), panel["y"])
+    t1 = time.perf_counter()
+    predict_panel(model, panel)
+    t2 = time.perf_counter()
+    print(f"  {name:<9} rows={len(panel)} fit={t1 - t0:.3f}s predict={t2 - t1:.3f}s", flush=True)
+
+
+def features_only(n_symbols: int, n_bars: int) -> None:
+    build_features_panel(make_universe(n_symbols, n_bars))
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--symbols", type=int, default=200)
+    p.add_argument("--bars", type=int, default=2000)
+    p.add_argument("--threads", type=int, default=None, help="Thread cap (default: all cores)")
+    args = p.parse_args()
+
+    base = measure(features_only, args.symbols, args.bars)
+    rows = [{"backend": "features only", "wall_s": base["wall_s"], "peak_rss_mb": base["peak_rss_mb"], "extra_rss_mb": 0.0}]
+    for name in ["logistic", "hgb"]:
+        res = measure(fit_predict, name, args.symbols, args.bars, args.threads)
+        # fit + predict time and memory on top of building the panel
+        rows.append(
+            {
+                "backend": name,
+                "wall_s": res["wall_s"] - base["wall_s"],
+                "peak_rss_mb": res["peak_rss_mb"],
+                "extra_rss_mb": res["peak_rss_mb"] - base["peak_rss_mb"],
+            }
+        )
+    print(f"symbols={args.symbols} bars={args.bars}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
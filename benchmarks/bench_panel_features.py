@@ -0,0 +1,60 @@
+"""Benchmark the panel feature engine against per-symbol `build_features`.
+
+Usage (from project root):
+
+.venv/bin/python -m benchmarks.bench_panel_features --symbols 500 --bars 2000
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import best_of, print_table
+from models.logistic_model import build_features
+from models.panel_features import build_features_panel
+
+
+def make_universe(n_symbols: int, n_bars: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2020-01-02 09:30", periods=n_bars, freq="h", tz="Asia/Hong_Kong")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_bars, n_symbols)), axis=0))
+    vol = rng.integers(1_000, 100_000, (n_bars, n_symbols)).astype(float)
+    return {
+        f"{i:04d}.HK": pd.DataFrame({"Close": close[:, i], "Volume": vol[:, i]}, index=idx)
+        for i in range(n_symbols)
+    }
+
+
+def per_symbol(data: dict) -> dict:
+    return {sym: build_features(df) for sym, df in data.items()}
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--symbols", type=int, default=500)
+    p.add_argument("--bars", type=int, default=2000)
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    data = make_universe(args.symbols, args.bars)
+    long = pd.concat({s: df for s, df in data.items()}, names=["symbol", "ts"])
+    close = pd.DataFrame({s: df["Close"] for s, df in data.items()})
+    volume = pd.DataFrame({s: df["Volume"] for s, df in data.items()})
+
+    loop = best_of(per_symbol, data, repeat=args.repeat)
+    rows = [{"engine": "build_features loop", "wall_s": loop, "speedup": 1.0}]
+    for name, fn, fargs in [
+        ("panel (mapping)", build_features_panel, (data,)),
+        ("panel (long)", build_features_panel, (long,)),
+        ("panel (wide)", build_features_panel, (close, volume)),
+    ]:
+        t = best_of(fn, *fargs, repeat=args.repeat)
+        rows.append({"engine": name, "wall_s": t, "speedup": loop / t})
+    print(f"symbols={args.symbols} bars={args.bars}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
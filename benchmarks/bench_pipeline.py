@@ -0,0 +1,229 @@
+"""Benchmark suite for the main.py pipeline, stage by stage, with a stored baseline.
+
+Generates synthetic hourly OHLCV CSVs for each case (BARSxSYMBOLS), then times
+`load_local_ohlcv`, `build_features`, `train_predict`, `to_entries_exits` and
+`run_backtest` separately, each in a fresh process (inputs are built first
+and excluded from the timing and the peak-RSS reading). Multi-symbol cases
+run each stage over every symbol, as a per-symbol loop over main.py would.
+
+Results are written to JSON; if a baseline exists, every (case, stage) is
+compared against it and the run exits with status 1 on a regression.
+
+Usage (from project root):
+
+.venv/bin/python -m benchmarks.bench_pipeline                       # quick cases
+.venv/bin/python -m benchmarks.bench_pipeline --cases 10000000x1 100000x50 100000x500
+.venv/bin/python -m benchmarks.bench_pipeline --save-baseline       # accept current numbers
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import current_rss_mb, peak_rss_mb, print_table, reset_peak_rss, run_isolated
+from backtest.vectorbt_engine import run_backtest
+from data.downloader import load_local_ohlcv
+from models.logistic_model import build_features, train_predict
+from signals.adapter import to_entries_exits
+
+
+STAGES = ["load_local_ohlcv", "build_features", "train_predict", "to_entries_exits", "run_backtest"]
+QUICK_CASES = ["1000x1", "100000x1", "1000x50", "1000x500"]
+FULL_CASES = QUICK_CASES + ["10000000x1", "100000x50", "100000x500"]
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline_pipeline.json")
+
+
+# ---------------- synthetic data ---------------- #
+def make_ohlcv(n_bars: int, seed: int = 0, freq: Optional[str] = None) -> pd.DataFrame:
+    """Random-walk OHLCV bars (naive timestamps, as local CSVs are).
+
+    Hourly by default; minute bars from 1M bars on, since that many hours
+    would run past the last representable timestamp (year 2262).
+    """
+    rng = np.random.default_rng(seed)
+    freq = freq or ("h" if n_bars < 1_000_000 else "min")
+    idx = pd.date_range("1990-01-02 09:30", periods=n_bars, freq=freq)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    spread = np.abs(rng.normal(0, 0.003, n_bars))
+    return pd.DataFrame(
+        {
+            "Open": (close * (1 + rng.normal(0, 0.002, n_bars))).round(4),
+            "High": (close * (1 + spread)).round(4),
+            "Low": (close * (1 - spread)).round(4),
+            "Close": close.round(4),
+            "Volume": rng.integers(1_000, 100_000, n_bars),
+        },
+        index=idx,
+    )
+
+
+def symbols_for(n_symbols: int) -> List[str]:
+    return [f"{i:04d}.HK" for i in range(n_symbols)]
+
+
+def write_universe(data_dir: str, n_bars: int, n_symbols: int) -> None:
+    """One `{symbol}.csv` per symbol with a plain Date header."""
+    for k, sym in enumerate(symbols_for(n_symbols)):
+        make_ohlcv(n_bars, seed=k).to_csv(
+            os.path.join(data_dir, f"{sym}.csv"), index_label="Date", date_format="%Y-%m-%d %H:%M:%S"
+        )
+
+
+def parse_case(case: str):
+    bars, symbols = case.lower().split("x")
+    return int(bars), int(symbols)
+
+
+# ---------------- stages ---------------- #
+def _call(stage: str, sym: str, data_dir: str, frame, proba, signal) -> None:
+    if stage == "load_local_ohlcv":
+        load_local_ohlcv(sym, data_dir)
+    elif stage == "build_features":
+        build_features(frame)
+    elif stage == "train_predict":
+        train_predict(frame)
+    elif stage == "to_entries_exits":
+        to_entries_exits(proba, 0.55)
+    else:
+        entries, exits = signal
+        run_backtest(frame["Close"].reindex(entries.index), entries, exits, metrics=["total_return"])
+
+
+def run_stage(stage: str, data_dir: str, n_symbols: int, repeat: int) -> Dict[str, float]:
+    """Build the inputs of `stage`, then time it over every symbol (child process).
+
+    One untimed call on a 2000-bar slice first pays numba compilation and
+    lazy imports, so the numbers reflect steady-state cost.
+    """
+    syms = symbols_for(n_symbols)
+    frames = {s: load_local_ohlcv(s, data_dir) for s in syms}
+    probas, signals = {}, {}
+    if stage in ("to_entries_exits", "run_backtest"):
+        probas = {s: train_predict(df)[1] for s, df in frames.items()}
+    if stage == "run_backtest":
+        signals = {s: to_entries_exits(p, 0.55) for s, p in probas.items()}
+
+    warm = frames[syms[0]].iloc[:2000]
+    warm_proba = train_predict(warm)[1]
+    _call(stage, syms[0], data_dir, warm, warm_proba, to_entries_exits(warm_proba, 0.55))
+    if stage == "load_local_ohlcv":
+        frames = {}  # the stage itself allocates these
+
+    base = current_rss_mb()
+    reset_peak_rss()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for s in syms:
+            _call(stage, s, data_dir, frames.get(s), probas.get(s), signals.get(s))
+        times.append(time.perf_counter() - t0)
+    peak = peak_rss_mb()
+    return {"wall_s": min(times), "peak_rss_mb": peak, "rss_delta_mb": max(peak - base, 0.0)}
+
+
+# ---------------- baseline ---------------- #
+def compare(
+    results: List[Dict],
+    baseline: List[Dict],
+    wall_tol: float = 0.25,
+    mem_tol: float = 0.25,
+    min_wall_s: float = 0.05,
+    min_mem_mb: float = 10.0,
+) -> List[Dict]:
+    """Annotate `results` with baseline ratios and a `status` per (case, stage).
+
+    A row regresses when it is more than `wall_tol` slower (and at least
+    `min_wall_s` in absolute terms, to ignore timer noise on tiny stages) or
+    its memory growth is more than `mem_tol` above the baseline (and at least
+    `min_mem_mb`).
+    """
+    base = {(r["case"], r["stage"]): r for r in baseline}
+    out = []
+    for r in results:
+        b = base.get((r["case"], r["stage"]))
+        row = dict(r, wall_ratio=np.nan, mem_ratio=np.nan, status="new")
+        if b is not None:
+            row["wall_ratio"] = r["wall_s"] / max(b["wall_s"], 1e-9)
+            row["mem_ratio"] = (r["rss_delta_mb"] + 1.0) / (b["rss_delta_mb"] + 1.0)
+            slower = r["wall_s"] > b["wall_s"] * (1 + wall_tol) and r["wall_s"] - b["wall_s"] > min_wall_s
+            bigger = r["rss_delta_mb"] > b["rss_delta_mb"] * (1 + mem_tol) and r["rss_delta_mb"] - b["rss_delta_mb"] > min_mem_mb
+            row["status"] = "REGRESSION" if slower or bigger else "ok"
+        out.append(row)
+    return out
+
+
+def environment() -> Dict[str, str]:
+    import sklearn
+    import vectorbt
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": str(os.cpu_count()),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "vectorbt": vectorbt.__version__,
+    }
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--cases", nargs="+", default=None, help=f"BARSxSYMBOLS cases (default {' '.join(QUICK_CASES)})")
+    p.add_argument("--full", action="store_true", help=f"Run every case: {' '.join(FULL_CASES)}")
+    p.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    p.add_argument("--repeat", type=int, default=1, help="Best-of repeats per stage")
+    p.add_argument("--out", default="bench_pipeline.json", help="Where to write this run's JSON")
+    p.add_argument("--baseline", default=BASELINE)
+    p.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    p.add_argument("--wall-tol", type=float, default=0.25, help="Allowed slowdown vs baseline (fraction)")
+    p.add_argument("--mem-tol", type=float, default=0.25, help="Allowed memory growth vs baseline (fraction)")
+    args = p.parse_args()
+    cases = FULL_CASES if args.full else (args.cases or QUICK_CASES)
+
+    results = []
+    for case in cases:
+        n_bars, n_symbols = parse_case(case)
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_universe(data_dir, n_bars, n_symbols)
+            for stage in args.stages:
+                res = run_isolated(run_stage, stage, data_dir, n_symbols, args.repeat)
+                results.append({"case": case, "stage": stage, **res})
+                print(f"  {case:<12} {stage:<17} {res['wall_s']:.4f}s  +{res['rss_delta_mb']:.1f}MB", flush=True)
+
+    report = {"created_at": dt.datetime.now().isoformat(timespec="seconds"), "env": environment(), "results": results}
+    with open(args.out, "w") as fh:
+        json.dump(report, fh, indent=2)
+
+    regressed = False
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        rows = compare(results, baseline["results"], wall_tol=args.wall_tol, mem_tol=args.mem_tol)
+        regressed = any(r["status"] == "REGRESSION" for r in rows)
+        print(f"\nvs baseline {args.baseline} ({baseline['created_at']})")
+    else:
+        rows = results
+    print_table(rows)
+    print(f"\nwrote {args.out}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"saved baseline {args.baseline}")
+    if regressed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
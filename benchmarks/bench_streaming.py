@@ -0,0 +1,71 @@
+"""Peak memory of the chunked (`--stream`) path vs the in-memory path.
+
+Both score the same synthetic 1m-style history with one artifact (trained
+on its first bars) and produce entries/exits; the in-memory run loads the
+whole CSV, the chunked run streams it with `iter_local_ohlcv` →
+`iter_features` → `iter_predict` → `iter_signals`. Each runs in a fresh
+process; peak RSS growth should stay flat for the chunked path as the
+history grows.
+
+Usage (from project root):
+
+.venv/bin/python -m benchmarks.bench_streaming --bars 1000000 5000000 --chunk-rows 500000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict
+
+from benchmarks.bench_pipeline import make_ohlcv
+from benchmarks.common import current_rss_mb, peak_rss_mb, print_table, reset_peak_rss, run_isolated
+from data.downloader import iter_local_ohlcv, load_local_ohlcv
+from models.artifacts import ModelArtifact, train_artifact
+from models.streaming import iter_features, iter_predict, iter_signals
+from signals.adapter import to_entries_exits
+
+SYMBOL = "BENCH.HK"
+
+
+def run_mode(data_dir: str, artifact: ModelArtifact, mode: str, chunk_rows: int) -> Dict[str, float]:
+    """Score every bar after the training range (child process)."""
+    base = current_rss_mb()
+    reset_peak_rss()
+    t0 = time.perf_counter()
+    if mode == "in-memory":
+        df = load_local_ohlcv(SYMBOL, data_dir)
+        proba = artifact.predict(df)
+        entries, _ = to_entries_exits(proba, 0.55)
+        n = len(proba)
+    else:
+        chunks = iter_local_ohlcv(SYMBOL, data_dir, chunksize=chunk_rows)
+        probas = iter_predict(iter_features(chunks, artifact.meta["feature_spec"]), artifact, since=artifact.trained_until)
+        n = sum(len(proba) for proba, _, _ in iter_signals(probas, 0.55))
+    return {"bars_scored": n, "wall_s": time.perf_counter() - t0, "peak_delta_mb": max(peak_rss_mb() - base, 0.0)}
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--bars", type=int, nargs="+", default=[1_000_000, 5_000_000])
+    p.add_argument("--chunk-rows", type=int, default=500_000)
+    p.add_argument("--spec", default="logistic_minimal")
+    args = p.parse_args()
+
+    rows = []
+    for n_bars in args.bars:
+        with tempfile.TemporaryDirectory() as data_dir:
+            df = make_ohlcv(n_bars)
+            df.to_csv(os.path.join(data_dir, f"{SYMBOL}.csv"), index_label="Date", date_format="%Y-%m-%d %H:%M:%S")
+            artifact = train_artifact(df.iloc[:20_000], feature_spec=args.spec)
+            del df
+            for mode in ("in-memory", "chunked"):
+                res = run_isolated(run_mode, data_dir, artifact, mode, args.chunk_rows)
+                rows.append({"bars": n_bars, "mode": mode, **res})
+                print(f"  {n_bars:>10} {mode:<10} peak +{res['peak_delta_mb']:.1f}MB", flush=True)
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark the broadcast threshold sweep against one backtest per threshold.
+
+Usage (from project root):
+
+.venv/bin/python -m benchmarks.bench_sweep --bars 5000 --thresholds 100
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from backtest.vectorbt_engine import run_backtest, run_sweep
+from benchmarks.common import best_of, print_table
+from signals.adapter import to_entries_exits, to_entries_exits_grid
+
+
+def make_inputs(n_bars: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2020-01-02 09:30", periods=n_bars, freq="h", tz="Asia/Hong_Kong")
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars))), index=idx)
+    proba = pd.Series(rng.random(n_bars), index=idx)
+    return close, proba
+
+
+def loop(close: pd.Series, proba: pd.Series, thresholds) -> None:
+    # what separate main.py runs do per grid point (minus data + training)
+    for th in thresholds:
+        entries, exits = to_entries_exits(proba, th)
+        run_backtest(close.reindex(entries.index), entries, exits)
+
+
+def sweep(close: pd.Series, proba: pd.Series, thresholds) -> None:
+    entries, exits = to_entries_exits_grid(proba, thresholds)
+    run_sweep(close, entries, exits)
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--bars", type=int, default=5000)
+    p.add_argument("--thresholds", type=int, default=100)
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    close, proba = make_inputs(args.bars)
+    thresholds = list(np.linspace(0.3, 0.7, args.thresholds))
+    # warm numba caches so neither side pays JIT compilation
+    sweep(close, proba, thresholds[:2])
+    loop(close, proba, thresholds[:1])
+
+    t_loop = best_of(loop, close, proba, thresholds, repeat=args.repeat)
+    t_sweep = best_of(sweep, close, proba, thresholds, repeat=args.repeat)
+    print(f"bars={args.bars} thresholds={args.thresholds}")
+    print_table(
+        [
+            {"engine": "loop (run_backtest per th)", "wall_s": t_loop, "speedup": 1.0},
+            {"engine": "broadcast run_sweep", "wall_s": t_sweep, "speedup": t_loop / t_sweep},
+        ]
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark the cash-sharing universe backtest against one portfolio per symbol.
+
+Usage (from project root):
+
+.venv/bin/python -m benchmarks.bench_universe_backtest --symbols 300 --bars 16000
+
+16000 60m bars is roughly 10 years of HKEX sessions.
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from backtest.vectorbt_engine import run_backtest, run_universe_backtest
+from benchmarks.common import measure, print_table
+
+
+def make_inputs(n_symbols: int, n_bars: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2015-01-02 09:30", periods=n_bars, freq="h", tz="Asia/Hong_Kong")
+    cols = [f"{i:04d}.HK" for i in range(n_symbols)]
+    close = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_bars, n_symbols)), axis=0)), index=idx, columns=cols)
+    entries = pd.DataFrame(rng.random((n_bars, n_symbols)) > 0.97, index=idx, columns=cols)
+    exits = pd.DataFrame(rng.random((n_bars, n_symbols)) > 0.97, index=idx, columns=cols)
+    return close, entries, exits
+
+
+def universe(n_symbols: int, n_bars: int) -> None:
+    close, entries, exits = make_inputs(n_symbols, n_bars)
+    run_universe_backtest(close, entries, exits, max_position=0.05)
+
+
+def per_symbol(n_symbols: int, n_bars: int) -> None:
+    close, entries, exits = make_inputs(n_symbols, n_bars)
+    for sym in close.columns:
+        run_backtest(close[sym], entries[sym], exits[sym])
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--symbols", type=int, default=300)
+    p.add_argument("--bars", type=int, default=16000)
+    p.add_argument("--skip-loop", action="store_true", help="Only run the universe engine")
+    args = p.parse_args()
+
+    rows = []
+    candidates = [("universe (one pass)", universe)]
+    if not args.skip_loop:
+        candidates.append(("run_backtest per symbol", per_symbol))
+    for name, fn in candidates:
+        res = measure(fn, args.symbols, args.bars)
+        rows.append({"engine": name, **res})
+    print(f"symbols={args.symbols} bars={args.bars}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Shared helpers for the benchmark scripts: isolated timing and peak-RSS measurement."""
+from __future__ import annotations
+
+import multiprocessing as mp
+import queue as queue_mod
+import resource
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+
+def _peak_rss_mb() -> float:
+    # VmHWM is reset by exec; ru_maxrss is not and would inherit the parent's peak
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _child(fn: Callable, args: tuple, queue) -> None:
+    before = _peak_rss_mb()
+    t0 = time.perf_counter()
+    try:
+        fn(*args)
+    except Exception as exc:  # surface the failure instead of blocking the parent
+        queue.put((False, f"{type(exc).__name__}: {exc}"))
+        return
+    wall = time.perf_counter() - t0
+    queue.put((True, {"wall_s": wall, "peak_rss_mb": _peak_rss_mb(), "rss_delta_mb": _peak_rss_mb() - before}))
+
+
+def _collect(fn: Callable, proc, queue) -> Any:
+    """Wait for the child's (ok, result) message; raise if it failed or died."""
+    while True:
+        alive = proc.is_alive()
+        try:
+            # one last read after exit: the result may land just as it quits
+            ok, result = queue.get(timeout=1.0 if alive else 0.1)
+            break
+        except queue_mod.Empty:
+            # a crash (segfault, OOM kill, os._exit) never puts anything
+            if not alive:
+                proc.join()
+                raise RuntimeError(
+                    f"{getattr(fn, '__name__', fn)} child process exited with code {proc.exitcode} without a result"
+                )
+    proc.join()
+    if not ok:
+        raise RuntimeError(f"{getattr(fn, '__name__', fn)} failed in child process: {result}")
+    return result
+
+
+def measure(fn: Callable, *args: Any) -> Dict[str, float]:
+    """Run `fn(*args)` in a fresh process and return wall time and peak RSS.
+
+    A fresh (spawned) process per measurement keeps peak RSS of one candidate
+    from leaking into the next. `fn` must be importable (module level); an
+    exception in it, or the child dying, raises RuntimeError here.
+    """
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(fn, args, queue))
+    proc.start()
+    return _collect(fn, proc, queue)
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process right now (Linux; 0 elsewhere)."""
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def reset_peak_rss() -> None:
+    """Reset VmHWM to the current RSS so the next peak excludes setup (Linux)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb() -> float:
+    return _peak_rss_mb()
+
+
+def _call_child(fn: Callable, args: tuple, queue) -> None:
+    try:
+        queue.put((True, fn(*args)))
+    except Exception as exc:  # surface the failure instead of blocking the parent
+        queue.put((False, f"{type(exc).__name__}: {exc}"))
+
+
+def run_isolated(fn: Callable, *args: Any) -> Any:
+    """Run `fn(*args)` in a fresh (spawned) process and return its result.
+
+    For benchmarks that time only part of `fn` themselves (e.g. after
+    building inputs) but still want a clean process per measurement.
+    """
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_call_child, args=(fn, args, queue))
+    proc.start()
+    return _collect(fn, proc, queue)
+
+
+def best_of(fn: Callable, *args: Any, repeat: int = 3) -> float:
+    """Best wall time of `repeat` in-process runs (for CPU-bound kernels)."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    """Print a list of flat dicts as an aligned text table."""
+    if not rows:
+        return
+    cols = list(rows[0])
+    fmt = lambda v: f"{v:.4f}" if isinstance(v, float) else str(v)
+    widths = {c: max(len(c), *(len(fmt(r[c])) for r in rows)) for c in cols}
+    print("  ".join(c.ljust(widths[c]) for c in cols))
+    for r in rows:
+        print("  ".join(fmt(r[c]).ljust(widths[c]) for c in cols))
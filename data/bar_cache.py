@@ -0,0 +1,198 @@
+"""Memory-mapped binary cache for OHLCV frames.
+
+A cache entry is a directory holding fixed-width columns plus a small JSON
+header::
+
+	{name}.bars/
+		index.i8      int64 nanoseconds since epoch (UTC)
+		block{k}.bin  columns sharing one dtype (float OHLC, int64 Volume),
+		              column-major so every column is one contiguous run
+		meta.json     blocks, column order, tz, row count, source fingerprint
+
+Entries are built in a temporary sibling directory and renamed into place,
+then opened with `np.memmap` in read-only mode, so loading costs a few
+syscalls and the pages are shared between processes via the OS page cache.
+An entry is stale when its source file's size/mtime change *and* its
+content hash differs (a plain `touch` does not rebuild).
+"""
+from __future__ import annotations
+
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+FORMAT_VERSION = 1
+
+
+def file_fingerprint(path: str, with_hash: bool = True) -> Dict:
+	"""Size, mtime and (optionally) a blake2b digest of `path`."""
+	st = os.stat(path)
+	fp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+	if with_hash:
+		h = hashlib.blake2b(digest_size=16)
+		with open(path, "rb") as fh:
+			for block in iter(lambda: fh.read(1 << 20), b""):
+				h.update(block)
+		fp["hash"] = h.hexdigest()
+	return fp
+
+
+def _dtype_blocks(df: pd.DataFrame) -> List[Tuple[np.dtype, List[str]]]:
+	"""Group columns by dtype, keeping first-appearance order."""
+	blocks: Dict[np.dtype, List[str]] = {}
+	for col, dt in df.dtypes.items():
+		if not (np.issubdtype(dt, np.floating) or np.issubdtype(dt, np.integer)):
+			raise ValueError(f"Bar cache only stores numeric columns; {col!r} is {dt}")
+		blocks.setdefault(np.dtype(dt), []).append(col)
+	return list(blocks.items())
+
+
+def write_bar_cache(df: pd.DataFrame, path: str, source: Optional[str] = None) -> None:
+	"""Write `df` (DatetimeIndex + numeric columns) as a cache entry at `path`.
+
+	The files are written to a temporary directory next to `path` that then
+	replaces the old entry by rename: a reader never sees a half-written
+	entry, and one still mapping the old files keeps its (unlinked) pages.
+	"""
+	parent = os.path.dirname(os.path.abspath(path))
+	os.makedirs(parent, exist_ok=True)
+	tmp = tempfile.mkdtemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=parent)
+	try:
+		_write_entry(df, tmp, source)
+		_publish(tmp, path)
+	except BaseException:
+		shutil.rmtree(tmp, ignore_errors=True)
+		raise
+
+
+def _write_entry(df: pd.DataFrame, path: str, source: Optional[str]) -> None:
+	idx = df.index
+	tz = str(idx.tz) if idx.tz is not None else None
+	stamps = (idx.tz_convert("UTC").tz_localize(None) if tz else idx).asi8
+	np.asarray(stamps, dtype=np.int64).tofile(os.path.join(path, "index.i8"))
+
+	blocks = []
+	for k, (dtype, cols) in enumerate(_dtype_blocks(df)):
+		# transpose to (cols, rows) so each column is one contiguous run on disk
+		np.ascontiguousarray(df[cols].to_numpy(dtype=dtype).T).tofile(os.path.join(path, f"block{k}.bin"))
+		blocks.append({"dtype": dtype.str, "columns": [str(c) for c in cols]})
+
+	meta = {
+		"version": FORMAT_VERSION,
+		"rows": len(df),
+		"columns": [str(c) for c in df.columns],
+		"blocks": blocks,
+		"tz": tz,
+		"source": file_fingerprint(source) if source else None,
+	}
+	_write_meta(path, meta)
+
+
+def _publish(tmp: str, path: str) -> None:
+	"""Rename the finished entry `tmp` to `path`, retiring any old entry."""
+	# a directory cannot be renamed over a non-empty one: move the old aside first
+	old = tmp + ".old"
+	try:
+		os.replace(path, old)
+	except FileNotFoundError:
+		old = None
+	try:
+		os.replace(tmp, path)
+	except OSError:
+		# a concurrent writer published first; its entry is just as good
+		shutil.rmtree(tmp, ignore_errors=True)
+	if old is not None:
+		shutil.rmtree(old, ignore_errors=True)
+
+
+def _write_meta(path: str, meta: Dict) -> None:
+	tmp = os.path.join(path, "meta.json.tmp")
+	with open(tmp, "w") as fh:
+		json.dump(meta, fh)
+	os.replace(tmp, os.path.join(path, "meta.json"))
+
+
+def _is_fresh(meta: Dict, path: str, source: str) -> bool:
+	saved = meta.get("source")
+	if not saved:
+		return False
+	cur = file_fingerprint(source, with_hash=False)
+	if cur["size"] == saved["size"] and cur["mtime_ns"] == saved["mtime_ns"]:
+		return True
+	if cur["size"] != saved["size"]:
+		return False
+	# same size, new mtime: only the content hash can tell
+	cur = file_fingerprint(source)
+	if cur["hash"] != saved.get("hash"):
+		return False
+	meta["source"] = cur
+	_write_meta(path, meta)
+	return True
+
+
+def read_bar_cache(path: str, source: Optional[str] = None) -> Optional[pd.DataFrame]:
+	"""Open a cache entry via `np.memmap`; None if missing, incompatible or stale.
+
+	The returned frame is backed by read-only mapped memory: pandas operations
+	that produce new frames work as usual, in-place writes raise.
+	"""
+	meta_path = os.path.join(path, "meta.json")
+	if not os.path.exists(meta_path):
+		return None
+	with open(meta_path) as fh:
+		meta = json.load(fh)
+	if meta.get("version") != FORMAT_VERSION:
+		return None
+	if source is not None and not _is_fresh(meta, path, source):
+		return None
+
+	rows = meta["rows"]
+	if rows:
+		stamps = np.memmap(os.path.join(path, "index.i8"), dtype=np.int64, mode="r", shape=(rows,))
+	else:
+		stamps = np.empty(0, dtype=np.int64)
+	index = pd.DatetimeIndex(stamps.view("datetime64[ns]"))
+	if meta["tz"]:
+		index = index.tz_localize("UTC").tz_convert(meta["tz"])
+
+	frames = []
+	for k, block in enumerate(meta["blocks"]):
+		shape = (len(block["columns"]), rows)
+		if rows:
+			values = np.memmap(os.path.join(path, f"block{k}.bin"), dtype=block["dtype"], mode="r", shape=shape)
+		else:
+			values = np.empty(shape, dtype=block["dtype"])
+		# (cols, rows) on disk: the transpose is a zero-copy view pandas adopts as one block
+		frames.append(pd.DataFrame(values.T, index=index, columns=block["columns"], copy=False))
+
+	if not frames:
+		return pd.DataFrame(index=index)
+	df = frames[0] if len(frames) == 1 else pd.concat(frames, axis=1, copy=False)
+	if list(df.columns) != meta["columns"]:
+		df = df[meta["columns"]]
+	return df
+
+
+def cached_frame(
+	source: str,
+	loader: Callable[[], pd.DataFrame],
+	cache_dir: str,
+	key: Optional[str] = None,
+) -> pd.DataFrame:
+	"""Return the cached frame for `source`, rebuilding it with `loader` if stale."""
+	key = key or os.path.basename(source)
+	path = os.path.join(cache_dir, f"{key}.bars")
+	df = read_bar_cache(path, source=source)
+	if df is not None:
+		return df
+	df = loader()
+	write_bar_cache(df, path, source=source)
+	return df
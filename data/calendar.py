@@ -0,0 +1,203 @@
+"""HKEX trading calendar: sessions, holidays, half-days and bar boundaries.
+
+Bars follow the yfinance convention: each bar is labelled by its start time
+and runs for `interval` inside a session, truncated at the session close
+(e.g. the 60m bars of a full day are 09:30, 10:30, 11:30, 13:00, 14:00, 15:00).
+Daily bars are labelled at local midnight and complete at the day's close.
+
+Exchange holidays and half-days are listed for HOLIDAY_YEARS (2024-2026)
+only. Other years are treated as trading every weekday and, unless the
+calendar is built with `years=None`, the first query of each such year
+emits a `UserWarning`.
+"""
+from __future__ import annotations
+
+
+import warnings
+from datetime import date, time
+from typing import Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+
+HK_TZ = ZoneInfo("Asia/Hong_Kong")
+
+MORNING_SESSION = (time(9, 30), time(12, 0))
+AFTERNOON_SESSION = (time(13, 0), time(16, 0))
+
+# Weekday exchange holidays as published by HKEX. Extend yearly together with
+# HOLIDAY_YEARS; unknown holidays only cost one empty fetch, they never
+# corrupt stored data.
+HKEX_HOLIDAYS = frozenset(
+	date.fromisoformat(d)
+	for d in (
+		"2024-01-01", "2024-02-12", "2024-02-13", "2024-03-29", "2024-04-01",
+		"2024-04-04", "2024-05-01", "2024-05-15", "2024-06-10", "2024-07-01",
+		"2024-09-18", "2024-10-01", "2024-10-11", "2024-12-25", "2024-12-26",
+		"2025-01-01", "2025-01-29", "2025-01-30", "2025-01-31", "2025-04-04",
+		"2025-04-18", "2025-04-21", "2025-05-01", "2025-05-05", "2025-07-01",
+		"2025-10-01", "2025-10-07", "2025-10-29", "2025-12-25", "2025-12-26",
+		"2026-01-01", "2026-02-17", "2026-02-18", "2026-02-19", "2026-04-03",
+		"2026-04-06", "2026-04-07", "2026-05-01", "2026-05-25", "2026-06-19",
+		"2026-07-01", "2026-10-01", "2026-10-19", "2026-12-25",
+	)
+)
+
+# Morning-only sessions (eves of Lunar New Year, Christmas and New Year).
+HKEX_HALF_DAYS = frozenset(
+	date.fromisoformat(d)
+	for d in (
+		"2024-02-09", "2024-12-24", "2024-12-31",
+		"2025-01-28", "2025-12-24", "2025-12-31",
+		"2026-02-16", "2026-12-24", "2026-12-31",
+	)
+)
+
+# Years the two lists above are complete for.
+HOLIDAY_YEARS = range(2024, 2027)
+
+
+def interval_to_timedelta(interval: str) -> pd.Timedelta:
+	"""Parse a yfinance-style interval ("60m", "1h", "1d") into a Timedelta."""
+	unit = interval[-1]
+	n = int(interval[:-1])
+	if unit == "m":
+		return pd.Timedelta(minutes=n)
+	if unit == "h":
+		return pd.Timedelta(hours=n)
+	if unit == "d":
+		return pd.Timedelta(days=n)
+	raise ValueError(f"Unsupported interval: {interval!r}")
+
+
+class HKEXCalendar:
+	"""Trading sessions of the Hong Kong stock exchange.
+
+	Parameters
+	----------
+	holidays : Iterable[date]
+	Weekday dates on which the exchange is closed.
+	half_days : Iterable[date]
+	Dates with a morning session only.
+	years : range, optional
+	Years `holidays`/`half_days` are complete for. Querying a day outside
+	them warns once per year (only weekends are known closures there);
+	None disables the check.
+	"""
+
+	def __init__(
+		self,
+		holidays: Iterable[date] = HKEX_HOLIDAYS,
+		half_days: Iterable[date] = HKEX_HALF_DAYS,
+		years: Optional[range] = HOLIDAY_YEARS,
+	) -> None:
+		self.holidays = frozenset(holidays)
+		self.half_days = frozenset(half_days)
+		self.years = years
+		self._warned = set()
+
+	def is_trading_day(self, day: date) -> bool:
+		if self.years is not None and day.year not in self.years and day.year not in self._warned:
+			self._warned.add(day.year)
+			warnings.warn(
+				f"HKEX holidays are only listed for {self.years[0]}-{self.years[-1]}; "
+				f"{day.year} is treated as trading every weekday.",
+				stacklevel=2,
+			)
+		return day.weekday() < 5 and day not in self.holidays
+
+	def sessions(self, day: date) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+		"""Return the (open, close) timestamps of each session on `day`."""
+		if not self.is_trading_day(day):
+			return []
+		spans = [MORNING_SESSION] if day in self.half_days else [MORNING_SESSION, AFTERNOON_SESSION]
+		return [
+			(
+				pd.Timestamp.combine(day, start).tz_localize(HK_TZ),
+				pd.Timestamp.combine(day, end).tz_localize(HK_TZ),
+			)
+			for start, end in spans
+		]
+
+	def trading_days(self, start: date, end: date) -> List[date]:
+		"""Trading days in [start, end]."""
+		return [d.date() for d in pd.date_range(start, end, freq="D") if self.is_trading_day(d.date())]
+
+	def bar_labels(self, day: date, interval: str) -> List[pd.Timestamp]:
+		"""Start timestamps of the bars traded on `day`."""
+		if not self.is_trading_day(day):
+			return []
+		step = interval_to_timedelta(interval)
+		if step >= pd.Timedelta(days=1):
+			return [pd.Timestamp(day).tz_localize(HK_TZ)]
+		labels = []
+		for open_, close in self.sessions(day):
+			labels.extend(pd.date_range(open_, close, freq=step, inclusive="left"))
+		return labels
+
+	def bar_end(self, label: pd.Timestamp, interval: str) -> pd.Timestamp:
+		"""Time at which the bar labelled `label` is complete."""
+		label = label.tz_convert(HK_TZ)
+		sessions = self.sessions(label.date())
+		step = interval_to_timedelta(interval)
+		if step >= pd.Timedelta(days=1):
+			return sessions[-1][1] if sessions else label + step
+		for open_, close in sessions:
+			if open_ <= label < close:
+				return min(label + step, close)
+		return label + step
+
+	def next_bar_label(self, after: pd.Timestamp, interval: str, max_days: int = 31) -> Optional[pd.Timestamp]:
+		"""First bar label strictly after `after`, looking ahead up to `max_days`."""
+		after = after.tz_convert(HK_TZ)
+		day = after.date()
+		for _ in range(max_days + 1):
+			for label in self.bar_labels(day, interval):
+				if label > after:
+					return label
+			day = (pd.Timestamp(day) + pd.Timedelta(days=1)).date()
+		return None
+
+	def has_new_bar(self, last: pd.Timestamp, now: pd.Timestamp, interval: str) -> bool:
+		"""True if a bar after `last` has completed by `now`.
+
+		Lunch breaks, nights, weekends and holidays never count as a gap.
+		"""
+		label = self.next_bar_label(last, interval)
+		if label is None:
+			# calendar ran dry (e.g. a long closure): let the caller fetch
+			return True
+		return self.bar_end(label, interval) <= now.tz_convert(HK_TZ)
+
+	def completed(self, index: pd.DatetimeIndex, now: pd.Timestamp, interval: str) -> "pd.Series":
+		"""Boolean mask of bars in `index` that are complete as of `now`.
+
+		Same rule as `bar_end`, vectorised: sessions are looked up once per
+		distinct day and labels are matched to them with `searchsorted`.
+		"""
+		local = index.tz_convert(HK_TZ).as_unit("ns")
+		step = interval_to_timedelta(interval)
+		labels = local.asi8
+		ends = labels + step.value
+		midnights = local.normalize().unique().sort_values()
+		sessions = {d: self.sessions(d.date()) for d in midnights}
+		if step >= pd.Timedelta(days=1):
+			# a daily bar completes at its day's last close
+			days = np.array([d.value for d, s in sessions.items() if s], dtype=np.int64)
+			last = np.array([s[-1][1].value for s in sessions.values() if s], dtype=np.int64)
+			if len(days):
+				day = local.normalize().asi8
+				pos = np.minimum(np.searchsorted(days, day), len(days) - 1)
+				hit = days[pos] == day
+				ends[hit] = last[pos[hit]]
+		else:
+			opens = np.array([o.value for s in sessions.values() for o, _ in s], dtype=np.int64)
+			closes = np.array([c.value for s in sessions.values() for _, c in s], dtype=np.int64)
+			if len(opens):
+				# bars inside a session are cut at its close
+				pos = np.searchsorted(opens, labels, side="right") - 1
+				inside = (pos >= 0) & (labels < closes[np.maximum(pos, 0)])
+				ends[inside] = np.minimum(ends[inside], closes[pos[inside]])
+		return pd.Series(ends <= now.tz_convert(HK_TZ).value, index=index, dtype=bool)
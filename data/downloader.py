@@ -2,77 +2,217 @@
 from __future__ import annotations
 
 
-from typing import Literal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Literal, Optional, Tuple
+import itertools
+import re
 import time
+import numpy as np
 import pandas as pd
 import yfinance as yf
 from zoneinfo import ZoneInfo
 import os
 from datetime import datetime
-from typing import Optional
+
+from data.bar_cache import cached_frame
+from data.calendar import HKEXCalendar
+from data.rate_limit import TokenBucket
+from data.resample import ResampledBars
+from data.store import OHLCVStore
 
 
 HK_TZ = ZoneInfo("Asia/Hong_Kong")
+OHLCV_COLS = ["Open", "High", "Low", "Close", "Volume"]
 
 
-def load_local_ohlcv(symbol: str, data_dir: str = "data") -> Optional[pd.DataFrame]:
-	"""Load a local CSV for `symbol` if present in `data_dir`.
+# Compact mode: float32 prices (24-bit mantissa, relative rounding <= 2**-24,
+# about 6e-8 -- below one HKEX tick for any price under ~16,000) and int32
+# Volume (exact up to 2**31 - 1 shares per bar; larger volumes keep int64).
+COMPACT_PRICE_DTYPE = np.float32
+COMPACT_VOLUME_DTYPE = np.int32
 
-	Expected CSV format (per repository convention):
-	- columns: date, Close, High, Low, Open, Volume
-	- date may be a column named 'date' (case-insensitive) or the first column as index
-	- returns a DataFrame with columns [Open, High, Low, Close, Volume] and
-	  a DatetimeIndex (tz-naive). If the file is not found, returns None.
-	"""
-	# Normalize symbol filename
-	fname = os.path.join(data_dir, f"{symbol}.csv")
-	if not os.path.exists(fname):
-		return None
 
-	# Try reading and normalizing columns
-	try:
-		df = pd.read_csv(fname)
-	except Exception:
-		return None
+def to_compact(df: pd.DataFrame) -> pd.DataFrame:
+	"""Cast an OHLCV frame to the compact dtypes (no-op for columns already compact).
 
-	# Detect date column
-	date_col = None
-	cols_lower = [c.lower() for c in df.columns]
-	if "date" in cols_lower:
-		date_col = df.columns[cols_lower.index("date")]
-		df[date_col] = pd.to_datetime(df[date_col])
-		df = df.set_index(date_col)
+	Volume becomes int32 only when it is integral, NaN-free and in range;
+	otherwise it is left as is rather than silently rounded.
+	"""
+	out = {}
+	for col in OHLCV_COLS[:4]:
+		if col in df and df[col].dtype != COMPACT_PRICE_DTYPE:
+			out[col] = df[col].astype(COMPACT_PRICE_DTYPE)
+	if "Volume" in df and df["Volume"].dtype != COMPACT_VOLUME_DTYPE:
+		vol = df["Volume"].to_numpy()
+		info = np.iinfo(COMPACT_VOLUME_DTYPE)
+		if len(vol) == 0 or (
+			np.isfinite(vol).all() and vol.min() >= info.min and vol.max() <= info.max and (vol == np.round(vol)).all()
+		):
+			out["Volume"] = df["Volume"].astype(COMPACT_VOLUME_DTYPE)
+	return df.assign(**out) if out else df
+
+
+def _normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+	"""Flatten yfinance output to Open/High/Low/Close/Volume in HK time."""
+	if isinstance(df.columns, pd.MultiIndex):
+		# newer yfinance returns (field, ticker) columns even for one symbol
+		df = df.copy()
+		df.columns = df.columns.get_level_values(0)
+	if df.index.tz is None:
+		df = df.tz_localize("UTC").tz_convert(HK_TZ)
 	else:
-		# assume first column is date/index
-		try:
-			df = pd.read_csv(fname, index_col=0, parse_dates=True)
-		except Exception:
-			return None
+		df = df.tz_convert(HK_TZ)
+	return df[OHLCV_COLS].dropna()
 
-	# Ensure columns exist and reorder to Open, High, Low, Close, Volume
-	col_map = {c.lower(): c for c in df.columns}
-	required = ["open", "high", "low", "close", "volume"]
-	if not all(k in col_map for k in required):
-		# try common alternative ordering (date, Close, High, Low, Open, Volume)
-		# if still not matching, raise
-		raise ValueError(f"Local CSV {fname} missing required OHLCV columns: {df.columns.tolist()}")
 
-	df = df[[col_map["open"], col_map["high"], col_map["low"], col_map["close"], col_map["volume"]]]
-	df.columns = ["Open", "High", "Low", "Close", "Volume"]
+# Default column order of user-provided CSVs without a usable header line.
+LOCAL_CSV_COLUMNS = ["date", "Close", "High", "Low", "Open", "Volume"]
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+_SNIFF_LINES = 16
 
-	# Leave index tz-naive per user instruction
-	if not isinstance(df.index, pd.DatetimeIndex):
-		df.index = pd.to_datetime(df.index)
 
-	# drop rows with missing essential values
-	df = df.dropna()
+def _local_csv_path(symbol: str, data_dir: str) -> Optional[str]:
+	"""Return the first existing local CSV for `symbol`, or None.
 
-	if df.empty:
-		raise ValueError(f"Local CSV {fname} is empty after processing.")
+	Looks for `{data_dir}/{symbol}.csv`, then `{data_dir}/{symbol}_historical_data.csv`.
+	"""
+	for name in (f"{symbol}.csv", f"{symbol}_historical_data.csv"):
+		path = os.path.join(data_dir, name)
+		if os.path.exists(path):
+			return path
+	return None
+
+
+def _sniff_local_csv(path: str) -> Tuple[int, List[str], bool]:
+	"""Peek at the first few lines to find the data offset and column names.
 
+	Handles a plain header (`date,Close,...`), yfinance's multi-line header
+	(`Price,Close,...` / `Ticker,...` / `Date,...`) and headerless files.
+	Only `_SNIFF_LINES` lines are read, never the whole file. Returns
+	(skiprows, names, iso_dates).
+	"""
+	with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+		head = list(itertools.islice(fh, _SNIFF_LINES))
+
+	data_start = next((i for i, line in enumerate(head) if _DATE_RE.match(line.strip())), None)
+	iso_dates = data_start is not None
+	if data_start is None:
+		# header only (or non-ISO dates): parse from the line after the header
+		data_start = 1 if head else 0
+	if data_start == 0:
+		return 0, list(LOCAL_CSV_COLUMNS), iso_dates
+
+	names = [c.strip() for c in head[0].strip().split(",")]
+	names[0] = "date"
+	return data_start, names, iso_dates
+
+
+def _local_csv_read_kwargs(path: str, price_dtype) -> Dict:
+	"""Build `pd.read_csv` kwargs for a one-pass, typed parse of `path`."""
+	skiprows, names, iso_dates = _sniff_local_csv(path)
+	canon = {c.lower(): c for c in OHLCV_COLS}
+	names = [canon.get(n.lower(), n) for n in names]
+	missing = [c for c in OHLCV_COLS if c not in names]
+	if missing:
+		raise ValueError(f"Local CSV {path} missing required OHLCV columns: {missing}")
+
+	return dict(
+		skiprows=skiprows,
+		header=None,
+		names=names,
+		usecols=["date"] + OHLCV_COLS,
+		index_col="date",
+		parse_dates=["date"],
+		date_format="ISO8601" if iso_dates else None,
+		dtype={**{c: price_dtype for c in OHLCV_COLS[:4]}, "Volume": np.int64},
+		engine="c",
+	)
+
+
+def _finish_local(df: pd.DataFrame) -> pd.DataFrame:
+	# column selection copies, so only reorder when the file order differs
+	if list(df.columns) != OHLCV_COLS:
+		df = df[OHLCV_COLS]
+	df.index.name = None
 	return df
 
 
+def load_local_ohlcv(
+	symbol: str,
+	data_dir: str = "data",
+	price_dtype=np.float64,
+	bar_cache_dir: Optional[str] = None,
+	compact: bool = False,
+) -> Optional[pd.DataFrame]:
+	"""Load a local CSV for `symbol` if present.
+
+	The function looks for filenames in this order:
+	  1. {data_dir}/{symbol}.csv
+	  2. {data_dir}/{symbol}_historical_data.csv
+
+	Expected CSV format (as provided by the user):
+	  - columns: date, Close, High, Low, Open, Volume (header optional;
+	    yfinance's multi-line header is recognised)
+	  - date column is parsed as index; tz is kept as written (usually tz-naive)
+
+	The header offset is found by peeking at the first few lines, then the
+	file is parsed once with explicit dtypes (prices `price_dtype`, Volume
+	int64). Use `iter_local_ohlcv` to stream very large files in row chunks.
+
+	With `bar_cache_dir`, the parsed frame is kept in a memory-mapped binary
+	cache (see `data.bar_cache`) invalidated by the CSV's mtime/content hash,
+	so repeated runs skip CSV parsing entirely.
+
+	`compact=True` parses straight into the compact dtypes (float32 prices,
+	int32 Volume; see `to_compact`), roughly halving the frame's memory.
+
+	Returns a DataFrame with columns ordered as [Open, High, Low, Close, Volume]
+	and a DatetimeIndex, or None if no local file is found.
+	"""
+	path = _local_csv_path(symbol, data_dir)
+	if path is None:
+		return None
+
+	if compact:
+		price_dtype = COMPACT_PRICE_DTYPE
+
+	def _parse() -> pd.DataFrame:
+		kwargs = _local_csv_read_kwargs(path, price_dtype)
+		try:
+			df = pd.read_csv(path, **kwargs)
+		except ValueError:
+			# Volume written as float (e.g. "1200.0") or with gaps: parse it as float
+			kwargs["dtype"]["Volume"] = np.float64
+			df = pd.read_csv(path, **kwargs)
+		# Volume is parsed as int64 first: the parser would wrap int32 silently
+		return _finish_local(to_compact(df) if compact else df)
+
+	if bar_cache_dir is None:
+		return _parse()
+	key = f"{os.path.basename(path)}.{'compact' if compact else np.dtype(price_dtype).name}"
+	return cached_frame(path, _parse, bar_cache_dir, key=key)
+
+
+def iter_local_ohlcv(
+	symbol: str,
+	data_dir: str = "data",
+	chunksize: int = 1_000_000,
+	price_dtype=np.float64,
+) -> Iterator[pd.DataFrame]:
+	"""Stream the local CSV for `symbol` in row chunks of `chunksize`.
+
+	Same parsing as `load_local_ohlcv`; yields nothing if no file exists.
+	Volume is read as float64 here because a bad row cannot be re-parsed
+	mid-stream.
+	"""
+	path = _local_csv_path(symbol, data_dir)
+	if path is None:
+		return
+	kwargs = _local_csv_read_kwargs(path, price_dtype)
+	kwargs["dtype"]["Volume"] = np.float64
+	with pd.read_csv(path, chunksize=chunksize, **kwargs) as reader:
+		for chunk in reader:
+			yield _finish_local(chunk)
 
 
 def download_ohlcv(
@@ -83,6 +223,12 @@ def download_ohlcv(
 	max_retries: int = 3,
 	backoff_sec: float = 1.0,
 	force_remote: bool = False,
+	incremental: bool = False,
+	limiter: Optional[TokenBucket] = None,
+	bar_cache_dir: Optional[str] = None,
+	compact: bool = False,
+	resample_from: Optional[str] = None,
+	store_dir: str = "data/cache",
 ) -> pd.DataFrame:
 	"""Download OHLCV for a single symbol using yfinance and convert to HK timezone.
 
@@ -97,6 +243,22 @@ def download_ohlcv(
 		Bar interval.
 	auto_adjust : bool
 		Adjust OHLC for splits/dividends.
+	incremental : bool
+		Keep a local store up to date via `sync_ohlcv` and only fetch the
+		bars missing since the last run instead of the whole `period`.
+	limiter : TokenBucket, optional
+		Shared rate limiter; see `download_many`.
+	bar_cache_dir : str, optional
+		Memory-mapped cache directory for local CSVs; see `load_local_ohlcv`.
+	compact : bool
+		Return float32 prices and int32 Volume (see `to_compact` for the
+		precision bounds).
+	resample_from : str, optional
+		Finer interval (e.g. "1m") to sync into the local store instead;
+		`interval` is then derived from it locally with `ResampledBars`
+		(HKEX-session aligned, cached in the store) rather than downloaded.
+	store_dir : str
+		Root of the `OHLCVStore` used by `incremental` and `resample_from`.
 
 
 	Returns
@@ -105,143 +267,230 @@ def download_ohlcv(
 		Columns: Open, High, Low, Close, Volume (tz-aware in Asia/Hong_Kong).
 	"""
 
-	# If a local CSV exists for the symbol, prefer loading it (user-provided data).
-	local = load_local_ohlcv(symbol)
-	if local is not None:
-		return local
-
-	# Wrap yfinance call with simple retry/backoff to handle transient rate limits
-
-	# Prefer local CSV when present unless caller forces remote
+	# Prefer local CSV (user-provided data) when present unless caller forces remote
 	if not force_remote:
-		local = load_local_ohlcv(symbol)
+		local_kwargs = {} if bar_cache_dir is None else {"bar_cache_dir": bar_cache_dir}
+		if compact:
+			local_kwargs["compact"] = True
+		local = load_local_ohlcv(symbol, **local_kwargs)
 		if local is not None:
-			# ensure columns are in expected order
-			cols = [c for c in ["Open", "High", "Low", "Close", "Volume"] if c in local.columns]
-			out = local[cols].dropna()
+			# dropna always copies; skip it so a memory-mapped frame stays mapped
+			out = local.dropna() if local.isna().to_numpy().any() else local
 			if out.empty:
 				raise ValueError(f"Local CSV for {symbol} found but contains no usable rows.")
 			return out
-	last_exc = None
+	if resample_from is not None and resample_from != interval:
+		sync_ohlcv(
+			symbol, interval=resample_from, period=period, store_dir=store_dir, auto_adjust=auto_adjust,
+			max_retries=max_retries, backoff_sec=backoff_sec, limiter=limiter,
+		)
+		offset = _period_to_offset(period)
+		start = None if offset is None else pd.Timestamp.now(tz=HK_TZ) - offset
+		df = ResampledBars(OHLCVStore(store_dir), base_interval=resample_from).get(symbol, interval, start=start)
+		if df.empty:
+			raise ValueError(f"No {interval} bars could be derived from stored {resample_from} bars of {symbol}.")
+		return to_compact(df) if compact else df
+	if incremental:
+		df = sync_ohlcv(
+			symbol, interval=interval, period=period, store_dir=store_dir, auto_adjust=auto_adjust,
+			max_retries=max_retries, backoff_sec=backoff_sec, limiter=limiter,
+		)
+		return to_compact(df) if compact else df
+
+	df = _download_with_retries(
+		symbol, interval=interval, auto_adjust=auto_adjust,
+		max_retries=max_retries, backoff_sec=backoff_sec, limiter=limiter, period=period,
+	)
+	df = _normalize_ohlcv(df)
+
+	if df.empty:
+		raise ValueError("DataFrame became empty after column selection / dropna.")
+
+	return to_compact(df) if compact else df
+
+
+def _is_rate_limited(exc: Exception) -> bool:
+	"""Heuristic for Yahoo throttling (YFRateLimitError / HTTP 429)."""
+	text = f"{type(exc).__name__} {exc}".lower()
+	return "ratelimit" in text or "rate limit" in text or "429" in text or "too many requests" in text
+
+
+def _download_with_retries(
+	symbol: str,
+	interval: str,
+	auto_adjust: bool = True,
+	max_retries: int = 3,
+	backoff_sec: float = 1.0,
+	limiter: Optional[TokenBucket] = None,
+	**window,
+) -> pd.DataFrame:
+	"""Call `yf.download` with exponential backoff.
+
+	`window` is forwarded verbatim: either `period=` or `start=`/`end=`.
+	With a shared `limiter`, every attempt takes a token and a rate-limit
+	error pauses all workers sharing it rather than just this one.
+	Raises the last exception once retries are exhausted.
+	"""
 	for attempt in range(1, max_retries + 1):
+		if limiter is not None:
+			limiter.acquire()
 		try:
 			df = yf.download(
-				symbol, period=period, interval=interval, auto_adjust=auto_adjust, progress=False
+				symbol, **window, interval=interval, auto_adjust=auto_adjust, progress=False
 			)
 			if df is None or df.empty:
 				raise ValueError(
-					f"Empty data from yfinance for {symbol} (period={period}, interval={interval}). "
+					f"Empty data from yfinance for {symbol} ({window}, interval={interval}). "
 					"Try shortening period or switching interval."
 				)
-			# success
-			last_exc = None
-			break
+			return df
 		except Exception as exc:  # pragma: no cover - network related
-			last_exc = exc
 			if attempt < max_retries:
-				sleep = backoff_sec * (2 ** (attempt - 1))
 				# exponential backoff
-				time.sleep(sleep)
+				delay = backoff_sec * (2 ** (attempt - 1))
+				if limiter is not None and _is_rate_limited(exc):
+					limiter.backoff(delay)
+				else:
+					time.sleep(delay)
 				continue
 			# no more retries, re-raise for the caller to handle
 			raise
 
-	# Ensure timezone-awareness and convert to HK time
-	if df.index.tz is None:
-		# yfinance intraday often returns UTC-naive; assume UTC
-		df = df.tz_localize("UTC")
-		df = df.tz_convert(HK_TZ)
 
-	# Keep standard columns only
-	cols = ["Open", "High", "Low", "Close", "Volume"]
-	df = df[cols].dropna()
+def _period_to_offset(period: str) -> Optional[pd.DateOffset]:
+	"""Translate a yfinance period ("730d", "6mo", "2y", "max") to a DateOffset."""
+	if period == "max":
+		return None
+	for suffix, key in (("mo", "months"), ("wk", "weeks"), ("d", "days"), ("y", "years")):
+		if period.endswith(suffix):
+			return pd.DateOffset(**{key: int(period[: -len(suffix)])})
+	raise ValueError(f"Unsupported period: {period!r}")
 
-	if df.empty:
-		raise ValueError("DataFrame became empty after column selection / dropna.")
 
-	return df
+def sync_ohlcv(
+	symbol: str,
+	interval: Literal["1d", "60m", "30m", "15m", "5m", "1m"] = "60m",
+	period: str = "730d",
+	store_dir: str = "data/cache",
+	calendar: Optional[HKEXCalendar] = None,
+	now: Optional[pd.Timestamp] = None,
+	auto_adjust: bool = True,
+	max_retries: int = 3,
+	backoff_sec: float = 1.0,
+	limiter: Optional[TokenBucket] = None,
+) -> pd.DataFrame:
+	"""Bring the stored bars for `symbol`/`interval` up to date and return them.
 
+	The first call downloads the full `period` into the `OHLCVStore`. Later
+	calls look up the latest stored timestamp and only fetch the missing tail.
+	Gap detection uses the HKEX calendar, so lunch breaks, nights, weekends
+	and holidays do not trigger a request. Only completed bars are persisted;
+	the in-progress bar is picked up by the next sync.
 
-def load_local_ohlcv(symbol: str, data_dir: str = "data") -> Optional[pd.DataFrame]:
-	"""Load a local CSV for `symbol` if present.
+	Parameters
+	----------
+	symbol, interval, auto_adjust, max_retries, backoff_sec, limiter : see `download_ohlcv`.
+	period : str
+	Window used for the initial fill and for the returned slice.
+	store_dir : str
+	Root of the `OHLCVStore` (shared with `download_ohlcv_chunked`).
+	calendar : HKEXCalendar, optional
+	Trading calendar; defaults to `HKEXCalendar()`.
+	now : pd.Timestamp, optional
+	Reference time (for tests / replay); defaults to the current HK time.
 
-	The function looks for filenames in this order:
-	  1. {data_dir}/{symbol}.csv
-	  2. {data_dir}/{symbol}_historical_data.csv
+	Returns
+	-------
+	pd.DataFrame
+		Stored bars within `period` of `now` (tz-aware in Asia/Hong_Kong).
+	"""
+	store = OHLCVStore(store_dir)
+	calendar = calendar or HKEXCalendar()
+	now = pd.Timestamp.now(tz=HK_TZ) if now is None else now.tz_convert(HK_TZ)
+
+	cov = store.coverage(symbol, interval)
+	if cov is None:
+		fresh = _download_with_retries(
+			symbol, interval=interval, auto_adjust=auto_adjust,
+			max_retries=max_retries, backoff_sec=backoff_sec, limiter=limiter, period=period,
+		)
+	elif calendar.has_new_bar(cov[1], now, interval):
+		# refetch from the day of the last stored bar; the store drops overlap
+		fresh = _download_with_retries(
+			symbol, interval=interval, auto_adjust=auto_adjust,
+			max_retries=max_retries, backoff_sec=backoff_sec, limiter=limiter,
+			start=cov[1].strftime("%Y-%m-%d"),
+			end=(now + pd.Timedelta(days=1)).strftime("%Y-%m-%d"),
+		)
+	else:
+		fresh = None
 
-	Expected CSV format (as provided by the user):
-	  - columns: date, Close, High, Low, Open, Volume
-	  - daily bars, date column is parsed as index
-	  - tz is ignored (tz-naive)
+	if fresh is not None:
+		fresh = _normalize_ohlcv(fresh)
+		fresh = fresh[calendar.completed(fresh.index, now, interval).to_numpy()]
+		store.append(symbol, interval, fresh)
 
-	Returns a DataFrame with columns ordered as [Open, High, Low, Close, Volume]
-	and a DatetimeIndex, or None if no local file is found.
+	offset = _period_to_offset(period)
+	start = None if offset is None else now - offset
+	df = store.read(symbol, interval, start=start)
+	if df.empty:
+		raise ValueError(f"No stored bars for {symbol} ({interval}) after sync.")
+	return df
+
+
+def download_many(
+	symbols: Iterable[str],
+	period: str = "730d",
+	interval: Literal["1d", "60m", "30m", "15m", "5m", "1m"] = "60m",
+	max_workers: int = 8,
+	rate_per_sec: float = 2.0,
+	burst: Optional[float] = None,
+	limiter: Optional[TokenBucket] = None,
+	**kwargs,
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Exception]]:
+	"""Download many symbols concurrently under one global rate limit.
+
+	Fetches run on a thread pool (the work is I/O bound) and all go through a
+	single `TokenBucket`, so total request throughput stays at
+	`rate_per_sec` however many workers there are, and a 429 seen by one
+	worker backs off all of them.
+
+	Parameters
+	----------
+	symbols : Iterable[str]
+		Tickers, e.g. the Hang Seng constituents.
+	period, interval : see `download_ohlcv`.
+	max_workers : int
+		Thread pool size.
+	rate_per_sec, burst : float
+		Token-bucket rate and capacity, used when `limiter` is not given.
+	limiter : TokenBucket, optional
+		Share one limiter across several `download_many` calls.
+	**kwargs
+		Forwarded to `download_ohlcv` (max_retries, backoff_sec, incremental, ...).
+
+	Returns
+	-------
+	(frames, errors)
+		frames : {symbol: DataFrame} for symbols that succeeded.
+		errors : {symbol: exception} for symbols that failed after retries.
 	"""
-	candidates = [
-		os.path.join(data_dir, f"{symbol}.csv"),
-		os.path.join(data_dir, f"{symbol}_historical_data.csv"),
-	]
+	limiter = limiter or TokenBucket(rate_per_sec, burst)
+	symbols = list(dict.fromkeys(symbols))
 
-	for path in candidates:
-		if os.path.exists(path):
-			# Some CSVs may contain multi-line headers (e.g. 'Price,Close,...' then 'Ticker,...' then 'Date')
-			# We'll scan for the first data line that looks like a date (YYYY-)
-			import io
-			import re
-
-			with open(path, "r", encoding="utf-8", errors="ignore") as fh:
-				lines = fh.readlines()
-
-			# find first line that starts with a date-like token
-			data_start = None
-			date_re = re.compile(r"^\d{4}-\d{2}-\d{2}")
-			for i, line in enumerate(lines):
-				if date_re.match(line.strip()):
-					data_start = i
-					break
-
-			if data_start is None:
-				# fallback: try pandas normal read and hope for the best
-				df = pd.read_csv(path)
-			else:
-				data_text = "".join(lines[data_start:])
-				df = pd.read_csv(io.StringIO(data_text), header=None)
-				# assign expected columns: date, Close, High, Low, Open, Volume
-				expected = ["date", "Close", "High", "Low", "Open", "Volume"]
-				if df.shape[1] >= 6:
-					df = df.iloc[:, :6]
-					df.columns = expected
-				else:
-					# if malformed, try a normal read and continue
-					df = pd.read_csv(path)
-
-			# assume first column is date if named 'date' or not
-			if "date" in df.columns:
-				df = df.set_index("date")
-			else:
-				df = df.set_index(df.columns[0])
-
-			# normalize column names
-			df = df.rename(columns={
-				"close": "Close",
-				"open": "Open",
-				"high": "High",
-				"low": "Low",
-				"volume": "Volume",
-			})
-
-			# keep required columns and order
-			cols = [c for c in ["Open", "High", "Low", "Close", "Volume"] if c in df.columns]
-			df = df[cols].copy()
-
-			# ensure datetimeindex
-			if not isinstance(df.index, pd.DatetimeIndex):
-				df.index = pd.to_datetime(df.index)
-
-			# return tz-naive daily bars (user requested to ignore tz)
-			return df
+	def _one(sym: str) -> pd.DataFrame:
+		return download_ohlcv(sym, period=period, interval=interval, limiter=limiter, **kwargs)
 
-	return None
+	frames: Dict[str, pd.DataFrame] = {}
+	errors: Dict[str, Exception] = {}
+	with ThreadPoolExecutor(max_workers=max_workers) as pool:
+		futures = {sym: pool.submit(_one, sym) for sym in symbols}
+		for sym, fut in futures.items():
+			try:
+				frames[sym] = fut.result()
+			except Exception as exc:
+				errors[sym] = exc
+	return frames, errors
 
 
 def download_ohlcv_chunked(
@@ -256,7 +505,7 @@ def download_ohlcv_chunked(
 	max_retries: int = 6,
 	backoff_sec: float = 2.0,
 ) -> pd.DataFrame:
-	"""Download OHLCV in time chunks and optionally cache each chunk.
+	"""Download OHLCV in time chunks, persisting them in a partitioned store.
 
 	This splits the requested time range into pieces (by years) and downloads
 	each piece separately. This helps avoid rate-limits for very long periods
@@ -269,8 +518,8 @@ def download_ohlcv_chunked(
 		provided, `period` will be used to compute start relative to now.
 	period: yfinance-style period (e.g., "15y"). Used only when start is None.
 	chunk_years: number of years per chunk (default 1).
-	cache_dir: directory to save per-chunk cache files (.parquet preferred,
-		falls back to .csv if parquet support missing).
+	cache_dir: root of the `OHLCVStore` (symbol/interval/year Parquet
+		partitions). Chunks already covered by the store are not re-downloaded.
 	max_retries, backoff_sec: retry/backoff for each chunk.
 
 	Returns
@@ -279,6 +528,63 @@ def download_ohlcv_chunked(
 		Combined DataFrame with Open/High/Low/Close/Volume indexed by tz-aware
 		DatetimeIndex in Asia/Hong_Kong.
 	"""
+	synced = _sync_chunks(
+		symbol, start, end, period, interval, chunk_years, chunk_months, cache_dir, max_retries, backoff_sec
+	)
+	if isinstance(synced, pd.DataFrame):
+		return synced
+	store, start_ts, end_ts = synced
+
+	# single pruned scan; parts are non-overlapping so the result is already sorted
+	df_all = store.read(symbol, interval, start=start_ts, end=end_ts)
+
+	if df_all.empty:
+		raise ValueError("No data frames were downloaded; try shorter chunks or increase retries.")
+
+	return df_all
+
+
+def iter_ohlcv_chunked(
+	symbol: str,
+	start: Optional[str] = None,
+	end: Optional[str] = None,
+	period: Optional[str] = None,
+	interval: Literal["1d", "60m", "30m", "15m", "5m", "1m"] = "1d",
+	chunk_years: int = 1,
+	chunk_months: Optional[int] = None,
+	cache_dir: str = "data/cache",
+	max_retries: int = 6,
+	backoff_sec: float = 2.0,
+	batch_rows: int = 1_000_000,
+) -> Iterator[pd.DataFrame]:
+	"""Streaming form of `download_ohlcv_chunked`: yield sorted bar chunks.
+
+	Downloads/stores exactly as `download_ohlcv_chunked`, then scans the
+	store in record batches of at most `batch_rows` rows instead of building
+	one frame, so histories larger than RAM can be fed to
+	`models.streaming.iter_features`.
+	"""
+	synced = _sync_chunks(
+		symbol, start, end, period, interval, chunk_years, chunk_months, cache_dir, max_retries, backoff_sec
+	)
+	if isinstance(synced, pd.DataFrame):
+		yield synced
+		return
+	store, start_ts, end_ts = synced
+	empty = True
+	for chunk in store.iter_read(symbol, interval, start=start_ts, end=end_ts, batch_rows=batch_rows):
+		empty = False
+		yield chunk
+	if empty:
+		raise ValueError("No data frames were downloaded; try shorter chunks or increase retries.")
+
+
+def _sync_chunks(symbol, start, end, period, interval, chunk_years, chunk_months, cache_dir, max_retries, backoff_sec):
+	"""Fetch the chunks missing from the store; return (store, start_ts, end_ts).
+
+	A period yfinance must interpret itself is fetched in one shot and
+	returned as a frame instead.
+	"""
 	os.makedirs(cache_dir, exist_ok=True)
 
 	# Resolve start/end from period if necessary
@@ -315,75 +621,26 @@ def download_ohlcv_chunked(
 		chunks.append((cur_start, cur_end))
 		cur_start = cur_end + pd.Timedelta(days=1)
 
-	frames = []
+	store = OHLCVStore(cache_dir)
+
 	for s_ts, e_ts in chunks:
+		# yfinance is asked for whole days [s, e + 1 day)
+		lo = s_ts.normalize()
+		hi = e_ts.normalize() + pd.Timedelta(days=1) - pd.Timedelta(1, unit="ns")
+		# only chunks already fetched in full are skipped, wherever they lie
+		# relative to the stored bars; the store keeps only new rows
+		if store.is_covered(symbol, interval, lo, hi):
+			continue
+
 		s_str = s_ts.strftime("%Y-%m-%d")
 		e_str = e_ts.strftime("%Y-%m-%d")
-		cache_file_parquet = os.path.join(cache_dir, f"{symbol.replace('/','_')}_{s_str}_{e_str}.parquet")
-		cache_file_csv = os.path.join(cache_dir, f"{symbol.replace('/','_')}_{s_str}_{e_str}.csv")
-
-		# try cache
-		if os.path.exists(cache_file_parquet):
-			try:
-				df_chunk = pd.read_parquet(cache_file_parquet)
-				frames.append(df_chunk)
-				continue
-			except Exception:
-				pass
-		if os.path.exists(cache_file_csv):
-			try:
-				df_chunk = pd.read_csv(cache_file_csv, index_col=0, parse_dates=True)
-				# ensure tz
-				if df_chunk.index.tz is None:
-					df_chunk = df_chunk.tz_localize(HK_TZ)
-				frames.append(df_chunk)
-				continue
-			except Exception:
-				pass
-
-		# no cache: download single chunk with retries
-		last_exc = None
-		for attempt in range(1, max_retries + 1):
-			try:
-				df_chunk = yf.download(symbol, start=s_str, end=(pd.to_datetime(e_str) + pd.Timedelta(days=1)).strftime("%Y-%m-%d"), interval=interval, auto_adjust=True, progress=False)
-				if df_chunk is None or df_chunk.empty:
-					raise ValueError(f"Empty data from yfinance for {symbol} (start={s_str}, end={e_str}, interval={interval}).")
-				last_exc = None
-				break
-			except Exception as exc:  # pragma: no cover - network related
-				last_exc = exc
-				if attempt < max_retries:
-					sleep = backoff_sec * (2 ** (attempt - 1))
-					time.sleep(sleep)
-					continue
-				raise
-
-		# tz handling
-		if df_chunk.index.tz is None:
-			df_chunk = df_chunk.tz_localize("UTC").tz_convert(HK_TZ)
-
-		df_chunk = df_chunk[["Open", "High", "Low", "Close", "Volume"]].dropna()
-
-		# cache chunk: prefer parquet, fall back to csv
-		try:
-			df_chunk.to_parquet(cache_file_parquet)
-		except Exception:
-			try:
-				df_chunk.to_csv(cache_file_csv)
-			except Exception:
-				# ignore caching errors
-				pass
-
-		frames.append(df_chunk)
-
-	if not frames:
-		raise ValueError("No data frames were downloaded; try shorter chunks or increase retries.")
-
-	# concat, sort, dedupe by index
-	df_all = pd.concat(frames).sort_index()
-	df_all = df_all[~df_all.index.duplicated(keep="first")]
 
-	if df_all.index.tz is None:
-		df_all = df_all.tz_localize(HK_TZ)
+		df_chunk = _download_with_retries(
+			symbol, interval=interval, max_retries=max_retries, backoff_sec=backoff_sec,
+			start=s_str, end=(pd.to_datetime(e_str) + pd.Timedelta(days=1)).strftime("%Y-%m-%d"),
+		)
+		store.append(symbol, interval, _normalize_ohlcv(df_chunk))
+		# bars after "now" may still come, so the chunk reaching today stays open
+		store.mark_fetched(symbol, interval, lo, min(hi, now))
 
-	return df_all
\ No newline at end of file
+	return store, start_ts, end_ts + pd.Timedelta(days=1) - pd.Timedelta(1, unit="ns")
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""Thread-safe token-bucket rate limiter shared by concurrent downloads."""
+from __future__ import annotations
+
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+	"""Token bucket with a coordinated, bucket-wide backoff.
+
+	Every request takes one token; tokens refill at `rate` per second up to
+	`capacity`. When any worker hits a rate limit it calls `backoff`, which
+	pauses *all* workers and drains the bucket so they resume at the steady
+	rate instead of bursting back into another 429.
+
+	Parameters
+	----------
+	rate : float
+	Sustained requests per second.
+	capacity : float, optional
+	Maximum burst size; defaults to `max(1, rate)`.
+	clock, sleep : callable
+	Injectable time source / sleeper (tests use a fake clock).
+	"""
+
+	def __init__(
+		self,
+		rate: float,
+		capacity: Optional[float] = None,
+		clock: Callable[[], float] = time.monotonic,
+		sleep: Callable[[float], None] = time.sleep,
+	) -> None:
+		if rate <= 0:
+			raise ValueError("rate must be positive")
+		self.rate = float(rate)
+		self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+		self._clock = clock
+		self._sleep = sleep
+		self._lock = threading.Lock()
+		self._tokens = self.capacity
+		# refill accrues from _last; a backoff moves it into the future
+		self._last = clock()
+
+	def _refill(self, now: float) -> None:
+		if now > self._last:
+			self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+			self._last = now
+
+	def acquire(self, tokens: float = 1.0) -> float:
+		"""Block until `tokens` are available; return the seconds waited."""
+		waited = 0.0
+		while True:
+			with self._lock:
+				now = self._clock()
+				self._refill(now)
+				if now >= self._last and self._tokens >= tokens:
+					self._tokens -= tokens
+					return waited
+				if now < self._last:
+					wait = self._last - now + tokens / self.rate
+				else:
+					wait = (tokens - self._tokens) / self.rate
+			self._sleep(wait)
+			waited += wait
+
+	def backoff(self, seconds: float) -> None:
+		"""Pause every caller for at least `seconds` and drain the bucket."""
+		with self._lock:
+			resume = self._clock() + seconds
+			if resume > self._last:
+				self._last = resume
+			self._tokens = 0.0
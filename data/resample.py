@@ -0,0 +1,288 @@
+"""Calendar-aware resampling of stored fine bars into coarser intervals.
+
+Coarser bars follow the `HKEXCalendar` conventions: they are labelled by
+their start time, bucketed from each session's open and truncated at its
+close, so the 60m bars of a full day are 09:30, 10:30, 11:30, 13:00, 14:00
+and 15:00 (never a bar straddling lunch), half-days only have a morning,
+and daily bars are labelled at local midnight. Fine bars on holidays or
+outside the sessions are dropped; prints of the closing auction (the 10
+minutes after the last close of the day, which yfinance stamps 16:00) are
+folded into the day's last bar.
+
+`resample_ohlcv` aggregates a sorted frame in one vectorized pass: labels
+are computed with integer arithmetic on the nanosecond index and the
+OHLCV reductions run as `ufunc.reduceat` over the label runs
+(`resample_panel` does the same for a long multi-symbol frame at once).
+`ResampledBars` caches the result next to the base bars in an
+`OHLCVStore`, so each coarse bar is aggregated once and multi-timeframe
+readers never touch the network::
+
+	bars = ResampledBars(OHLCVStore("data/cache"), base_interval="1m")
+	daily = bars.get("0700.HK", "1d")
+	hourly = bars.get("0700.HK", "60m", start="2025-01-01")
+"""
+from __future__ import annotations
+
+
+import shutil
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.calendar import AFTERNOON_SESSION, HK_TZ, MORNING_SESSION, HKEXCalendar, interval_to_timedelta
+from data.store import OHLCVStore
+
+
+CLOSING_AUCTION = pd.Timedelta(minutes=10)
+
+_DAY_NS = pd.Timedelta(days=1).value
+# Hong Kong has kept UTC+8 without DST since 1979; a fixed offset avoids a
+# per-element zoneinfo lookup in tz_localize
+_HK_OFFSET_NS = pd.Timedelta(hours=8).value
+# midpoint of the lunch break: earlier times belong to the morning session
+_LUNCH_NS = pd.Timedelta(hours=12, minutes=30).value
+
+
+def _tod_ns(t) -> int:
+	return pd.Timedelta(hours=t.hour, minutes=t.minute).value
+
+
+def wall_clock_ns(index: pd.DatetimeIndex) -> np.ndarray:
+	"""Hong Kong wall-clock nanoseconds of `index` (tz-naive values are taken as local)."""
+	return index.asi8 + _HK_OFFSET_NS if index.tz is not None else index.asi8
+
+
+def session_labels(
+	index: pd.DatetimeIndex,
+	interval: str,
+	calendar: Optional[HKEXCalendar] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+	"""Label of the `interval` bar each timestamp of `index` falls into.
+
+	Parameters
+	----------
+	index : pd.DatetimeIndex
+	Bar start times; tz-naive values are taken as Hong Kong local time.
+	interval : str
+	Target interval ("5m", "15m", "60m", "1d", ...).
+	calendar : HKEXCalendar, optional
+	Trading calendar; defaults to `HKEXCalendar()`.
+
+	Returns
+	-------
+	(labels, valid) : tuple[np.ndarray, np.ndarray]
+	int64 local wall-clock nanoseconds of each bar's label, and a mask of
+	the timestamps that fall inside a session (labels are meaningless
+	where `valid` is False).
+	"""
+	calendar = calendar or HKEXCalendar()
+	step = interval_to_timedelta(interval).value
+	local = wall_clock_ns(index)
+	day = local - local % _DAY_NS
+	tod = local - day
+
+	# calendar lookups once per distinct day, not per bar
+	days, inverse = np.unique(day, return_inverse=True)
+	dates = pd.DatetimeIndex(days).date
+	trading = np.array([calendar.is_trading_day(d) for d in dates], dtype=bool)[inverse]
+	half = np.array([d in calendar.half_days for d in dates], dtype=bool)[inverse]
+
+	morning = tod < _LUNCH_NS
+	open_ = np.where(morning, _tod_ns(MORNING_SESSION[0]), _tod_ns(AFTERNOON_SESSION[0]))
+	length = np.where(
+		morning,
+		_tod_ns(MORNING_SESSION[1]) - _tod_ns(MORNING_SESSION[0]),
+		_tod_ns(AFTERNOON_SESSION[1]) - _tod_ns(AFTERNOON_SESSION[0]),
+	)
+	offset = tod - open_
+	last_session = ~morning | half
+	limit = length + np.where(last_session, CLOSING_AUCTION.value, 0)
+	valid = trading & (morning | ~half) & (offset >= 0) & (offset < limit)
+
+	if step >= _DAY_NS:
+		return day, valid
+	# auction prints belong to the last bar before the close
+	offset = np.minimum(offset, length - 1)
+	return day + open_ + offset // step * step, valid
+
+
+def resample_ohlcv(
+	df: pd.DataFrame,
+	interval: str,
+	calendar: Optional[HKEXCalendar] = None,
+) -> pd.DataFrame:
+	"""Aggregate fine OHLCV bars into session-aligned `interval` bars.
+
+
+	Parameters
+	----------
+	df : pd.DataFrame
+	Open/High/Low/Close/Volume bars of one symbol at an interval that
+	divides `interval` (e.g. 1m or 5m bars for 15m/60m/1d). Rows with NaN
+	are dropped; an unsorted index is sorted once.
+	interval : str
+	Target interval.
+	calendar : HKEXCalendar, optional
+	Trading calendar; defaults to `HKEXCalendar()`.
+
+
+	Returns
+	-------
+	pd.DataFrame
+	One row per non-empty coarse bar, labelled by its start time in the
+	index's timezone (tz-naive in, tz-naive out). Open/Close come from
+	the first/last fine bar, High/Low are the extremes and Volume the sum;
+	price dtypes are kept, integer Volume is summed in int64.
+	"""
+	if df.isna().to_numpy().any():
+		df = df.dropna()
+	if not df.index.is_monotonic_increasing:
+		df = df.sort_index()
+	labels, valid = session_labels(df.index, interval, calendar)
+	if not valid.all():
+		df, labels = df[valid], labels[valid]
+
+	if df.empty:
+		return df.iloc[:0]
+
+	starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+	if df.index.tz is None:
+		index = pd.DatetimeIndex(labels[starts])
+	else:
+		index = pd.DatetimeIndex(labels[starts] - _HK_OFFSET_NS, tz="UTC").tz_convert(df.index.tz)
+	return _aggregate(df, starts, index)
+
+
+def _aggregate(df: pd.DataFrame, starts: np.ndarray, index: pd.Index) -> pd.DataFrame:
+	"""OHLCV of the row runs beginning at `starts`, one row per run."""
+	ends = np.r_[starts[1:], len(df)] - 1
+	vol = df["Volume"].to_numpy()
+	return pd.DataFrame(
+		{
+			"Open": df["Open"].to_numpy()[starts],
+			"High": np.maximum.reduceat(df["High"].to_numpy(), starts),
+			"Low": np.minimum.reduceat(df["Low"].to_numpy(), starts),
+			"Close": df["Close"].to_numpy()[ends],
+			"Volume": np.add.reduceat(vol, starts, dtype=np.int64 if vol.dtype.kind in "iu" else None),
+		},
+		index=index,
+	)
+
+
+def resample_panel(
+	data: pd.DataFrame,
+	interval: str,
+	calendar: Optional[HKEXCalendar] = None,
+) -> pd.DataFrame:
+	"""`resample_ohlcv` for a long (symbol, timestamp) frame of many symbols at once.
+
+	Labels for every row come from one `session_labels` call and the runs are
+	split wherever the symbol or the label changes, so the whole universe is
+	aggregated in a single pass. Returns a long (symbol, label) frame whose
+	`xs(symbol)` equals `resample_ohlcv` of that symbol's bars.
+	"""
+	if data.isna().to_numpy().any():
+		data = data.dropna()
+	if not data.index.is_monotonic_increasing:
+		data = data.sort_index()
+	idx = data.index.remove_unused_levels()
+	stamps = idx.get_level_values(1)
+	labels, valid = session_labels(stamps, interval, calendar)
+	codes = idx.codes[0]
+	if not valid.all():
+		data, labels, codes = data[valid], labels[valid], codes[valid]
+	if data.empty:
+		return data.iloc[:0]
+
+	starts = np.flatnonzero(np.r_[True, (labels[1:] != labels[:-1]) | (codes[1:] != codes[:-1])])
+	if stamps.tz is None:
+		level = pd.DatetimeIndex(labels[starts])
+	else:
+		level = pd.DatetimeIndex(labels[starts] - _HK_OFFSET_NS, tz="UTC").tz_convert(stamps.tz)
+	level_codes, level_values = pd.factorize(level, sort=True)
+	index = pd.MultiIndex(
+		levels=[idx.levels[0], level_values],
+		codes=[codes[starts], level_codes],
+		names=idx.names,
+		verify_integrity=False,
+	)
+	return _aggregate(data, starts, index)
+
+
+class ResampledBars:
+	"""Coarse intervals derived from base bars in an `OHLCVStore`, cached there.
+
+	Derived bars are stored as their own series (interval key
+	"{interval}.from-{base_interval}") in the same store, so they get its
+	append-only layout, pruned reads and coverage bookkeeping. A refresh
+	only aggregates base bars after the last cached coarse bar, and only
+	completed coarse bars are cached: a bar is written once a later base
+	bar exists or the base data reaches its calendar end, so a bar still
+	being traded is picked up by the next refresh instead of being frozen
+	half-built.
+
+	Parameters
+	----------
+	store : OHLCVStore
+	Store holding the base bars (e.g. the one `sync_ohlcv` fills).
+	base_interval : str
+	Interval of the stored base bars.
+	calendar : HKEXCalendar, optional
+	Trading calendar; defaults to `HKEXCalendar()`.
+	"""
+
+	def __init__(
+		self,
+		store: OHLCVStore,
+		base_interval: str = "1m",
+		calendar: Optional[HKEXCalendar] = None,
+	) -> None:
+		self.store = store
+		self.base_interval = base_interval
+		self.calendar = calendar or HKEXCalendar()
+
+	def cache_key(self, interval: str) -> str:
+		"""Store interval key of the cached `interval` series."""
+		return f"{interval}.from-{self.base_interval}"
+
+	def _check(self, interval: str) -> None:
+		step = interval_to_timedelta(interval)
+		base = interval_to_timedelta(self.base_interval)
+		if step < pd.Timedelta(days=1) and (step < base or step % base):
+			raise ValueError(f"Cannot derive {interval} bars from {self.base_interval} bars.")
+
+	def refresh(self, symbol: str, interval: str) -> int:
+		"""Aggregate base bars not yet cached; return the number of coarse bars written."""
+		self._check(interval)
+		base_cov = self.store.coverage(symbol, self.base_interval)
+		if base_cov is None:
+			return 0
+		key = self.cache_key(interval)
+		cov = self.store.coverage(symbol, key)
+		base_end = base_cov[1] + interval_to_timedelta(self.base_interval)
+		if cov is not None:
+			first, _ = session_labels(pd.DatetimeIndex([base_cov[0]]), interval, self.calendar)
+			if pd.Timestamp(first[0]).tz_localize(HK_TZ) < cov[0]:
+				# base history was extended backwards: rebuild from scratch
+				shutil.rmtree(self.store.series_dir(symbol, key))
+				cov = None
+			else:
+				next_label = self.calendar.next_bar_label(cov[1], interval)
+				if next_label is not None and base_end < self.calendar.bar_end(next_label, interval):
+					# the bar after the cached ones cannot be complete yet
+					return 0
+
+		# base rows of the last cached bar are re-read so its successor starts clean
+		base = self.store.read(symbol, self.base_interval, start=None if cov is None else cov[1])
+		bars = resample_ohlcv(base, interval, self.calendar)
+		if cov is not None:
+			bars = bars[bars.index > cov[1]]
+		if not bars.empty and self.calendar.bar_end(bars.index[-1], interval) > base_end:
+			bars = bars.iloc[:-1]
+		return self.store.append(symbol, key, bars)
+
+	def get(self, symbol: str, interval: str, start=None, end=None) -> pd.DataFrame:
+		"""Completed `interval` bars of `symbol` in [start, end], refreshing the cache first."""
+		self.refresh(symbol, interval)
+		return self.store.read(symbol, self.cache_key(interval), start=start, end=end)
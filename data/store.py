@@ -0,0 +1,321 @@
+"""Partitioned columnar (Parquet) store for OHLCV bars.
+
+Layout on disk::
+
+	{root}/{symbol}/{interval}/year=YYYY/part-{first_ns}-{last_ns}.parquet
+
+Each part file holds a sorted, de-duplicated run of bars. Writes are
+append-only: new rows before, between or after the stored parts are written
+as new part files (one per gap and year), and only a row falling inside an
+existing part's span rewrites that part (as does `compact`). Because parts
+never overlap and their names sort chronologically, a read is a single scan
+over the pruned file list that comes back already sorted — no global
+concat / sort / dedupe is needed.
+
+Which time ranges were fully fetched is tracked separately in a small
+`fetched.json` manifest per series (`mark_fetched` / `is_covered`): a
+range with no bars (holidays, a halt) is indistinguishable from a missing
+one by the parts alone.
+"""
+from __future__ import annotations
+
+
+import json
+import os
+from typing import Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+
+HK_TZ = ZoneInfo("Asia/Hong_Kong")
+TS_COL = "timestamp"
+OHLCV_COLS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _to_hk(ts) -> pd.Timestamp:
+	"""Coerce a date-like into a tz-aware Asia/Hong_Kong Timestamp."""
+	ts = pd.Timestamp(ts)
+	if ts.tzinfo is None:
+		return ts.tz_localize(HK_TZ)
+	return ts.tz_convert(HK_TZ)
+
+
+def _merge_ranges(ranges) -> List[Tuple[int, int]]:
+	"""Union of inclusive [lo, hi] ns ranges as sorted, disjoint ranges."""
+	out: List[Tuple[int, int]] = []
+	for lo, hi in sorted(ranges):
+		if out and lo <= out[-1][1] + 1:
+			out[-1] = (out[-1][0], max(out[-1][1], hi))
+		else:
+			out.append((lo, hi))
+	return out
+
+
+class OHLCVStore:
+	"""Append-only Parquet store keyed by symbol / interval / year.
+
+	Parameters
+	----------
+	root : str
+	Root directory of the store.
+	"""
+
+	def __init__(self, root: str = "data/store") -> None:
+		self.root = root
+
+	# ---------------- layout ---------------- #
+
+	def series_dir(self, symbol: str, interval: str) -> str:
+		return os.path.join(self.root, symbol.replace("/", "_"), interval)
+
+	def _parts(self, symbol: str, interval: str, years: Optional[range] = None) -> List[Tuple[int, int, str]]:
+		"""Return (first_ns, last_ns, path) for every part, in chronological order."""
+		base = self.series_dir(symbol, interval)
+		if not os.path.isdir(base):
+			return []
+		parts = []
+		for year_dir in sorted(os.listdir(base)):
+			if not year_dir.startswith("year="):
+				continue
+			if years is not None and int(year_dir[5:]) not in years:
+				continue
+			ydir = os.path.join(base, year_dir)
+			for name in sorted(os.listdir(ydir)):
+				if not (name.startswith("part-") and name.endswith(".parquet")):
+					continue
+				first_ns, last_ns = name[5:-8].split("-")
+				parts.append((int(first_ns), int(last_ns), os.path.join(ydir, name)))
+		parts.sort()
+		return parts
+
+	def coverage(self, symbol: str, interval: str) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+		"""Return the (first, last) stored timestamps, or None if nothing is stored.
+
+		Read from part file names only, so this costs no Parquet I/O.
+		"""
+		parts = self._parts(symbol, interval)
+		if not parts:
+			return None
+		first = pd.Timestamp(parts[0][0], tz="UTC").tz_convert(HK_TZ)
+		last = pd.Timestamp(parts[-1][1], tz="UTC").tz_convert(HK_TZ)
+		return first, last
+
+	# ---------------- write ---------------- #
+
+	def append(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+		"""Append bars to the store and return the number of rows written.
+
+		Rows are placed against the span [first, last] of every stored part:
+		rows in the gaps before, between or after the parts are written as
+		new parts (one per gap and year), so interior backfills land too.
+		Rows inside a part's span are only written if that part lacks their
+		timestamp, by rewriting it. The incoming frame is sorted/deduped once
+		here, never on read.
+		"""
+		if df is None or df.empty:
+			return 0
+
+		df = df[[c for c in OHLCV_COLS if c in df.columns]]
+		if df.index.tz is None:
+			df = df.tz_localize(HK_TZ)
+		else:
+			df = df.tz_convert(HK_TZ)
+		df = df.sort_index()
+		df = df[~df.index.duplicated(keep="first")]
+
+		parts = self._parts(symbol, interval)
+		if parts:
+			firsts = np.array([p[0] for p in parts], dtype=np.int64)
+			lasts = np.array([p[1] for p in parts], dtype=np.int64)
+			ts = df.index.asi8
+			# slot k: the newest part starting at or before the row (-1: none)
+			slot = np.searchsorted(firsts, ts, side="right") - 1
+			inside = (slot >= 0) & (ts <= lasts[np.maximum(slot, 0)])
+		else:
+			slot = np.full(len(df), -1)
+			inside = np.zeros(len(df), dtype=bool)
+
+		written = 0
+		for k in np.unique(slot[inside]):
+			written += self._merge_into(symbol, interval, parts[k][2], df[inside & (slot == k)])
+
+		# rows in the same gap share a slot; one new part per (gap, year) so
+		# parts never overlap
+		gaps = df[~inside]
+		gap_slot = slot[~inside]
+		for k in np.unique(gap_slot):
+			run = gaps[gap_slot == k]
+			for year, chunk in run.groupby(run.index.year, sort=True):
+				self._write_part(symbol, interval, int(year), chunk)
+				written += len(chunk)
+		return written
+
+	def _merge_into(self, symbol: str, interval: str, path: str, rows: pd.DataFrame) -> int:
+		"""Rewrite the part at `path` with the `rows` (inside its span) it lacks."""
+		stored = pq.read_table(path).to_pandas().set_index(TS_COL)
+		stored.index = stored.index.tz_convert(HK_TZ)
+		rows = rows[~rows.index.isin(stored.index)]
+		if rows.empty:
+			return 0
+		frame = pd.concat([stored, rows[stored.columns]]).sort_index()
+		# same span, same name: the rewrite replaces the part atomically
+		self._write_part(symbol, interval, int(os.path.basename(os.path.dirname(path))[5:]), frame)
+		return len(rows)
+
+	def _write_part(self, symbol: str, interval: str, year: int, chunk: pd.DataFrame) -> str:
+		ydir = os.path.join(self.series_dir(symbol, interval), f"year={year:04d}")
+		os.makedirs(ydir, exist_ok=True)
+		first_ns = chunk.index[0].value
+		last_ns = chunk.index[-1].value
+		path = os.path.join(ydir, f"part-{first_ns:019d}-{last_ns:019d}.parquet")
+		frame = chunk.rename_axis(TS_COL).reset_index()
+		tmp = path + ".tmp"
+		pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), tmp)
+		# atomic publish so a crashed writer never leaves a half part visible
+		os.replace(tmp, path)
+		return path
+
+	def compact(self, symbol: str, interval: str) -> None:
+		"""Merge the parts of each year partition into a single file."""
+		base = self.series_dir(symbol, interval)
+		if not os.path.isdir(base):
+			return
+		for year_dir in sorted(os.listdir(base)):
+			if not year_dir.startswith("year="):
+				continue
+			ydir = os.path.join(base, year_dir)
+			parts = [p for p in self._parts(symbol, interval) if os.path.dirname(p[2]) == ydir]
+			if len(parts) < 2:
+				continue
+			table = ds.dataset([p[2] for p in parts], format="parquet").to_table()
+			frame = table.to_pandas().set_index(TS_COL)
+			frame.index = frame.index.tz_convert(HK_TZ)
+			self._write_part(symbol, interval, int(year_dir[5:]), frame)
+			for _, _, path in parts:
+				os.remove(path)
+
+	# ---------------- fetch coverage ---------------- #
+
+	def _manifest_path(self, symbol: str, interval: str) -> str:
+		return os.path.join(self.series_dir(symbol, interval), "fetched.json")
+
+	def fetched_ranges(self, symbol: str, interval: str) -> List[Tuple[int, int]]:
+		"""Disjoint inclusive [start_ns, end_ns] ranges known to be fully stored.
+
+		The union of the ranges recorded with `mark_fetched` and the span of
+		every part (a part holds every bar between its first and last row).
+		"""
+		ranges = [(first_ns, last_ns) for first_ns, last_ns, _ in self._parts(symbol, interval)]
+		path = self._manifest_path(symbol, interval)
+		if os.path.exists(path):
+			with open(path) as fh:
+				ranges += [tuple(r) for r in json.load(fh)]
+		return _merge_ranges(ranges)
+
+	def mark_fetched(self, symbol: str, interval: str, start, end) -> None:
+		"""Record that every bar in [start, end] has been fetched and appended."""
+		path = self._manifest_path(symbol, interval)
+		ranges = []
+		if os.path.exists(path):
+			with open(path) as fh:
+				ranges = [tuple(r) for r in json.load(fh)]
+		ranges = _merge_ranges(ranges + [(_to_hk(start).value, _to_hk(end).value)])
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		tmp = path + ".tmp"
+		with open(tmp, "w") as fh:
+			json.dump(ranges, fh)
+		os.replace(tmp, path)
+
+	def is_covered(self, symbol: str, interval: str, start, end) -> bool:
+		"""True if [start, end] lies inside a single fetched range."""
+		lo, hi = _to_hk(start).value, _to_hk(end).value
+		return any(a <= lo and hi <= b for a, b in self.fetched_ranges(symbol, interval))
+
+	# ---------------- read ---------------- #
+
+	def read(
+		self,
+		symbol: str,
+		interval: str,
+		start=None,
+		end=None,
+		columns: Optional[List[str]] = None,
+	) -> pd.DataFrame:
+		"""Read bars in [start, end] as one sorted frame.
+
+		Year partitions and part files outside the range are pruned by name;
+		the remaining time predicate is pushed down into the Parquet scan.
+		Returns an empty frame with OHLCV columns if nothing matches.
+		"""
+		files, start_ts, end_ts = self._select(symbol, interval, start, end)
+		cols = columns or OHLCV_COLS
+		if not files:
+			empty = pd.DataFrame(columns=cols, dtype="float64")
+			empty.index = pd.DatetimeIndex([], tz=HK_TZ, name=TS_COL)
+			return empty
+
+		flt = None
+		if start_ts is not None:
+			flt = ds.field(TS_COL) >= pa.scalar(start_ts, type=pa.timestamp("ns", tz="Asia/Hong_Kong"))
+		if end_ts is not None:
+			upper = ds.field(TS_COL) <= pa.scalar(end_ts, type=pa.timestamp("ns", tz="Asia/Hong_Kong"))
+			flt = upper if flt is None else flt & upper
+
+		dataset = ds.dataset(files, format="parquet")
+		table = dataset.to_table(columns=[TS_COL] + cols, filter=flt)
+		out = table.to_pandas().set_index(TS_COL)
+		out.index = out.index.tz_convert(HK_TZ)
+		return out
+
+	def iter_read(
+		self,
+		symbol: str,
+		interval: str,
+		start=None,
+		end=None,
+		columns: Optional[List[str]] = None,
+		batch_rows: int = 1_000_000,
+	) -> Iterator[pd.DataFrame]:
+		"""Stream bars in [start, end] as sorted frames of at most `batch_rows` rows.
+
+		Same pruning as `read`, but parts are scanned one record batch at a
+		time, so memory stays bounded by `batch_rows` whatever the range.
+		"""
+		files, start_ts, end_ts = self._select(symbol, interval, start, end)
+		cols = columns or OHLCV_COLS
+		for path in files:
+			for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows, columns=[TS_COL] + cols):
+				out = batch.to_pandas().set_index(TS_COL)
+				out.index = out.index.tz_convert(HK_TZ)
+				# only the first/last part can straddle the range
+				if start_ts is not None and out.index[0] < start_ts:
+					out = out[out.index >= start_ts]
+				if end_ts is not None and out.index[-1] > end_ts:
+					out = out[out.index <= end_ts]
+				if not out.empty:
+					yield out
+
+	def _select(self, symbol: str, interval: str, start=None, end=None):
+		"""(part paths overlapping [start, end], start_ts, end_ts), pruned by name."""
+		start_ts = _to_hk(start) if start is not None else None
+		end_ts = _to_hk(end) if end is not None else None
+
+		years = None
+		if start_ts is not None or end_ts is not None:
+			lo = start_ts.year if start_ts is not None else 0
+			hi = end_ts.year if end_ts is not None else 9999
+			years = range(lo, hi + 1)
+
+		files = []
+		for first_ns, last_ns, path in self._parts(symbol, interval, years):
+			if start_ts is not None and last_ns < start_ts.value:
+				continue
+			if end_ts is not None and first_ns > end_ts.value:
+				continue
+			files.append(path)
+		return files, start_ts, end_ts
@@ -3,14 +3,31 @@ from __future__ import annotations
 
 
 import argparse
-from typing import List
+import itertools
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
 
+import numpy as np
+import pandas as pd
 
-from data.downloader import download_ohlcv
-from models.logistic_model import train_predict
-from signals.adapter import to_entries_exits
-from backtest.vectorbt_engine import run_backtest
+
+from data.calendar import HKEXCalendar
+from data.downloader import download_ohlcv, iter_local_ohlcv, iter_ohlcv_chunked, to_compact
+from models.artifacts import load_artifact, train_artifact
+from models.feature_store import FeatureStore
+from models.logistic_model import FEATURE_SPECS, feature_lookback, train_predict
+from models.registry import available_models
+from models.streaming import iter_features, iter_predict, iter_signals
+from models.walk_forward import walk_forward_predict
+from signals.adapter import to_entries_exits, to_entries_exits_grid
+from backtest.costs import HKEXCostModel
+from backtest.metrics import METRICS
+from backtest.vectorbt_engine import run_backtest, run_sweep
 from config import DEFAULT_CONFIG
+from profiling import StageProfiler, detach, stage
 
 # ---------------- CLI ---------------- #
 
@@ -19,11 +36,42 @@ def parse_args() -> argparse.Namespace:
     """Parse command-line arguments for a single-symbol backtest run."""
     parser = argparse.ArgumentParser(description="HK 60m ML backtest")
     parser.add_argument("--symbol", default="0700.HK", help="Ticker, e.g., 0700.HK")
+    parser.add_argument("--symbols", nargs="+", default=None, help="Universe mode: run the pipeline for each ticker in a process pool")
+    parser.add_argument("--universe-file", default=None, help="Universe mode: file with one ticker per line (or a CSV whose first column is the ticker)")
+    parser.add_argument("--results", default="universe_results.csv", help="Universe mode: consolidated per-symbol results table (CSV)")
     parser.add_argument("--period", default="730d", help="yfinance period, e.g., 730d/365d")
     parser.add_argument("--interval", default="60m", help="Bar interval, e.g., 60m or 1d")
     parser.add_argument("--proba_th", type=float, default=0.55, help="Probability threshold for long entries")
     parser.add_argument("--train_ratio", type=float, default=DEFAULT_CONFIG["train_ratio"], help="Train split ratio")
     parser.add_argument("--force-remote", action="store_true", help="Ignore local CSVs and force remote yfinance download")
+    parser.add_argument("--incremental", action="store_true", help="Sync a local bar store and fetch only bars missing since the last run")
+    parser.add_argument("--resample-from", default=None, help="Sync this finer interval (e.g. 1m) and derive --interval from it locally, aligned to HKEX sessions")
+    parser.add_argument("--model", default="logistic", choices=available_models(), help="Classifier backend from the model registry")
+    parser.add_argument("--model-dir", default="data/models", help="Root directory of versioned model artifacts")
+    parser.add_argument("--save-model", action="store_true", help="Fit --model on all bars, write a new artifact version and exit")
+    parser.add_argument("--predict-only", action="store_true", help="Score the newest bars with the latest saved artifact (no training, no backtest)")
+    parser.add_argument("--predict-bars", type=int, default=1, help="Number of newest bars to score with --predict-only")
+    parser.add_argument("--feature-spec", default="logistic_minimal", choices=sorted(FEATURE_SPECS), help="Feature set: the minimal pandas features, the numba technical-factor library, or minimal 60m features plus completed daily-bar features (mtf_daily; needs --interval 60m or coarser)")
+    parser.add_argument("--stream", action="store_true", help="Out-of-core mode: score the whole history chunk by chunk with the latest saved artifact")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000, help="Bars per chunk in --stream mode")
+    parser.add_argument("--stream-out", default="stream_signals.csv", help="CSV that --stream appends proba_up/entries/exits to")
+    parser.add_argument("--compact", action="store_true", help="float32 prices/features, int32 volume and uint8 labels (about half the memory)")
+    parser.add_argument("--feature-cache", action="store_true", help="Reuse cached feature tables under data/cache/features")
+    parser.add_argument("--walk-forward", type=int, default=0, metavar="FOLDS", help="Walk-forward training over FOLDS out-of-sample blocks instead of a single split")
+    parser.add_argument("--train-window", type=int, default=None, help="Rolling training window in rows for --walk-forward (default: expanding)")
+    parser.add_argument("--warm-start", action="store_true", help="Warm-start each walk-forward fold from the previous fold's coefficients (logistic model only)")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size for walk-forward folds, or for symbols in universe mode")
+    parser.add_argument("--sweep-th", type=float, nargs="+", default=None, help="Sweep mode: grid of probability thresholds")
+    parser.add_argument("--sweep-train-ratio", type=float, nargs="+", default=None, help="Sweep mode: grid of train ratios (one model fit each)")
+    parser.add_argument("--hkex-costs", action="store_true", help="Charge HKEX stamp duty/fees/levies, broker commission and volume slippage")
+    parser.add_argument("--lot-size", type=int, default=100, help="Board lot in shares (with --hkex-costs)")
+    parser.add_argument("--metrics", nargs="+", choices=METRICS, default=None, help="Compute only these metrics instead of the full pf.stats()")
+    parser.add_argument("--top", type=int, default=10, help="Rows of the ranked sweep table to print")
+    parser.add_argument("--bar-cache", action="store_true", help="Memory-map local CSV bars from a binary cache under data/cache/bars")
+    parser.add_argument("--profile", nargs="?", const="profile.json", default=None, metavar="PATH", help="Record per-stage time/rows/memory and write them to PATH (default profile.json); universe mode profiles the parent process")
+    parser.add_argument("--profile-format", choices=["json", "chrome"], default="json", help="Profile output: structured JSON or a Chrome trace (chrome://tracing, Perfetto)")
+    parser.add_argument("--profile-cprofile", action="store_true", help="With --profile: keep the top cProfile functions of each stage")
+    parser.add_argument("--profile-tracemalloc", action="store_true", help="With --profile: record each stage's Python allocation peak (slower)")
     return parser.parse_args()
 
 
@@ -36,6 +84,7 @@ def safe_print_stats(stats) -> None:
         "Annual Return [%]",
         "Total Return [%]",
         "Max Drawdown [%]",
+        *METRICS,  # lightweight --metrics path
     ]
     print("\n===== Quick Stats =====")
     for key in candidates:
@@ -43,35 +92,434 @@ def safe_print_stats(stats) -> None:
             print(f"{key}: {stats.loc[key]}")
 
 
-# -------------- Main -------------- #
-def main() -> None:
-    args = parse_args()
+def run_param_sweep(
+    df: pd.DataFrame,
+    train_ratios: List[float],
+    thresholds: List[float],
+    feature_store: Optional[FeatureStore] = None,
+    model: str = "logistic",
+    feature_spec: str = "logistic_minimal",
+    compact: bool = False,
+    costs: Optional[HKEXCostModel] = None,
+    lot_size: int = 100,
+    metrics: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Rank (train_ratio, proba_th) pairs with one broadcast backtest.
+
+    The model is trained once per train_ratio; the threshold grid becomes
+    extra columns of a 2D entries/exits matrix. All columns are evaluated on
+    the shared out-of-sample window (after the largest train_ratio split), so
+    ranks compare like with like. `costs`/`lot_size` and `metrics` mean the
+    same as for a single backtest; the table is ranked by Sharpe ratio, or by
+    the first of `metrics` if that is not among them.
+    """
+    probas = {
+        ratio: train_predict(
+            df,
+            train_ratio=ratio,
+            feature_store=feature_store,
+            model=model,
+            feature_spec=feature_spec,
+            compact=compact,
+        )[1]
+        for ratio in train_ratios
+    }
+    signal = pd.DataFrame(probas)
+    signal.columns.name = "train_ratio"
+    entries, exits = to_entries_exits_grid(signal, thresholds)
+    _, table = run_sweep(
+        df["Close"],
+        entries,
+        exits,
+        cash=DEFAULT_CONFIG["init_cash"],
+        freq=DEFAULT_CONFIG["freq"],
+        sort_by="sharpe_ratio" if not metrics or "sharpe_ratio" in metrics else metrics[0],
+        costs=costs,
+        volume=df["Volume"],
+        lot_size=lot_size,
+        metrics=metrics,
+    )
+    return table
+
+
+# -------------- Universe mode -------------- #
+def read_universe(path: str) -> List[str]:
+    """Tickers from a universe file: first field per line; blanks, `#` comments and a `symbol` header are skipped."""
+    symbols = []
+    with open(path) as fh:
+        for line in fh:
+            field = line.split("#", 1)[0].split(",", 1)[0].strip()
+            if field and field.lower() not in ("symbol", "ticker"):
+                symbols.append(field)
+    return list(dict.fromkeys(symbols))
+
+
+def _warm_worker(
+    hkex_costs: bool,
+    metrics: Optional[List[str]],
+    feature_spec: str = "logistic_minimal",
+    model: str = "logistic",
+    compact: bool = False,
+) -> None:
+    """Pool initializer: compile numba kernels and load the model backend once per worker.
+
+    Runs the configured feature spec, model and dtype mode on synthetic bars
+    of the HKEX 60m session grid (long enough for the spec's lookback), so
+    the first real symbol pays no compilation.
+    """
+    spec = FEATURE_SPECS[feature_spec]
+    n = 3 * feature_lookback(spec) + 300
+    cal = HKEXCalendar()
+    labels: List[pd.Timestamp] = []
+    day = pd.Timestamp("2024-01-02")
+    while len(labels) < n:
+        labels.extend(cal.bar_labels(day.date(), spec.get("base_interval", "60m")))
+        day += pd.Timedelta(days=1)
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(labels))))
+    spread = np.abs(rng.normal(0, 0.003, len(labels)))
+    df = pd.DataFrame(
+        {
+            "Open": close,
+            "High": close * (1 + spread),
+            "Low": close * (1 - spread),
+            "Close": close,
+            "Volume": rng.integers(1_000, 10_000, len(labels)).astype(float),
+        },
+        index=pd.DatetimeIndex(labels),
+    )
+    if compact:
+        df = to_compact(df)
+    test_index, proba_up = train_predict(df, model=model, feature_spec=spec, compact=compact)
+    entries, exits = to_entries_exits(proba_up, 0.5)
+    run_backtest(
+        df["Close"].reindex(test_index),
+        entries,
+        exits,
+        freq=DEFAULT_CONFIG["freq"],
+        costs=HKEXCostModel() if hkex_costs else None,
+        volume=df["Volume"].reindex(test_index),
+        lot_size=100,
+        metrics=metrics,
+    )
+
+
+def run_symbol(symbol: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """One symbol through load → features/train → signals → backtest, as a results row.
+
+    Never raises: a failure is reported in the row's `error` column so the
+    rest of the universe keeps running.
+    """
+    t0 = time.perf_counter()
+    row: Dict[str, Any] = {"symbol": symbol, "status": "ok", "error": ""}
+    try:
+        df = download_ohlcv(
+            symbol=symbol,
+            period=args.period,
+            interval=args.interval,
+            force_remote=args.force_remote,
+            incremental=args.incremental,
+            resample_from=args.resample_from,
+            bar_cache_dir="data/cache/bars" if args.bar_cache else None,
+            compact=args.compact,
+        )
+        feature_store = FeatureStore() if args.feature_cache else None
+        if args.walk_forward:
+            # already inside a pool worker: fit the folds serially
+            test_index, proba_up = walk_forward_predict(
+                df,
+                n_folds=args.walk_forward,
+                train_ratio=args.train_ratio,
+                train_window=args.train_window,
+                warm_start=args.warm_start,
+                max_workers=1,
+                feature_store=feature_store,
+                feature_spec=args.feature_spec,
+                model=args.model,
+                compact=args.compact,
+            )
+        else:
+            test_index, proba_up = train_predict(
+                df,
+                train_ratio=args.train_ratio,
+                feature_store=feature_store,
+                model=args.model,
+                feature_spec=args.feature_spec,
+                compact=args.compact,
+            )
+        close = df["Close"].reindex(test_index)
+        entries, exits = to_entries_exits(proba_up, args.proba_th)
+        pf, stats, win_rate = run_backtest(
+            close,
+            entries,
+            exits,
+            cash=DEFAULT_CONFIG["init_cash"],
+            freq=DEFAULT_CONFIG["freq"],
+            costs=HKEXCostModel() if args.hkex_costs else None,
+            volume=df["Volume"].reindex(close.index),
+            lot_size=args.lot_size,
+            metrics=args.metrics or list(METRICS),
+        )
+        row.update(bars=len(df), test_bars=len(test_index), orders=len(pf.order_records))
+        row.update({m: float(stats[m]) for m in stats.index})
+        row["win_rate"] = win_rate
+    except Exception as exc:
+        row.update(status="error", error=f"{type(exc).__name__}: {exc}")
+    row["elapsed_s"] = time.perf_counter() - t0
+    return row
+
+
+def _init_worker(*warm_args) -> None:
+    """Pool initializer: leave the parent's profiler behind, then warm up."""
+    detach()
+    _warm_worker(*warm_args)
+
+
+def _pool_round(symbols: List[str], args: argparse.Namespace, max_workers: int, warm_args: tuple, report) -> tuple:
+    """Run `symbols` on one pool with at most `max_workers` in flight.
 
+    Returns (crashed, unsubmitted): the symbols in flight when a worker died
+    and broke the pool, and the ones not yet submitted to it. Keeping only
+    `max_workers` in flight bounds the symbols a crash takes down with it.
+    """
+    todo = iter(symbols)
+    running: Dict[Any, str] = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=warm_args) as pool:
+        for sym in itertools.islice(todo, max_workers):
+            running[pool.submit(run_symbol, sym, args)] = sym
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    row = fut.result()
+                except BrokenProcessPool:
+                    return list(running.values()), list(todo)
+                del running[fut]
+                report(row)
+                nxt = next(todo, None)
+                if nxt is not None:
+                    try:
+                        running[pool.submit(run_symbol, nxt, args)] = nxt
+                    except BrokenProcessPool:
+                        return list(running.values()), [nxt] + list(todo)
+    return [], []
+
+
+def run_universe(symbols: List[str], args: argparse.Namespace, max_workers: Optional[int] = None) -> pd.DataFrame:
+    """Run `run_symbol` over `symbols` on a process pool; one row per symbol.
+
+    Workers are warmed once (numba kernels, sklearn) by the pool initializer,
+    then reuse their imports and compiled kernels for every symbol they process.
+    A worker dying outright (OOM, a segfault in native code) breaks the whole
+    pool: the pool is rebuilt for the symbols not yet run, and each symbol
+    that was in flight is retried alone, so only one that also kills a pool
+    of its own is reported as crashed.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(symbols)))
+    warm_args = (args.hkex_costs, args.metrics or list(METRICS), args.feature_spec, args.model, args.compact)
+    # forked workers inherit the parent's compiled kernels, which makes their
+    # own warm-up a no-op; spawned workers (macOS/Windows) compile once each
+    with stage("warm_up"):
+        _warm_worker(*warm_args)
+    rows = []
+
+    def report(row: Dict[str, Any]) -> None:
+        rows.append(row)
+        print(f"  [{len(rows)}/{len(symbols)}] {row['symbol']}: {row['status']}", flush=True)
+
+    # with --profile only the parent is recorded: serial runs get every
+    # symbol's stages, pooled runs the overall wall time
+    with stage("symbols", rows=len(symbols)):
+        if max_workers == 1:
+            for sym in symbols:
+                report(run_symbol(sym, args))
+        else:
+            pending = list(symbols)
+            while pending:
+                crashed, pending = _pool_round(pending, args, max_workers, warm_args, report)
+                for sym in crashed:
+                    if _pool_round([sym], args, 1, warm_args, report)[0]:
+                        report({"symbol": sym, "status": "error", "error": "worker crashed (BrokenProcessPool)"})
+
+    table = pd.DataFrame(rows).set_index("symbol").reindex(symbols)
+    table = table[[c for c in table.columns if c not in ("status", "error")] + ["status", "error"]]
+    sort_by = "sharpe_ratio" if "sharpe_ratio" in table else table.columns[0]
+    return table.sort_values(sort_by, ascending=False, na_position="last")
+
+
+# -------------- Stream mode -------------- #
+def run_stream(args: argparse.Namespace) -> None:
+    """Bars → features → proba_up → entries/exits one chunk at a time.
+
+    Uses the latest saved artifact (train one with --save-model) and writes
+    each chunk's signals to `args.stream_out` as it goes, so memory stays
+    bounded by `--chunk-rows` however long the history is. Bars come from the
+    local CSV when present, else from the chunked Parquet store.
+    """
+    artifact = load_artifact(args.model_dir, args.symbol, args.model)
+    chunks = None if args.force_remote else iter_local_ohlcv(args.symbol, chunksize=args.chunk_rows)
+    first = next(chunks, None) if chunks is not None else None
+    if first is None:
+        chunks = iter_ohlcv_chunked(args.symbol, period=args.period, interval=args.interval, batch_rows=args.chunk_rows)
+    else:
+        chunks = itertools.chain([first], chunks)
+    if args.compact:
+        chunks = map(to_compact, chunks)
+
+    tables = iter_features(chunks, artifact.meta["feature_spec"], compact=args.compact)
+    probas = iter_predict(tables, artifact, since=artifact.trained_until)
+    n_bars = n_entries = n_exits = 0
+    with stage("stream") as rec:
+        for k, (proba, entries, exits) in enumerate(iter_signals(probas, args.proba_th)):
+            out = pd.DataFrame({"proba_up": proba, "entry": entries, "exit": exits})
+            out.to_csv(args.stream_out, mode="w" if k == 0 else "a", header=k == 0)
+            n_bars += len(out)
+            n_entries += int(entries.sum())
+            n_exits += int(exits.sum())
+        rec.rows = n_bars
+    print(f"Scored {n_bars} bars after {artifact.meta['trained_until']} with {args.model} v{artifact.meta['version']}: "
+          f"{n_entries} entries, {n_exits} exits written to {args.stream_out}")
+
+
+# -------------- Main -------------- #
+def run(args: argparse.Namespace) -> None:
+    """The pipeline; each step is a `profiling.stage` (free unless --profile)."""
+    if args.stream:
+        run_stream(args)
+        return
     # 1) Data — download_ohlcv prefers local CSVs; use --force-remote to bypass
-    df = download_ohlcv(symbol=args.symbol, period=args.period, interval=args.interval, force_remote=args.force_remote)
+    with stage("load_data") as rec:
+        df = download_ohlcv(
+            symbol=args.symbol,
+            period=args.period,
+            interval=args.interval,
+            force_remote=args.force_remote,
+            incremental=args.incremental,
+            resample_from=args.resample_from,
+            bar_cache_dir="data/cache/bars" if args.bar_cache else None,
+            compact=args.compact,
+        )
+        rec.rows = len(df)
 
     # 2) Train + Predict (model outputs proba for the test range)
-    test_index, proba_up = train_predict(df, train_ratio=args.train_ratio)
+    feature_store = FeatureStore() if args.feature_cache else None
+    if args.predict_only:
+        with stage("predict_only") as rec:
+            artifact = load_artifact(args.model_dir, args.symbol, args.model)
+            proba_up = artifact.predict(df, n_bars=args.predict_bars)
+            rec.rows = len(proba_up)
+        print(f"\n===== proba_up ({args.model} v{artifact.meta['version']}) =====")
+        print(proba_up.to_string())
+        return
+    if args.save_model:
+        with stage("save_model", rows=len(df)):
+            artifact = train_artifact(df, model=args.model, feature_store=feature_store, feature_spec=args.feature_spec)
+            path = artifact.save(args.model_dir, args.symbol)
+        print(f"Saved {args.model} artifact trained until {artifact.meta['trained_until']} to {path}")
+        return
+    if args.sweep_th or args.sweep_train_ratio:
+        with stage("param_sweep", rows=len(df)):
+            table = run_param_sweep(
+                df,
+                train_ratios=args.sweep_train_ratio or [args.train_ratio],
+                thresholds=args.sweep_th or [args.proba_th],
+                feature_store=feature_store,
+                model=args.model,
+                feature_spec=args.feature_spec,
+                compact=args.compact,
+                costs=HKEXCostModel() if args.hkex_costs else None,
+                lot_size=args.lot_size,
+                metrics=args.metrics,
+            )
+        print("\n===== Parameter Sweep =====")
+        print(table.head(args.top).to_string())
+        return
+
+    with stage("train_predict") as rec:
+        if args.walk_forward:
+            test_index, proba_up = walk_forward_predict(
+                df,
+                n_folds=args.walk_forward,
+                train_ratio=args.train_ratio,
+                train_window=args.train_window,
+                warm_start=args.warm_start,
+                max_workers=args.workers,
+                feature_store=feature_store,
+                feature_spec=args.feature_spec,
+                model=args.model,
+                compact=args.compact,
+            )
+        else:
+            test_index, proba_up = train_predict(
+                df,
+                train_ratio=args.train_ratio,
+                feature_store=feature_store,
+                model=args.model,
+                feature_spec=args.feature_spec,
+                compact=args.compact,
+            )
+        rec.rows = len(test_index)
 
     # 3) Align Close price with model output timeline
-    close = df["Close"].reindex(test_index)
+    with stage("align", rows=len(test_index)):
+        close = df["Close"].reindex(test_index)
 
     # 4) Convert model output to entries/exits
-    entries, exits = to_entries_exits(proba_up, args.proba_th)
+    with stage("signals", rows=len(proba_up)):
+        entries, exits = to_entries_exits(proba_up, args.proba_th)
 
     # 5) Backtest
-    pf, stats, win_rate = run_backtest(
-        close,
-        entries,
-        exits,
-        cash=DEFAULT_CONFIG["init_cash"],
-        freq=DEFAULT_CONFIG["freq"],
-    )
+    with stage("backtest", rows=len(close)):
+        pf, stats, win_rate = run_backtest(
+            close,
+            entries,
+            exits,
+            cash=DEFAULT_CONFIG["init_cash"],
+            freq=DEFAULT_CONFIG["freq"],
+            costs=HKEXCostModel() if args.hkex_costs else None,
+            volume=df["Volume"].reindex(close.index),
+            lot_size=args.lot_size,
+            metrics=args.metrics,
+        )
 
     # 6) Report
-    safe_print_stats(stats)
-    if win_rate is not None:
-        print(f"Win Rate: {win_rate:.2%}")
+    with stage("report"):
+        safe_print_stats(stats)
+        if win_rate is not None:
+            print(f"Win Rate: {win_rate:.2%}")
+
+
+def run_universe_cli(args: argparse.Namespace) -> None:
+    """Universe mode: run every --symbols/--universe-file ticker and write the results table."""
+    symbols = list(args.symbols or []) + (read_universe(args.universe_file) if args.universe_file else [])
+    table = run_universe(list(dict.fromkeys(symbols)), args, max_workers=args.workers)
+    with stage("report", rows=len(table)):
+        table.to_csv(args.results)
+        print("\n===== Universe Results =====")
+        print(table.head(args.top).to_string())
+        n_failed = int((table["status"] != "ok").sum())
+        print(f"\n{len(table) - n_failed} ok, {n_failed} failed; full table written to {args.results}")
+
+
+def main() -> None:
+    args = parse_args()
+    entry = run_universe_cli if args.symbols or args.universe_file else run
+    if args.profile is None:
+        entry(args)
+        return
+
+    profiler = StageProfiler(cprofile=args.profile_cprofile, tracemalloc=args.profile_tracemalloc)
+    try:
+        with profiler.activate():
+            entry(args)
+    finally:
+        # written even if a stage fails, so the failing stage is visible
+        profiler.write(args.profile, args.profile_format)
+        print("\n===== Profile =====")
+        print(profiler.summary())
+        print(f"Profile written to {args.profile} ({args.profile_format})")
 
 
 if __name__ == "__main__":
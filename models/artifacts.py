@@ -0,0 +1,204 @@
+"""Versioned model artifacts and the predict-only path.
+
+Training writes an artifact directory::
+
+    {root}/{symbol}/{model_name}/v0001/
+        model.joblib   fitted registry backend (includes the scaler)
+        meta.json      feature spec/columns, training range, data fingerprint
+
+Versions only ever increase, so the latest artifact is the highest `v*`.
+`load_artifact` reads just `meta.json`; the estimator is unpickled on the
+first prediction and kept for the life of the process. `ModelArtifact.predict`
+rebuilds features (with the artifact's own feature spec) from the last
+`feature_lookback(spec)` bars only, so scoring new bars takes milliseconds
+instead of a refit.
+"""
+from __future__ import annotations
+
+
+import json
+import os
+import shutil
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from models.feature_store import data_fingerprint
+from models.factors import FACTOR_LIBRARY_VERSION
+from models.logistic_model import FEATURE_SPECS, build_features, feature_frame, feature_lookback, resolve_spec
+
+if TYPE_CHECKING:
+    from models.feature_store import FeatureStore
+    from models.registry import Model
+
+
+ARTIFACT_FORMAT = 1
+
+
+class ModelArtifact:
+    """A fitted model plus everything needed to score new bars consistently."""
+
+    def __init__(self, meta: Dict[str, Any], model: Optional["Model"] = None, path: Optional[str] = None) -> None:
+        self.meta = meta
+        self.path = path
+        self._model = model
+
+    @property
+    def model(self) -> "Model":
+        if self._model is None:
+            # lazy: listing/inspecting artifacts never unpickles the estimator
+            self._model = joblib.load(os.path.join(self.path, "model.joblib"))
+        return self._model
+
+    @property
+    def trained_until(self) -> pd.Timestamp:
+        return pd.Timestamp(self.meta["trained_until"])
+
+    def predict_features(self, X: pd.DataFrame) -> np.ndarray:
+        """proba_up for an already-built feature frame."""
+        return self.model.predict_proba(X[self.meta["feature_columns"]])
+
+    def predict(self, df: pd.DataFrame, n_bars: Optional[int] = None) -> pd.Series:
+        """Score the newest bars of an OHLCV frame.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+        OHLCV frame with at least `feature_lookback(spec)` bars before the
+        first bar to score.
+        n_bars : int, optional
+        Score the last `n_bars` bars; default all bars after `trained_until`.
+
+        Returns
+        -------
+        pd.Series
+        proba_up per scored bar (bars without a full feature row are skipped).
+        """
+        if n_bars is None:
+            first = int(df.index.searchsorted(self.trained_until, side="right"))
+        else:
+            first = max(len(df) - n_bars, 0)
+        spec = self.meta["feature_spec"]
+        feats = feature_frame(df.iloc[max(first - feature_lookback(spec), 0):], spec)
+        feats = feats.iloc[len(feats) - (len(df) - first):].dropna()
+        if feats.empty:
+            return pd.Series(dtype=np.float64, name="proba_up")
+        return pd.Series(self.predict_features(feats), index=feats.index, name="proba_up")
+
+    def save(self, root: str, symbol: str) -> str:
+        """Write as the next version under `{root}/{symbol}/{model_name}`; return its path."""
+        base = os.path.join(root, symbol, self.meta["model_name"])
+        os.makedirs(base, exist_ok=True)
+        version = (list_versions(root, symbol, self.meta["model_name"]) or [0])[-1] + 1
+        final = os.path.join(base, f"v{version:04d}")
+        tmp = final + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        joblib.dump(self.model, os.path.join(tmp, "model.joblib"))
+        meta = dict(self.meta, version=version)
+        with open(os.path.join(tmp, "meta.json"), "w") as fh:
+            json.dump(meta, fh, indent=2)
+        # the rename publishes the complete version at once
+        os.replace(tmp, final)
+        self.meta, self.path = meta, final
+        return final
+
+
+def fit_artifact(
+    train: pd.DataFrame,
+    model: Union[str, "Model"] = "logistic",
+    seed: int = 42,
+    source: Optional[pd.DataFrame] = None,
+    feature_spec: Union[None, str, Dict[str, Any]] = None,
+) -> ModelArtifact:
+    """Fit `model` on a `build_features` table and wrap it as an artifact.
+
+    `source` (the OHLCV bars the table came from) is fingerprinted so an
+    artifact can be traced back to its training data; `feature_spec` must be
+    the spec the table was built with.
+    """
+    from models.registry import get_model
+
+    if isinstance(model, str):
+        model = get_model(model, seed=seed)
+    X = train.drop(columns="y")
+    model.fit(X, train["y"])
+    spec = resolve_spec(feature_spec)
+    meta = {
+        "format": ARTIFACT_FORMAT,
+        "model_name": model.name,
+        "feature_spec": spec,
+        "feature_columns": list(X.columns),
+        "trained_from": str(train.index[0]),
+        "trained_until": str(train.index[-1]),
+        "n_train": len(train),
+        "data_fingerprint": data_fingerprint(source) if source is not None else None,
+        "created_at": pd.Timestamp.now(tz="UTC").isoformat(),
+        "seed": seed,
+    }
+    if "factors" in spec:
+        meta["factor_library"] = FACTOR_LIBRARY_VERSION
+    return ModelArtifact(meta, model=model)
+
+
+def train_artifact(
+    df: pd.DataFrame,
+    model: Union[str, "Model"] = "logistic",
+    train_ratio: float = 1.0,
+    seed: int = 42,
+    feature_store: Optional["FeatureStore"] = None,
+    feature_spec: Union[None, str, Dict[str, Any]] = None,
+) -> ModelArtifact:
+    """Build features and fit on the first `train_ratio` of them (all by default)."""
+    spec = resolve_spec(feature_spec)
+    if feature_store is not None:
+        data = feature_store.get_or_build(df, lambda d: build_features(d, spec), spec)
+    else:
+        data = build_features(df, spec)
+    train = data.iloc[: int(len(data) * train_ratio)]
+    return fit_artifact(train, model=model, seed=seed, source=df.loc[: train.index[-1]], feature_spec=spec)
+
+
+def list_versions(root: str, symbol: str, model_name: str) -> List[int]:
+    base = os.path.join(root, symbol, model_name)
+    if not os.path.isdir(base):
+        return []
+    return sorted(
+        int(name[1:]) for name in os.listdir(base)
+        if name.startswith("v") and name[1:].isdigit() and os.path.exists(os.path.join(base, name, "meta.json"))
+    )
+
+
+_LOADED: Dict[str, ModelArtifact] = {}
+
+
+def load_artifact(root: str, symbol: str, model_name: str = "logistic", version: Optional[int] = None) -> ModelArtifact:
+    """Open an artifact (latest version by default); the model loads on first use.
+
+    Artifacts are cached per path, so an hourly loop pays the unpickling once.
+    Raises ValueError if none exists, or if its feature spec (or factor
+    library version) no longer matches the current definition of that spec.
+    """
+    versions = list_versions(root, symbol, model_name)
+    if not versions:
+        raise ValueError(f"No {model_name!r} artifact for {symbol} under {root}")
+    version = versions[-1] if version is None else version
+    path = os.path.join(root, symbol, model_name, f"v{version:04d}")
+    if path in _LOADED:
+        return _LOADED[path]
+    with open(os.path.join(path, "meta.json")) as fh:
+        meta = json.load(fh)
+    spec = meta.get("feature_spec") or {}
+    current = FEATURE_SPECS.get(spec.get("name"), spec if "factors" in spec else None)
+    stale = meta.get("format") != ARTIFACT_FORMAT or spec != current
+    if "factors" in spec and meta.get("factor_library") != FACTOR_LIBRARY_VERSION:
+        stale = True
+    if stale:
+        raise ValueError(
+            f"Artifact {path} was built for feature spec {meta.get('feature_spec')}, "
+            f"current is {current}; retrain it."
+        )
+    artifact = _LOADED[path] = ModelArtifact(meta, path=path)
+    return artifact
@@ -0,0 +1,339 @@
+"""Technical-factor library computed by one fused numba kernel.
+
+A factor set is declared as a list of dicts (usually the `factors` entry of
+a feature spec, see `logistic_model.FEATURE_SPECS`)::
+
+    [{"kind": "ret", "window": 5}, {"kind": "rsi", "window": 14}, ...]
+
+`compute_factors` turns the list into code/parameter arrays and makes one
+compiled call over the Close/High/Low/Volume arrays; every factor keeps O(1)
+running state (rolling sums, EWM levels) and writes straight into the output
+block, so adding factors adds arithmetic, not pandas passes or temporary
+Series. Values at bar t use bars up to
+t; callers shift them to avoid lookahead.
+
+Kinds (column name in brackets):
+
+- ret (window)            close / close[t-window] - 1               [ret{w}]
+- ma_gap (fast, slow)     SMA(fast) / SMA(slow) - 1                  [ma_gap{f}_{s}]
+- ma_slope (window)       SMA(window) / its previous value - 1       [ma_slope{w}]
+- vol (window)            sample std of 1-bar returns                [vol{w}]
+- volchg                  volume / previous volume - 1               [volchg]
+- rsi (window)            Wilder RSI, 0..100                         [rsi{w}]
+- atr (window)            Wilder ATR / close (needs High, Low)       [atr{w}]
+- bb_width (window, k)    2k * sample std(close) / SMA(close)        [bb_width{w}]
+- obv (window)            OBV change over window / volume traded     [obv{w}]
+
+Inputs are forward-filled first, as `pct_change` does. `compute_factors_pandas`
+is the equivalent pandas implementation, kept as the reference for tests and
+benchmarks.
+"""
+from __future__ import annotations
+
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+from numba import njit
+
+
+# bump when a kernel's definition changes (recorded in model artifacts)
+FACTOR_LIBRARY_VERSION = 1
+
+RET, MA_GAP, MA_SLOPE, VOL, VOLCHG, RSI, ATR, BB_WIDTH, OBV = range(9)
+KINDS = {
+    "ret": RET, "ma_gap": MA_GAP, "ma_slope": MA_SLOPE, "vol": VOL, "volchg": VOLCHG,
+    "rsi": RSI, "atr": ATR, "bb_width": BB_WIDTH, "obv": OBV,
+}
+_NEEDS_HIGH_LOW = (ATR,)
+_EWM = (RSI, ATR)
+# ewm factors depend on all history; by default the lookback leaves < 1e-10
+# of their weight outside it
+EWM_TOLERANCE = 1e-10
+# rolling sums are recomputed exactly this often so add/subtract drift stays bounded
+REFRESH_EVERY = 4096
+
+
+def factor_name(factor: Dict[str, Any]) -> str:
+    if "name" in factor:
+        return factor["name"]
+    kind = factor["kind"]
+    if kind == "ma_gap":
+        return f"ma_gap{factor['fast']}_{factor['slow']}"
+    if kind == "volchg":
+        return "volchg"
+    return f"{kind}{factor['window']}"
+
+
+def _encode(factors: Sequence[Dict[str, Any]]):
+    """(codes, p1, p2, names) arrays for the kernel; raises ValueError on bad specs."""
+    codes, p1, p2, names = [], [], [], []
+    for f in factors:
+        kind = f.get("kind")
+        if kind not in KINDS:
+            raise ValueError(f"Unknown factor kind {kind!r}; choose from {sorted(KINDS)}")
+        if kind == "ma_gap":
+            a, b = int(f["fast"]), int(f["slow"])
+        elif kind == "volchg":
+            a, b = 1, 0
+        else:
+            a, b = int(f["window"]), 0
+        if kind == "bb_width":
+            b = f.get("k", 2.0)
+        if a < 1 or (kind == "ma_gap" and b < 1):
+            raise ValueError(f"Factor {f} needs positive windows")
+        codes.append(KINDS[kind])
+        p1.append(a)
+        p2.append(b)
+        names.append(factor_name(f))
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate factor names in {names}")
+    return np.array(codes, np.int64), np.array(p1, np.int64), np.array(p2, np.float64), names
+
+
+def factors_lookback(factors: Sequence[Dict[str, Any]], tol: float = EWM_TOLERANCE) -> int:
+    """Bars of history needed to reproduce the newest factor rows (+1 for the shift).
+
+    Windowed factors are exact; ewm factors (rsi, atr) keep all history, so
+    their lookback is where the remaining weight drops below `tol` (2**-53
+    makes them agree to float64 rounding).
+    """
+    codes, p1, p2, _ = _encode(factors)
+    need = 1
+    for code, a, b in zip(codes, p1, p2):
+        if code == MA_GAP:
+            need = max(need, int(max(a, b)))
+        elif code in _EWM:
+            # (1 - 1/w)**n < tol
+            horizon = int(np.ceil(np.log(tol) / np.log1p(-1.0 / a))) if a > 1 else 1
+            need = max(need, horizon + int(a))
+        else:
+            need = max(need, int(a) + 1)
+    return need + 1
+
+
+# ---------------- numba kernel ---------------- #
+@njit(cache=True, inline="always")
+def _ret1(c, i):
+    return c[i] / c[i - 1] - 1.0 if i >= 1 else np.nan
+
+
+@njit(cache=True, inline="always")
+def _signed_volume(c, v, i):
+    return np.sign(c[i] - c[i - 1]) * v[i] if i >= 1 else np.nan
+
+
+@njit(cache=True, inline="always")
+def _true_range(c, h, l, i):
+    hl = h[i] - l[i]
+    if i == 0:
+        return hl
+    return max(hl, abs(h[i] - c[i - 1]), abs(l[i] - c[i - 1]))
+
+
+@njit(cache=True, inline="always")
+def _roll(st, base, x, x_old, drop):
+    """Add x (and drop x_old) to the rolling sum / sum of squares / NaN count at st[base:base+3]."""
+    if np.isnan(x):
+        st[base + 2] += 1.0
+    else:
+        st[base] += x
+        st[base + 1] += x * x
+    if drop:
+        if np.isnan(x_old):
+            st[base + 2] -= 1.0
+        else:
+            st[base] -= x_old
+            st[base + 1] -= x_old * x_old
+
+
+@njit(cache=True)
+def _source(kind, c, v, i):
+    if kind == 0:
+        return c[i]
+    if kind == 1:
+        return _ret1(c, i)
+    if kind == 2:
+        return _signed_volume(c, v, i)
+    return v[i]
+
+
+@njit(cache=True)
+def _refresh(st, base, kind, c, v, i, w):
+    """Recompute a rolling block exactly over bars (i-w, i]; bounds float drift."""
+    st[base] = st[base + 1] = st[base + 2] = 0.0
+    for t in range(max(i - w + 1, 0), i + 1):
+        x = _source(kind, c, v, t)
+        if np.isnan(x):
+            st[base + 2] += 1.0
+        else:
+            st[base] += x
+            st[base + 1] += x * x
+
+
+@njit(cache=True, inline="always")
+def _ewm(st, base, x, alpha):
+    """pandas ewm(alpha, adjust=False) level at st[base], observation count at st[base+1]."""
+    if np.isnan(x):
+        return
+    if st[base + 1] == 0.0:
+        st[base] = x
+    else:
+        st[base] = (1.0 - alpha) * st[base] + alpha * x
+    st[base + 1] += 1.0
+
+
+@njit(cache=True)
+def factor_kernel_nb(c, h, l, v, codes, p1, p2, out):
+    """Fill the NaN-initialised (factors, bars) block `out` with every factor.
+
+    `out` may be float32; state and arithmetic stay float64 and each value is
+    rounded once when stored.
+    """
+    n = c.shape[0]
+    k = codes.shape[0]
+    st = np.zeros((k, 8))
+    # bar-major: one pass over the inputs, each factor advancing its own state row
+    for i in range(n):
+        r = _ret1(c, i)
+        refresh = (i + 1) % REFRESH_EVERY == 0
+        for j in range(k):
+            code = codes[j]
+            w = p1[j]
+            s = st[j]
+            if code == RET:
+                if i >= w:
+                    out[j, i] = c[i] / c[i - w] - 1.0
+            elif code == MA_GAP:
+                ws = int(p2[j])
+                _roll(s, 0, c[i], c[i - w] if i >= w else 0.0, i >= w)
+                _roll(s, 3, c[i], c[i - ws] if i >= ws else 0.0, i >= ws)
+                if refresh:
+                    _refresh(s, 0, 0, c, v, i, w)
+                    _refresh(s, 3, 0, c, v, i, ws)
+                if i >= max(w, ws) - 1 and s[2] == 0.0 and s[5] == 0.0:
+                    out[j, i] = (s[0] / w) / (s[3] / ws) - 1.0
+            elif code == MA_SLOPE:
+                _roll(s, 0, c[i], c[i - w] if i >= w else 0.0, i >= w)
+                if refresh:
+                    _refresh(s, 0, 0, c, v, i, w)
+                ma = s[0] / w if (i >= w - 1 and s[2] == 0.0) else np.nan
+                if i >= 1:
+                    out[j, i] = ma / s[3] - 1.0
+                s[3] = ma
+            elif code == VOL:
+                # window over 1-bar returns (first one at bar 1)
+                _roll(s, 0, r, _ret1(c, i - w) if i >= w else 0.0, i >= w)
+                if refresh:
+                    _refresh(s, 0, 1, c, v, i, w)
+                if i >= w and s[2] == 0.0:
+                    mean = s[0] / w
+                    var = (s[1] - w * mean * mean) / (w - 1)
+                    out[j, i] = np.sqrt(max(var, 0.0))
+            elif code == VOLCHG:
+                if i >= 1:
+                    out[j, i] = v[i] / v[i - 1] - 1.0
+            elif code == RSI:
+                if i >= 1:
+                    alpha = 1.0 / w
+                    d = c[i] - c[i - 1]
+                    _ewm(s, 0, d if d > 0.0 else (0.0 if d <= 0.0 else np.nan), alpha)
+                    _ewm(s, 2, -d if d < 0.0 else (0.0 if d >= 0.0 else np.nan), alpha)
+                    if s[1] >= w:
+                        out[j, i] = 100.0 * s[0] / (s[0] + s[2])
+            elif code == ATR:
+                _ewm(s, 0, _true_range(c, h, l, i), 1.0 / w)
+                if s[1] >= w:
+                    out[j, i] = s[0] / c[i]
+            elif code == BB_WIDTH:
+                _roll(s, 0, c[i], c[i - w] if i >= w else 0.0, i >= w)
+                if refresh:
+                    _refresh(s, 0, 0, c, v, i, w)
+                if i >= w - 1 and s[2] == 0.0:
+                    mean = s[0] / w
+                    var = (s[1] - w * mean * mean) / (w - 1)
+                    out[j, i] = 2.0 * p2[j] * np.sqrt(max(var, 0.0)) / mean
+            elif code == OBV:
+                _roll(s, 0, _signed_volume(c, v, i), _signed_volume(c, v, i - w) if i >= w else 0.0, i >= w)
+                _roll(s, 3, v[i], v[i - w] if i >= w else 0.0, i >= w)
+                if refresh:
+                    _refresh(s, 0, 2, c, v, i, w)
+                    _refresh(s, 3, 3, c, v, i, w)
+                if i >= w - 1 and s[2] == 0.0 and s[5] == 0.0:
+                    out[j, i] = s[0] / s[3]
+
+
+def _inputs(df: pd.DataFrame, codes: np.ndarray):
+    c = df["Close"].ffill().to_numpy(dtype=np.float64)
+    v = df["Volume"].ffill().to_numpy(dtype=np.float64)
+    if any(code in _NEEDS_HIGH_LOW for code in codes):
+        missing = {"High", "Low"} - set(df.columns)
+        if missing:
+            raise ValueError(f"Factors {[k for k, v in KINDS.items() if v in _NEEDS_HIGH_LOW]} need columns {sorted(missing)}")
+        h = df["High"].ffill().to_numpy(dtype=np.float64)
+        l = df["Low"].ffill().to_numpy(dtype=np.float64)
+    else:
+        h = l = c
+    return c, h, l, v
+
+
+def factor_block(df: pd.DataFrame, factors: Sequence[Dict[str, Any]], dtype=np.float64, shift: int = 0):
+    """(bars, factors) array of `dtype` plus column names, optionally shifted.
+
+    The kernel writes straight into one preallocated (factors, bars) block;
+    `shift` rows are left NaN at the top instead of shifting a copy. The
+    array returned is its transpose (a view, Fortran-ordered).
+    """
+    codes, p1, p2, names = _encode(factors)
+    c, h, l, v = _inputs(df, codes)
+    n = len(c)
+    # (factors, bars) is the block layout pandas keeps, so the frame wraps it without a copy
+    out = np.full((len(codes), n), np.nan, dtype=dtype)
+    if n > shift:
+        end = n - shift
+        factor_kernel_nb(c[:end], h[:end], l[:end], v[:end], codes, p1, p2, out[:, shift:])
+    return out.T, names
+
+
+def compute_factors(df: pd.DataFrame, factors: Sequence[Dict[str, Any]]) -> pd.DataFrame:
+    """Factor frame (unshifted) for an OHLCV frame, from the fused kernel."""
+    block, names = factor_block(df, factors)
+    return pd.DataFrame(block, index=df.index, columns=names, copy=False)
+
+
+# ---------------- pandas reference ---------------- #
+def compute_factors_pandas(df: pd.DataFrame, factors: Sequence[Dict[str, Any]]) -> pd.DataFrame:
+    """Same factors as `compute_factors`, one pandas expression per factor."""
+    codes, p1, p2, names = _encode(factors)
+    c = df["Close"].ffill()
+    v = df["Volume"].ffill()
+    cols: List[pd.Series] = []
+    for code, w, b in zip(codes, p1, p2):
+        if code == RET:
+            x = c / c.shift(w) - 1
+        elif code == MA_GAP:
+            x = c.rolling(w).mean() / c.rolling(int(b)).mean() - 1
+        elif code == MA_SLOPE:
+            ma = c.rolling(w).mean()
+            x = ma / ma.shift(1) - 1
+        elif code == VOL:
+            x = (c / c.shift(1) - 1).rolling(w).std()
+        elif code == VOLCHG:
+            x = v / v.shift(1) - 1
+        elif code == RSI:
+            diff = c.diff()
+            gain = diff.clip(lower=0).ewm(alpha=1 / w, adjust=False, min_periods=w).mean()
+            loss = (-diff).clip(lower=0).ewm(alpha=1 / w, adjust=False, min_periods=w).mean()
+            x = 100 * gain / (gain + loss)
+        elif code == ATR:
+            hi, lo = df["High"].ffill(), df["Low"].ffill()
+            prev = c.shift(1)
+            tr = pd.concat([hi - lo, (hi - prev).abs(), (lo - prev).abs()], axis=1).max(axis=1)
+            x = tr.ewm(alpha=1 / w, adjust=False, min_periods=w).mean() / c
+        elif code == BB_WIDTH:
+            x = 2 * b * c.rolling(w).std() / c.rolling(w).mean()
+        else:  # OBV
+            x = (np.sign(c.diff()) * v).rolling(w).sum() / v.rolling(w).sum()
+        cols.append(x)
+    return pd.concat(cols, axis=1, keys=names)
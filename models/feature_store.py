@@ -0,0 +1,167 @@
+"""On-disk cache for feature tables keyed by data fingerprint and feature spec.
+
+A feature table is reused when the bars it was built from (content hash of
+index and every OHLCV column plus time range) and the versioned feature spec are
+unchanged, so repeated runs and parameter sweeps skip feature engineering.
+Entries are Parquet files; the directory is kept bounded by evicting the
+least-recently-used entries (access refreshes the file mtime).
+"""
+from __future__ import annotations
+
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+OHLCV_COLS = ("Open", "High", "Low", "Close", "Volume")
+
+
+def data_fingerprint(df: pd.DataFrame, columns=None) -> str:
+    """Content hash of the index and the given columns of `df`.
+
+    Defaults to every OHLCV column present: feature specs read more than
+    Close/Volume (ATR reads High/Low, resampled bars Open/High/Low).
+    """
+    if columns is None:
+        columns = [c for c in OHLCV_COLS if c in df.columns]
+    h = hashlib.blake2b(digest_size=16)
+    idx = df.index
+    if isinstance(idx, pd.DatetimeIndex):
+        h.update(str(idx.tz).encode())
+        idx = idx.tz_convert("UTC").tz_localize(None) if idx.tz is not None else idx
+        h.update(np.ascontiguousarray(idx.asi8).tobytes())
+    else:
+        h.update(pd.util.hash_pandas_object(idx).to_numpy().tobytes())
+    for col in columns:
+        h.update(col.encode())
+        h.update(np.ascontiguousarray(df[col].to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+class FeatureStore:
+    """LRU-bounded Parquet cache of feature tables.
+
+    Parameters
+    ----------
+    cache_dir : str
+    Directory holding `{key}.parquet` entries.
+    max_bytes : int
+    Evict least-recently-used entries beyond this total size.
+    max_entries : int, optional
+    Optional cap on the number of entries.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "data/cache/features",
+        max_bytes: int = 512 * 2**20,
+        max_entries: Optional[int] = None,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, df: pd.DataFrame, spec: Dict[str, Any]) -> str:
+        """Cache key from the feature spec, time range and data content."""
+        parts = {
+            "spec": spec,
+            "rows": len(df),
+            "start": str(df.index[0]) if len(df) else None,
+            "end": str(df.index[-1]) if len(df) else None,
+            "data": data_fingerprint(df),
+        }
+        return hashlib.blake2b(json.dumps(parts, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            out = pd.read_parquet(path)
+        except Exception:
+            # torn/corrupt entry: treat as a miss, it is rewritten below
+            return None
+        try:
+            os.utime(path)  # LRU: mark as recently used
+        except FileNotFoundError:
+            pass  # evicted by another process since the read
+        return out
+
+    def put(self, key: str, features: pd.DataFrame) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # unique temp name: concurrent writers of one key must not share it;
+        # the ".tmp" suffix keeps it out of `evict`
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{key}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            features.to_parquet(tmp)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.evict()
+
+    def get_or_build(
+        self,
+        df: pd.DataFrame,
+        builder: Callable[[pd.DataFrame], pd.DataFrame],
+        spec: Dict[str, Any],
+    ) -> pd.DataFrame:
+        """Return cached features for `df`, building and storing them on a miss."""
+        key = self.key(df, spec)
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            tz = getattr(df.index, "tz", None)
+            if tz is not None:
+                # Parquet round-trips the zone by name; restore the caller's tz object
+                cached.index = cached.index.tz_convert(tz)
+            return cached
+        self.misses += 1
+        features = builder(df)
+        self.put(key, features)
+        return features
+
+    def evict(self) -> None:
+        """Drop least-recently-used entries until size/count limits hold.
+
+        Safe with several processes sharing `cache_dir` (e.g. universe-mode
+        workers): entries another process removed meanwhile are skipped.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".parquet"):
+                try:
+                    st = os.stat(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, name))
+        entries.sort(reverse=True)  # newest first
+
+        total = 0
+        kept = 0
+        for _, size, name in entries:
+            over_count = self.max_entries is not None and kept >= self.max_entries
+            # always keep the newest entry, even if it alone exceeds max_bytes
+            if kept and (total + size > self.max_bytes or over_count):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    pass
+                continue
+            total += size
+            kept += 1
@@ -7,43 +7,186 @@ Replace this file later with time-series Transformers / XGBoost / etc.
 from __future__ import annotations
 
 
-from typing import Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+import numpy as np
 import pandas as pd
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
 
-def build_features(df: pd.DataFrame) -> pd.DataFrame:
-    """Create minimal feature set and labeled target.
+from models.factors import EWM_TOLERANCE, compute_factors, factor_block, factors_lookback
+from profiling import stage
+
+if TYPE_CHECKING:
+    from models.feature_store import FeatureStore
+    from models.registry import Model
+
+
+# Identifies what `build_features` computes; bump `version` whenever the
+# feature definitions change so cached feature tables are not reused.
+FEATURE_SPEC = {"name": "logistic_minimal", "version": 1}
+
+
+# Bars of history one feature row depends on (20-bar volatility of 1-bar
+# returns, shifted by one) plus a margin; enough to score the latest bars.
+FEATURE_LOOKBACK = 30
+
+
+# Declarative specs computed by the fused kernels of `models.factors`; the
+# `factors` list selects and parameterizes them (column order = list order).
+TECHNICAL_SPEC = {
+    "name": "technical",
+    "version": 1,
+    "factors": [
+        {"kind": "ret", "window": 1},
+        {"kind": "ret", "window": 2},
+        {"kind": "ret", "window": 5},
+        {"kind": "ret", "window": 20},
+        {"kind": "ma_gap", "fast": 5, "slow": 20},
+        {"kind": "ma_slope", "window": 5},
+        {"kind": "vol", "window": 20},
+        {"kind": "volchg"},
+        {"kind": "rsi", "window": 14},
+        {"kind": "atr", "window": 14},
+        {"kind": "bb_width", "window": 20},
+        {"kind": "obv", "window": 20},
+    ],
+}
+
+# Multi-timeframe spec (see `models.multi_timeframe`): the `base` features
+# of the bar interval plus, per `timeframes` entry, the features of `spec` on
+# completed `interval` bars resampled along HKEX sessions. `base_interval`
+# only sizes `feature_lookback`.
+MTF_SPEC = {
+    "name": "mtf_daily",
+    "version": 1,
+    "base": "logistic_minimal",
+    "base_interval": "60m",
+    "timeframes": [{"interval": "1d", "spec": "logistic_minimal"}],
+}
+
+FEATURE_SPECS = {"logistic_minimal": FEATURE_SPEC, "technical": TECHNICAL_SPEC, "mtf_daily": MTF_SPEC}
+
+
+# Compact mode (`build_features(..., compact=True)`): features are computed
+# in float64 and stored once as float32, the label as uint8. Error bounds vs
+# the float64 pipeline, with float32 prices (`data.downloader.to_compact`):
+# return-like features (ret*, ma_*, vol*, atr, bb_width, obv) within
+# ~2**-23 (1.2e-7) absolute, volchg within ~2**-23 relative, RSI (built
+# from differences of rounded prices) within 1e-3 points. Labels only differ
+# where two prices round to the same float32. proba_up moves by ~1e-6, so
+# only signals on the threshold can flip.
+COMPACT_FEATURE_DTYPE = np.float32
+
+
+def resolve_spec(spec: Union[None, str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Spec dict from None (the default FEATURE_SPEC), a FEATURE_SPECS name or a dict."""
+    if spec is None:
+        return FEATURE_SPEC
+    if isinstance(spec, str):
+        if spec not in FEATURE_SPECS:
+            raise ValueError(f"Unknown feature spec {spec!r}; choose from {sorted(FEATURE_SPECS)}")
+        return FEATURE_SPECS[spec]
+    return spec
+
+
+def feature_lookback(spec: Union[None, str, Dict[str, Any]] = None, exact: bool = False) -> int:
+    """Bars of history needed to compute the newest feature rows of `spec`.
+
+    `exact` widens the history of ewm factors until the part left out is below
+    float64 resolution (used when chunks must match one in-memory pass).
+    """
+    spec = resolve_spec(spec)
+    if "factors" in spec:
+        return factors_lookback(spec["factors"], tol=2.0**-53 if exact else EWM_TOLERANCE)
+    if "timeframes" in spec:
+        from models.multi_timeframe import mtf_lookback
+
+        return mtf_lookback(spec, exact)
+    return FEATURE_LOOKBACK
+
+
+def feature_frame(df: pd.DataFrame, spec: Union[None, str, Dict[str, Any]] = None) -> pd.DataFrame:
+    """Feature columns of `build_features` (no target, no NaN filtering).
+
+    Row t only uses bars up to t-1, so the rows for the newest bars can be
+    computed from the last `feature_lookback(spec)` bars alone.
+    """
+    spec = resolve_spec(spec)
+    if "factors" in spec:
+        # one compiled pass for every factor, shifted like the minimal set
+        return compute_factors(df, spec["factors"]).shift(1)
+    if "timeframes" in spec:
+        # lazy: models.multi_timeframe builds on this module
+        from models.multi_timeframe import mtf_feature_frame
+
+        return mtf_feature_frame(df, spec)
+    feat = pd.DataFrame(_minimal_columns(df["Close"], df["Volume"]), index=df.index)
+    return feat.shift(1)  # shift to ensure only past info is used
+
+
+def _minimal_columns(c: pd.Series, volume: pd.Series) -> Dict[str, pd.Series]:
+    # Minimal but robust features
+    return {
+        "ret1": c.pct_change(),  # 1-bar return
+        "ret2": c.pct_change(2),  # 2-bar return
+        "ma_gap": (c.rolling(5).mean() / c.rolling(20).mean()) - 1.0,
+        "ma_slope": c.rolling(5).mean().pct_change(),  # slope of short MA
+        "vol20": c.pct_change().rolling(20).std(),  # realized volatility
+        "volchg": volume.pct_change(),  # volume change
+    }
+
+
+def feature_block(
+    df: pd.DataFrame, spec: Union[None, str, Dict[str, Any]] = None, dtype=np.float64
+) -> Tuple[np.ndarray, List[str]]:
+    """`feature_frame` values as one preallocated (bars, features) array of `dtype`.
+
+    Each feature is written (already shifted) straight into the block, so
+    there is no per-column frame, shift copy or concat.
+    """
+    spec = resolve_spec(spec)
+    if "factors" in spec:
+        return factor_block(df, spec["factors"], dtype=dtype, shift=1)
+    if "timeframes" in spec:
+        feat = feature_frame(df, spec)
+        return feat.to_numpy(dtype=dtype), list(feat.columns)
+    # float64 arithmetic even for float32 prices; rounded once on store
+    cols = _minimal_columns(df["Close"].astype(np.float64), df["Volume"].astype(np.float64))
+    block = np.full((len(cols), len(df)), np.nan, dtype=dtype)
+    for j, col in enumerate(cols.values()):
+        block[j, 1:] = col.to_numpy()[:-1]
+    return block.T, list(cols)
+
+
+def build_features(
+    df: pd.DataFrame, spec: Union[None, str, Dict[str, Any]] = None, compact: bool = False
+) -> pd.DataFrame:
+    """Create the feature set of `spec` (minimal by default) and labeled target.
 
 
     Notes
     -----
+    - `spec` is None (FEATURE_SPEC), a FEATURE_SPECS name or a spec dict with
+      a `factors` list (see `models.factors`) or `timeframes` (higher-interval
+      features of completed bars, see `models.multi_timeframe`).
     - All features are shifted by 1 to avoid lookahead bias.
     - Target y = 1 if next bar return > 0 else 0.
     - Requires enough history for rolling windows.
+    - `compact=True` returns float32 features and a uint8 `y`, built in one
+      preallocated block (see COMPACT_FEATURE_DTYPE for precision bounds).
     """
     c = df["Close"]
+    if compact:
+        data = _build_compact(df, spec)
+    else:
+        feat = feature_frame(df, spec)
 
 
-    # Minimal but robust features
-    feat = pd.DataFrame(
-        {
-            "ret1": c.pct_change(),  # 1-bar return
-            "ret2": c.pct_change(2),  # 2-bar return
-            "ma_gap": (c.rolling(5).mean() / c.rolling(20).mean()) - 1.0,
-            "ma_slope": c.rolling(5).mean().pct_change(),  # slope of short MA
-            "vol20": c.pct_change().rolling(20).std(),  # realized volatility
-            "volchg": df["Volume"].pct_change(),  # volume change
-        },
-        index=df.index,
-    ).shift(1)  # shift to ensure only past info is used
-
-
-    y = (c.pct_change().shift(-1) > 0).astype(int).rename("y")
+        y = (c.pct_change().shift(-1) > 0).astype(int).rename("y")
 
 
-    data = pd.concat([feat, y], axis=1).dropna()
+        data = pd.concat([feat, y], axis=1).dropna()
 
 
     # sanity check: must have enough rows for training
@@ -58,8 +201,45 @@ def build_features(df: pd.DataFrame) -> pd.DataFrame:
 
 
 
-def train_predict(df: pd.DataFrame, train_ratio: float = 0.7, seed: int = 42) -> Tuple[pd.DatetimeIndex, pd.Series]:
-    """Train logistic regression on early segment and predict proba on later segment.
+def _build_compact(df: pd.DataFrame, spec: Union[None, str, Dict[str, Any]]) -> pd.DataFrame:
+    block, names = feature_block(df, spec, dtype=COMPACT_FEATURE_DTYPE)
+    y = (df["Close"].pct_change().shift(-1) > 0).to_numpy(dtype=np.uint8)
+    valid = ~np.isnan(block).any(axis=1)
+    first = int(valid.argmax()) if valid.any() else len(valid)
+    if valid[first:].all():
+        # NaNs only in the warm-up rows (the usual case): a view, not a copy
+        rows = slice(first, None)
+    else:
+        rows = valid
+    data = pd.DataFrame(block[rows], index=df.index[rows], columns=names, copy=False)
+    data["y"] = y[rows]
+    return data
+
+
+
+
+def make_model(seed: int = 42, warm_start: bool = False) -> Pipeline:
+    """StandardScaler + LogisticRegression pipeline used for every fit."""
+    return Pipeline(
+        steps=[
+            ("scaler", StandardScaler()),
+            ("clf", LogisticRegression(max_iter=500, random_state=seed, warm_start=warm_start)),
+        ]
+    )
+
+
+
+
+def train_predict(
+    df: pd.DataFrame,
+    train_ratio: float = 0.7,
+    seed: int = 42,
+    feature_store: Optional["FeatureStore"] = None,
+    model: Union[str, "Model"] = "logistic",
+    feature_spec: Union[None, str, Dict[str, Any]] = None,
+    compact: bool = False,
+) -> Tuple[pd.DatetimeIndex, pd.Series]:
+    """Train a classifier on early segment and predict proba on later segment.
 
     Parameters
     ----------
@@ -69,6 +249,15 @@ def train_predict(df: pd.DataFrame, train_ratio: float = 0.7, seed: int = 42) ->
     Split ratio in time order; early part for training.
     seed : int
     Random seed for reproducibility.
+    feature_store : FeatureStore, optional
+    Reuse cached features for identical bars / feature spec.
+    model : str or Model
+    Registry name (see `models.registry.available_models()`) or an unfitted
+    backend instance; defaults to the logistic baseline.
+    feature_spec : str or dict, optional
+    Feature set (see `build_features`); defaults to FEATURE_SPEC.
+    compact : bool
+    Build float32 features / uint8 labels (see COMPACT_FEATURE_DTYPE).
 
 
     Returns
@@ -76,7 +265,13 @@ def train_predict(df: pd.DataFrame, train_ratio: float = 0.7, seed: int = 42) ->
     Tuple[pd.DatetimeIndex, pd.Series]
     (test_index, proba_up), where proba_up is aligned with test timestamps.
     """
-    data = build_features(df)
+    spec = resolve_spec(feature_spec)
+    with stage("features", rows=len(df)):
+        if feature_store is not None:
+            key_spec = dict(spec, compact=True) if compact else spec
+            data = feature_store.get_or_build(df, lambda d: build_features(d, spec, compact), key_spec)
+        else:
+            data = build_features(df, spec, compact)
     split = int(len(data) * train_ratio)
 
 
@@ -84,19 +279,16 @@ def train_predict(df: pd.DataFrame, train_ratio: float = 0.7, seed: int = 42) ->
     test = data.iloc[split:]
 
 
-    X_train = train.drop(columns="y")
-    y_train = train["y"]
     X_test = test.drop(columns="y")
 
 
-    model = Pipeline(
-        steps=[
-            ("scaler", StandardScaler()),
-            ("clf", LogisticRegression(max_iter=500, random_state=seed)),
-        ]
-    )
-    model.fit(X_train, y_train)
+    # training half of the artifact split; the predict-only path reuses it
+    from models.artifacts import fit_artifact
+
+    with stage("fit", rows=len(train)):
+        artifact = fit_artifact(train, model=model, seed=seed, source=df.loc[: train.index[-1]], feature_spec=spec)
 
 
-    proba_up = pd.Series(model.predict_proba(X_test)[:, 1], index=X_test.index, name="proba_up")
+    with stage("predict", rows=len(X_test)):
+        proba_up = pd.Series(artifact.predict_features(X_test), index=X_test.index, name="proba_up")
     return X_test.index, proba_up
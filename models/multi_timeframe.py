@@ -0,0 +1,309 @@
+"""Higher-timeframe features joined onto base bars without lookahead.
+
+A multi-timeframe spec (e.g. MTF_SPEC in `models.logistic_model`) holds the
+`base` feature set of the bar interval plus, per `timeframes` entry, the
+features of `spec` computed on `interval` bars. The higher bars are derived
+from the base bars with `data.resample` (HKEX-session aligned), or passed in
+pre-built, e.g. from a `ResampledBars` cache. Their columns are named
+`{feature}_{interval}` (e.g. `ma_gap_1d`).
+
+Alignment ("only completed bars"): base row t sees the newest higher bar
+whose session bucket lies strictly before the bucket containing bar t. Every
+base bar feeding that higher bar is at or before t-1, which is the
+information set of the base features (shifted by one bar), and the higher
+bar has closed by the start of bar t. Higher features are not shifted again:
+a completed bar's own close is known. Base bars outside the HKEX sessions
+belong to no bucket and get NaN higher features (dropped by
+`build_features`).
+
+The join is one `np.searchsorted` over (symbol, time) keys for the whole
+panel. Higher-bar labels and base buckets are ranked against the sorted
+distinct labels and offset by symbol code, so no per-symbol `merge_asof` or
+Python loop is involved.
+"""
+from __future__ import annotations
+
+
+from datetime import date
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from data.calendar import HKEXCalendar, interval_to_timedelta
+from data.resample import resample_ohlcv, resample_panel, session_labels, wall_clock_ns
+from models.factors import factor_block
+from models.logistic_model import feature_frame, feature_lookback, resolve_spec
+from models.panel_features import FEATURE_COLUMNS, build_features_panel, raw_features_long
+
+
+OHLCV_COLS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def completed_rows(
+    base_codes: np.ndarray,
+    base_buckets: np.ndarray,
+    bar_codes: np.ndarray,
+    bar_labels: np.ndarray,
+) -> np.ndarray:
+    """Row of the newest higher bar completed before each base bar's bucket.
+
+
+    Parameters
+    ----------
+    base_codes, base_buckets : np.ndarray
+    Symbol code and higher-timeframe bucket label (int64 ns) of each base
+    bar, in any order.
+    bar_codes, bar_labels : np.ndarray
+    Symbol code and label (int64 ns) of each higher bar, sorted by
+    (code, label).
+
+
+    Returns
+    -------
+    np.ndarray
+    Index into the higher bars of the same symbol's newest bar with a
+    label strictly before the base bar's bucket, or -1 if there is none.
+    """
+    times = np.unique(bar_labels)
+    width = len(times) + 1
+    bar_keys = bar_codes.astype(np.int64) * width + np.searchsorted(times, bar_labels)
+    # rank of a bucket = number of distinct labels strictly before it
+    base_keys = base_codes.astype(np.int64) * width + np.searchsorted(times, base_buckets)
+    rows = np.searchsorted(bar_keys, base_keys) - 1
+    found = rows >= 0
+    found[found] = bar_codes[rows[found]] == base_codes[found]
+    return np.where(found, rows, -1)
+
+
+def higher_features(
+    bars: pd.DataFrame, spec: Union[None, str, Dict[str, Any]] = None
+) -> Tuple[np.ndarray, List[str]]:
+    """Unshifted features of `spec` for every row of a long (symbol, label) bar frame.
+
+    Row i only uses its symbol's bars up to and including bar i. The minimal
+    set runs once over the whole panel; factor specs run the fused kernel
+    per symbol.
+    """
+    spec = resolve_spec(spec)
+    if "timeframes" in spec:
+        raise ValueError("Higher timeframes take a single-interval feature spec.")
+    codes = bars.index.codes[0].astype(np.int64)
+    if "factors" not in spec:
+        close = bars["Close"].to_numpy(dtype=np.float64)
+        volume = bars["Volume"].to_numpy(dtype=np.float64)
+        return raw_features_long(codes, close, volume), list(FEATURE_COLUMNS)
+    bounds = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1], True])
+    blocks = []
+    names: List[str] = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        block, names = factor_block(bars.iloc[lo:hi].droplevel(0), spec["factors"], dtype=np.float64, shift=0)
+        blocks.append(block)
+    values = np.concatenate(blocks) if blocks else np.empty((0, len(spec["factors"])))
+    return values, names
+
+
+def align_higher(
+    base_index: pd.MultiIndex,
+    bars: pd.DataFrame,
+    interval: str,
+    spec: Union[None, str, Dict[str, Any]] = None,
+    calendar: Optional[HKEXCalendar] = None,
+) -> pd.DataFrame:
+    """Features of completed `interval` bars aligned onto a (symbol, timestamp) index.
+
+
+    Parameters
+    ----------
+    base_index : pd.MultiIndex
+    (symbol, timestamp) of the base rows to fill.
+    bars : pd.DataFrame
+    Long (symbol, label) OHLCV frame of `interval` bars, e.g. from
+    `resample_panel` or `ResampledBars`.
+    interval : str
+    Interval of `bars`; defines the session buckets of the base rows.
+    spec : str or dict, optional
+    Single-interval feature spec computed on `bars`.
+    calendar : HKEXCalendar, optional
+    Trading calendar; defaults to `HKEXCalendar()`.
+
+
+    Returns
+    -------
+    pd.DataFrame
+    One row per base row, columns `{feature}_{interval}`; NaN where no
+    higher bar has completed yet (or the bar is outside the sessions).
+    """
+    if not bars.index.is_monotonic_increasing:
+        bars = bars.sort_index()
+    values, names = higher_features(bars, spec)
+    columns = [f"{name}_{interval}" for name in names]
+
+    base_syms = base_index.levels[0]
+    bar_idx = bars.index.remove_unused_levels()
+    bar_codes = base_syms.get_indexer(bar_idx.levels[0])[bar_idx.codes[0]]
+    if (bar_codes < 0).any():
+        # symbols without base rows: their bars can never be matched
+        keep = bar_codes >= 0
+        bar_codes, values, bar_idx = bar_codes[keep], values[keep], bar_idx[keep]
+    bar_labels = wall_clock_ns(bar_idx.get_level_values(1))
+
+    buckets, valid = session_labels(base_index.get_level_values(1), interval, calendar)
+    rows = completed_rows(base_index.codes[0], buckets, bar_codes, bar_labels)
+    rows[~valid] = -1
+    out = np.full((len(base_index), len(columns)), np.nan)
+    hit = rows >= 0
+    out[hit] = values[rows[hit]]
+    return pd.DataFrame(out, index=base_index, columns=columns)
+
+
+def _bars_per_bucket(base_interval: str, interval: str) -> int:
+    """Most base bars that fall into one `interval` bucket."""
+    base_step = interval_to_timedelta(base_interval)
+    step = interval_to_timedelta(interval)
+    day = pd.Timedelta(days=1)
+    if step < day or base_step >= day:
+        return -(-step // base_step)
+    full_day = HKEXCalendar(holidays=(), half_days=()).bar_labels(date(2024, 1, 2), base_interval)
+    return len(full_day) * (step // day)
+
+
+def _check_bar_spacing(stamps: pd.DatetimeIndex, spec: Dict[str, Any], codes: Optional[np.ndarray] = None) -> None:
+    """Raise if bars (per symbol `codes`) are finer than the spec's `base_interval`.
+
+    `mtf_lookback` counts the base bars of a bucket from `base_interval`;
+    finer bars need more of them, so windowed rebuilds (streaming, artifact
+    scoring) would silently lose history.
+    """
+    step = np.diff(stamps.asi8)
+    if codes is not None:
+        step = step[codes[1:] == codes[:-1]]
+    step = step[step > 0]
+    base = interval_to_timedelta(spec["base_interval"])
+    if len(step) and step.min() < base.value:
+        raise ValueError(
+            f"Feature spec {spec.get('name')!r} is defined on {spec['base_interval']} bars; "
+            f"got bars {pd.Timedelta(int(step.min()))} apart."
+        )
+
+
+def mtf_lookback(spec: Dict[str, Any], exact: bool = False) -> int:
+    """Base bars of history the newest rows of a multi-timeframe spec depend on.
+
+    Each higher timeframe needs its own lookback in higher bars, plus the
+    bucket still in progress and a possibly partial first bucket, each of up
+    to `_bars_per_bucket` base bars. The count assumes bars of the spec's
+    `base_interval` (or coarser); finer bars are rejected when features are
+    built.
+    """
+    lookback = feature_lookback(spec["base"], exact)
+    for tf in spec["timeframes"]:
+        per_bucket = _bars_per_bucket(spec["base_interval"], tf["interval"])
+        lookback = max(lookback, (feature_lookback(tf["spec"], exact) + 2) * per_bucket)
+    return lookback
+
+
+def mtf_feature_frame(
+    df: pd.DataFrame,
+    spec: Dict[str, Any],
+    calendar: Optional[HKEXCalendar] = None,
+) -> pd.DataFrame:
+    """`feature_frame` of a multi-timeframe spec for one symbol's bars.
+
+    Higher bars are resampled from `df` itself, so a window spanning
+    `mtf_lookback(spec)` bars reproduces the newest rows of the full history
+    (up to rounding of the rolling accumulators). Raises ValueError for bars
+    finer than the spec's `base_interval`.
+    """
+    _check_bar_spacing(df.index, spec)
+    feat = feature_frame(df, spec["base"])
+    index = pd.MultiIndex.from_arrays([np.zeros(len(df), dtype=np.int64), df.index])
+    parts = [feat]
+    for tf in spec["timeframes"]:
+        bars = resample_ohlcv(df[OHLCV_COLS], tf["interval"], calendar)
+        bars.index = pd.MultiIndex.from_arrays([np.zeros(len(bars), dtype=np.int64), bars.index])
+        higher = align_higher(index, bars, tf["interval"], tf["spec"], calendar)
+        parts.append(higher.set_axis(df.index))
+    return pd.concat(parts, axis=1)
+
+
+def _long_ohlcv(data: Union[pd.DataFrame, Mapping[str, pd.DataFrame]]) -> pd.DataFrame:
+    if isinstance(data, Mapping):
+        # column selection copies, so only select when the order differs
+        data = pd.concat({sym: df if list(df.columns) == OHLCV_COLS else df[OHLCV_COLS] for sym, df in data.items()})
+    if not data.index.is_monotonic_increasing:
+        data = data.sort_index()
+    return data
+
+
+def build_features_mtf(
+    data: Union[pd.DataFrame, Mapping[str, pd.DataFrame]],
+    spec: Union[str, Dict[str, Any]] = "mtf_daily",
+    higher: Optional[Mapping[str, Union[pd.DataFrame, Mapping[str, pd.DataFrame]]]] = None,
+    calendar: Optional[HKEXCalendar] = None,
+    min_rows: int = 200,
+) -> pd.DataFrame:
+    """Multi-timeframe `build_features` table for many symbols in one pass.
+
+    Raises ValueError if `spec` has no higher timeframes or the bars are
+    finer than its `base_interval`.
+
+
+    Parameters
+    ----------
+    data : pd.DataFrame or Mapping[str, pd.DataFrame]
+    Base OHLCV bars: a long frame indexed by (symbol, timestamp) or
+    {symbol: OHLCV frame}, as returned by `download_many`.
+    spec : str or dict
+    Multi-timeframe feature spec (a FEATURE_SPECS name or dict).
+    higher : Mapping[str, DataFrame or Mapping], optional
+    Pre-built higher bars per interval (long frame or {symbol: frame}),
+    e.g. read from `ResampledBars`; missing intervals are resampled from
+    `data` with `resample_panel`.
+    calendar : HKEXCalendar, optional
+    Trading calendar; defaults to `HKEXCalendar()`.
+    min_rows : int
+    Symbols with fewer usable rows are left out (`build_features` raises).
+
+
+    Returns
+    -------
+    pd.DataFrame
+    Long frame indexed by (symbol, timestamp): base features, higher
+    features, `y`. With bars resampled from `data`, `out.xs(sym)` equals
+    `build_features(df_sym, spec)` exactly.
+    """
+    spec = resolve_spec(spec)
+    if "timeframes" not in spec:
+        raise ValueError(f"Feature spec {spec.get('name')!r} has no higher timeframes.")
+    long = _long_ohlcv(data)
+    _check_bar_spacing(long.index.get_level_values(1), spec, long.index.codes[0])
+    base_spec = resolve_spec(spec["base"])
+    if "factors" in base_spec:
+        tables = {}
+        for sym, g in long.groupby(level=0, sort=False):
+            g = g.droplevel(0)
+            y = (g["Close"].pct_change().shift(-1) > 0).astype(int).rename("y")
+            tables[sym] = pd.concat([feature_frame(g, base_spec), y], axis=1).dropna()
+        base = pd.concat(tables, names=long.index.names)
+    else:
+        base = build_features_panel(long, min_rows=0)
+    base.index = base.index.remove_unused_levels()
+
+    parts = [base.drop(columns="y")]
+    for tf in spec["timeframes"]:
+        interval = tf["interval"]
+        if higher is not None and interval in higher:
+            bars = _long_ohlcv(higher[interval])
+        else:
+            bars = resample_panel(long if list(long.columns) == OHLCV_COLS else long[OHLCV_COLS], interval, calendar)
+        parts.append(align_higher(base.index, bars, interval, tf["spec"], calendar))
+    parts.append(base[["y"]])
+    out = pd.concat(parts, axis=1)
+    out = out[~np.isnan(out.to_numpy(dtype=np.float64)).any(axis=1)]
+
+    counts = out.groupby(level=0, sort=False).size()
+    small = counts.index[counts < min_rows]
+    if len(small):
+        out = out.drop(index=small, level=0)
+    return out
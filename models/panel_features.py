@@ -0,0 +1,177 @@
+"""Vectorized multi-symbol (panel) version of `build_features`.
+
+All symbols are laid out side by side as columns of one position-aligned
+frame (row k = the k-th bar of each symbol, shorter histories padded at the
+end), so every rolling/shift expression runs once over the whole universe and
+shared intermediates (forward-filled close, 1-bar return, MA5) are computed a
+single time. Because each column sees exactly its own bar sequence, results
+are bit-identical to calling `build_features` symbol by symbol.
+"""
+from __future__ import annotations
+
+
+from typing import Dict, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+FEATURE_COLUMNS = ["ret1", "ret2", "ma_gap", "ma_slope", "vol20", "volchg"]
+
+
+def _pct_change(x: pd.DataFrame, periods: int = 1) -> pd.DataFrame:
+    """`pct_change` of an already forward-filled frame.
+
+    pandas' `pct_change` pads and then computes `x / x.shift(p) - 1`; doing the
+    pad explicitly gives bit-identical values without the fill-method warning
+    the end-padded layout would trigger.
+    """
+    return x / x.shift(periods) - 1
+
+
+def _to_long_arrays(
+    data: Union[pd.DataFrame, Mapping[str, pd.DataFrame]],
+    volume: Optional[pd.DataFrame],
+) -> Tuple[pd.Index, np.ndarray, pd.Index, np.ndarray, np.ndarray, np.ndarray]:
+    """Flatten any supported input into symbol-major arrays.
+
+    Returns (symbols, symbol_codes, stamp_levels, stamp_codes, close, volume);
+    timestamps stay factorized so the output index is built without rehashing.
+    """
+    if isinstance(data, Mapping):
+        data = pd.concat({sym: df[["Close", "Volume"]] for sym, df in data.items()})
+
+    if isinstance(data.index, pd.MultiIndex):
+        # long frame indexed by (symbol, timestamp)
+        if not data.index.is_monotonic_increasing:
+            data = data.sort_index()
+        idx = data.index.remove_unused_levels()
+        return (
+            idx.levels[0],
+            idx.codes[0].astype(np.int64),
+            idx.levels[1],
+            idx.codes[1].astype(np.int64),
+            data["Close"].to_numpy(dtype=np.float64),
+            data["Volume"].to_numpy(dtype=np.float64),
+        )
+
+    # wide close (time x symbol); a NaN close means "no bar for that symbol"
+    if volume is None:
+        raise ValueError("A wide close frame needs a matching wide `volume` frame.")
+    volume = volume.reindex(index=data.index, columns=data.columns)
+    c = data.to_numpy(dtype=np.float64)
+    col, row = np.nonzero(~np.isnan(c).T)
+    return (
+        data.columns,
+        col.astype(np.int64),
+        data.index,
+        row.astype(np.int64),
+        c[row, col],
+        volume.to_numpy(dtype=np.float64)[row, col],
+    )
+
+
+def _layout(codes: np.ndarray, n_sym: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """(lengths, starts, pos, depth) of symbol-major rows in the position-aligned grid."""
+    lengths = np.bincount(codes, minlength=n_sym)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    # position of each bar inside its symbol's own sequence
+    pos = np.arange(len(codes)) - starts[codes]
+    depth = int(lengths.max()) if len(codes) else 0
+    return lengths, starts, pos, depth
+
+
+def _grid(values: np.ndarray, pos: np.ndarray, codes: np.ndarray, depth: int, n_sym: int) -> pd.DataFrame:
+    grid = np.full((depth, n_sym), np.nan)
+    grid[pos, codes] = values
+    return pd.DataFrame(grid)
+
+
+def _raw_columns(c: pd.DataFrame, v: pd.DataFrame) -> Tuple[Dict[str, pd.DataFrame], pd.DataFrame]:
+    """Unshifted FEATURE_COLUMNS over the grid, plus the 1-bar return."""
+    # shared intermediates, each computed once for the whole universe
+    c_pad = c.ffill()
+    ret1 = _pct_change(c_pad)
+    ma5 = c.rolling(5).mean()
+    ma20 = c.rolling(20).mean()
+
+    raw = {
+        "ret1": ret1,
+        "ret2": _pct_change(c_pad, 2),
+        "ma_gap": (ma5 / ma20) - 1.0,
+        "ma_slope": _pct_change(ma5.ffill()),
+        "vol20": ret1.rolling(20).std(),
+        "volchg": _pct_change(v.ffill()),
+    }
+    return raw, ret1
+
+
+def raw_features_long(codes: np.ndarray, close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """Unshifted minimal features of symbol-major long rows, as an (n, 6) array.
+
+    Row i holds the FEATURE_COLUMNS of bar i computed from its symbol's bars
+    up to and including bar i (what `feature_frame` holds one row later).
+    `codes` must be sorted (all bars of a symbol contiguous, in time order).
+    """
+    n_sym = int(codes.max()) + 1 if len(codes) else 0
+    _, _, pos, depth = _layout(codes, n_sym)
+    raw, _ = _raw_columns(_grid(close, pos, codes, depth, n_sym), _grid(volume, pos, codes, depth, n_sym))
+    return np.column_stack([f.to_numpy()[pos, codes] for f in raw.values()])
+
+
+def build_features_panel(
+    data: Union[pd.DataFrame, Mapping[str, pd.DataFrame]],
+    volume: Optional[pd.DataFrame] = None,
+    min_rows: int = 200,
+) -> pd.DataFrame:
+    """Compute the `build_features` table for many symbols in one pass.
+
+    Parameters
+    ----------
+    data : pd.DataFrame or Mapping[str, pd.DataFrame]
+    One of
+      - long frame indexed by (symbol, timestamp) with `Close`/`Volume`;
+      - wide Close frame (time x symbol) plus a wide `volume` frame;
+      - {symbol: OHLCV frame}, as returned by `download_many`.
+    volume : pd.DataFrame, optional
+    Wide Volume frame; required with a wide Close frame.
+    min_rows : int
+    Symbols with fewer usable rows are left out (`build_features` raises).
+
+    Returns
+    -------
+    pd.DataFrame
+    Long frame indexed by (symbol, timestamp) with FEATURE_COLUMNS + `y`;
+    `out.xs(sym)` equals `build_features(df_sym)` exactly.
+    """
+    symbols, codes, stamp_levels, stamp_codes, close, vol = _to_long_arrays(data, volume)
+    n_sym = len(symbols)
+    lengths, starts, pos, depth = _layout(codes, n_sym)
+    raw, ret1 = _raw_columns(_grid(close, pos, codes, depth, n_sym), _grid(vol, pos, codes, depth, n_sym))
+    feats = {k: f.shift(1).to_numpy() for k, f in raw.items()}
+    y = (ret1.shift(-1) > 0).to_numpy()
+
+    # keep real bars whose features are all defined (the per-symbol dropna)
+    keep = np.arange(depth)[:, None] < lengths[None, :]
+    for arr in feats.values():
+        keep &= ~np.isnan(arr)
+    # a symbol's last real bar has no next bar; build_features labels it 0
+    last = lengths - 1
+    has_rows = lengths > 0
+    y[last[has_rows], np.flatnonzero(has_rows)] = False
+
+    per_symbol = keep.sum(axis=0)
+    keep &= (per_symbol >= min_rows)[None, :]
+
+    # symbol-major extraction: transpose so nonzero walks symbol, then time
+    keep_t = keep.T
+    sym_idx, row_idx = np.nonzero(keep_t)
+    index = pd.MultiIndex(
+        levels=[symbols, stamp_levels],
+        codes=[sym_idx, stamp_codes[starts[sym_idx] + row_idx]],
+        names=["symbol", stamp_levels.name],
+        verify_integrity=False,
+    )
+    out = pd.DataFrame({k: arr.T[keep_t] for k, arr in feats.items()}, index=index)
+    out["y"] = y.T[keep_t].astype(int)
+    return out
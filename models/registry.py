@@ -0,0 +1,164 @@
+"""Model interface and registry for the up/down classifiers.
+
+Every backend implements `fit(X, y)`, `predict_proba(X)` (probability of an
+up move, 1-D), `save(path)` and `load(path)`, and is registered under a short
+name so `train_predict` and `main.py --model` can select it:
+
+- "logistic": StandardScaler + LogisticRegression (the original baseline).
+- "hgb": sklearn's HistGradientBoostingClassifier; bins features once and
+  grows trees with OpenMP threads, so it scales to panel-sized training sets.
+
+`predict_panel` scores a long (symbol, timestamp) feature panel for the whole
+universe in a single `predict_proba` call.
+"""
+from __future__ import annotations
+
+
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional, Union
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier
+from threadpoolctl import threadpool_limits
+
+from models.logistic_model import make_model
+from models.panel_features import FEATURE_COLUMNS
+
+
+class Model:
+    """Base class: wraps an sklearn-style estimator with a fixed feature order."""
+
+    name = "base"
+
+    def __init__(self, estimator, n_threads: Optional[int] = None) -> None:
+        self.estimator = estimator
+        self.n_threads = n_threads
+        self.feature_names: Optional[List[str]] = None
+
+    def _matrix(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            if self.feature_names is not None:
+                X = X[self.feature_names]
+            return X.to_numpy(dtype=np.float64)
+        return np.asarray(X, dtype=np.float64)
+
+    def _threads(self):
+        # threadpoolctl scans loaded libraries on entry (~ms); skip it unless capped
+        return threadpool_limits(limits=self.n_threads) if self.n_threads else nullcontext()
+
+    def fit(self, X: Union[pd.DataFrame, np.ndarray], y) -> "Model":
+        if isinstance(X, pd.DataFrame):
+            self.feature_names = list(X.columns)
+        with self._threads():
+            self.estimator.fit(self._matrix(X), np.asarray(y))
+        return self
+
+    def predict_proba(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        """Probability of the positive (up) class for each row."""
+        with self._threads():
+            return self.estimator.predict_proba(self._matrix(X))[:, 1]
+
+    def save(self, path: str) -> None:
+        joblib.dump(self, path)
+
+    @classmethod
+    def load(cls, path: str) -> "Model":
+        model = joblib.load(path)
+        if not isinstance(model, cls):
+            raise ValueError(f"{path} holds a {type(model).__name__}, not a {cls.__name__}")
+        return model
+
+
+MODEL_REGISTRY: Dict[str, Callable[..., Model]] = {}
+
+
+def register_model(name: str) -> Callable:
+    """Class decorator adding a backend to MODEL_REGISTRY under `name`."""
+
+    def deco(cls):
+        cls.name = name
+        MODEL_REGISTRY[name] = cls
+        return cls
+
+    return deco
+
+
+def available_models() -> List[str]:
+    return sorted(MODEL_REGISTRY)
+
+
+def get_model(name: str, **kwargs) -> Model:
+    """Instantiate the backend registered as `name`."""
+    try:
+        factory = MODEL_REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Unknown model {name!r}; available: {available_models()}") from None
+    return factory(**kwargs)
+
+
+# ---------------- backends ---------------- #
+@register_model("logistic")
+class LogisticModel(Model):
+    """StandardScaler + LogisticRegression (same pipeline as `train_predict`)."""
+
+    def __init__(self, seed: int = 42, n_threads: Optional[int] = None) -> None:
+        super().__init__(make_model(seed), n_threads=n_threads)
+
+
+@register_model("hgb")
+class HistGBModel(Model):
+    """Histogram gradient boosting; uses all cores unless `n_threads` is set."""
+
+    def __init__(
+        self,
+        seed: int = 42,
+        max_iter: int = 200,
+        learning_rate: float = 0.05,
+        max_leaf_nodes: int = 31,
+        min_samples_leaf: int = 50,
+        l2_regularization: float = 1.0,
+        n_threads: Optional[int] = None,
+    ) -> None:
+        super().__init__(
+            HistGradientBoostingClassifier(
+                max_iter=max_iter,
+                learning_rate=learning_rate,
+                max_leaf_nodes=max_leaf_nodes,
+                min_samples_leaf=min_samples_leaf,
+                l2_regularization=l2_regularization,
+                early_stopping=False,
+                random_state=seed,
+            ),
+            n_threads=n_threads,
+        )
+
+
+# ---------------- batched inference ---------------- #
+def predict_panel(model: Model, panel: pd.DataFrame, batch_rows: Optional[int] = None) -> pd.Series:
+    """Score every (symbol, timestamp) row of a feature panel.
+
+    Parameters
+    ----------
+    model : Model
+    Fitted backend.
+    panel : pd.DataFrame
+    Long feature frame, e.g. from `build_features_panel` (extra columns such
+    as `y` are ignored).
+    batch_rows : int, optional
+    Split very large panels into row blocks to bound peak memory; by default
+    the whole panel is scored in one call.
+
+    Returns
+    -------
+    pd.Series
+    `proba_up` indexed like `panel`.
+    """
+    cols = model.feature_names or FEATURE_COLUMNS
+    X = panel[cols].to_numpy(dtype=np.float64)
+    if batch_rows is None or len(X) <= batch_rows:
+        proba = model.predict_proba(X)
+    else:
+        proba = np.concatenate([model.predict_proba(X[k:k + batch_rows]) for k in range(0, len(X), batch_rows)])
+    return pd.Series(proba, index=panel.index, name="proba_up")
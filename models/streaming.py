@@ -0,0 +1,134 @@
+"""Chunked (out-of-core) form of the feature → score → signal path.
+
+Every stage is a generator over time-ordered chunks of bars, so a decade of
+1m bars can be processed with memory bounded by one chunk::
+
+    chunks = iter_ohlcv_chunked("0700.HK", period="10y", interval="1m")   # or iter_local_ohlcv
+    feats = iter_features(chunks, artifact.meta["feature_spec"])
+    probas = iter_predict(feats, artifact, since=artifact.trained_until)
+    for proba, entries, exits in iter_signals(probas, th=0.55):
+        ...
+
+`iter_features` carries the last `feature_lookback(spec, exact=True)` raw
+bars of each chunk into the next one as warm-up rows, and holds back each
+chunk's final row until the next close (its label) is known. Concatenated,
+the chunks equal `build_features` on the whole history (minus its 200-row
+sanity check): same rows, labels and dtypes, with feature values equal up to
+float rounding of the rolling accumulators (~1e-15 relative). Entries/exits
+come from `StatefulSignalAdapter.update_block` and equal `to_entries_exits`
+on the concatenated probabilities.
+"""
+from __future__ import annotations
+
+
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from models.logistic_model import COMPACT_FEATURE_DTYPE, feature_block, feature_frame, feature_lookback, resolve_spec
+from signals.adapter import StatefulSignalAdapter
+
+if TYPE_CHECKING:
+    from models.artifacts import ModelArtifact
+    from models.registry import Model
+
+
+def _table(frame: pd.DataFrame, spec: Dict[str, Any], compact: bool) -> pd.DataFrame:
+    """Features + label of every row of `frame`, before any NaN filtering."""
+    y = frame["Close"].pct_change().shift(-1) > 0
+    if compact:
+        block, names = feature_block(frame, spec, dtype=COMPACT_FEATURE_DTYPE)
+        table = pd.DataFrame(block, index=frame.index, columns=names, copy=False)
+        table["y"] = y.to_numpy(dtype=np.uint8)
+        return table
+    table = feature_frame(frame, spec)
+    table["y"] = y.astype(int)
+    return table
+
+
+def iter_features(
+    chunks: Iterable[pd.DataFrame],
+    spec: Union[None, str, Dict[str, Any]] = None,
+    compact: bool = False,
+) -> Iterator[pd.DataFrame]:
+    """`build_features` over a stream of consecutive OHLCV chunks.
+
+    Parameters
+    ----------
+    chunks : Iterable[pd.DataFrame]
+    Time-ordered, non-overlapping OHLCV frames (rows with NaN are dropped,
+    as `download_ohlcv` does for local data).
+    spec : str or dict, optional
+    Feature set (see `build_features`); defaults to FEATURE_SPEC.
+    compact : bool
+    float32 features / uint8 labels, as `build_features(compact=True)`.
+
+
+    Returns
+    -------
+    Iterator[pd.DataFrame]
+    Feature tables (features + `y`) per chunk; empty tables are skipped.
+    """
+    spec = resolve_spec(spec)
+    warm = feature_lookback(spec, exact=True) + 1
+    tail: Optional[pd.DataFrame] = None
+    last: Optional[pd.DataFrame] = None
+    for chunk in chunks:
+        if chunk.isna().to_numpy().any():
+            chunk = chunk.dropna()
+        if chunk.empty:
+            continue
+        frame = chunk if tail is None else pd.concat([tail, chunk])
+        table = _table(frame, spec, compact)
+        # rows of this chunk plus the previous chunk's held-back last row;
+        # this chunk's last row waits for the next close
+        first = 0 if tail is None else len(tail) - 1
+        out = table.iloc[first:-1].dropna()
+        last = table.iloc[-1:]
+        tail = frame.iloc[-warm:]
+        if not out.empty:
+            yield out
+    if last is not None:
+        # the final bar has no next bar: labelled 0, as in the in-memory path
+        last = last.dropna()
+        if not last.empty:
+            yield last
+
+
+def iter_predict(
+    tables: Iterable[pd.DataFrame],
+    model: Union["ModelArtifact", "Model"],
+    since: Optional[pd.Timestamp] = None,
+) -> Iterator[pd.Series]:
+    """proba_up per feature chunk (optionally only for bars after `since`)."""
+    from models.artifacts import ModelArtifact
+
+    for table in tables:
+        if since is not None:
+            table = table[table.index > since]
+        if table.empty:
+            continue
+        X = table.drop(columns="y")
+        if isinstance(model, ModelArtifact):
+            proba = model.predict_features(X)
+        else:
+            proba = model.predict_proba(X)
+        yield pd.Series(proba, index=X.index, name="proba_up")
+
+
+def iter_signals(
+    probas: Iterable[pd.Series],
+    th: float,
+    exit_th: Optional[float] = None,
+) -> Iterator[Tuple[pd.Series, pd.Series, pd.Series]]:
+    """(proba_up, entries, exits) per chunk; state carries across chunks."""
+    adapter = StatefulSignalAdapter(th, exit_th)
+    for proba in probas:
+        proba = proba.dropna()
+        entries, exits = adapter.update_block(proba.to_numpy())
+        yield (
+            proba,
+            pd.Series(entries[:, 0], index=proba.index),
+            pd.Series(exits[:, 0], index=proba.index),
+        )
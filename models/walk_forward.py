@@ -0,0 +1,216 @@
+"""Walk-forward (expanding or rolling window) training for the up/down classifiers.
+
+The feature table is split into consecutive out-of-sample test blocks; each
+fold fits a fresh model (the `make_model` pipeline, or any registry backend)
+on the bars before its block and predicts the block, and the per-fold
+`proba_up` pieces are stitched back together.
+
+Folds run in a process pool. The feature matrix is copied once into a
+`multiprocessing.shared_memory` block that workers map by name, so no fold
+pickles its training data. With `warm_start=True` folds are handed out in
+contiguous chains (one per worker); inside a chain each fit starts from the
+previous fold's coefficients, which cuts L-BFGS iterations because adjacent
+folds share most of their training rows.
+"""
+from __future__ import annotations
+
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from models.logistic_model import build_features, make_model, resolve_spec
+from models.registry import available_models, get_model
+
+if TYPE_CHECKING:
+    from models.feature_store import FeatureStore
+
+
+# (train_start, train_end, test_start, test_end) row positions, end-exclusive
+Fold = Tuple[int, int, int, int]
+
+
+def fold_bounds(
+    n_rows: int,
+    n_folds: int = 5,
+    train_ratio: float = 0.7,
+    train_window: Optional[int] = None,
+) -> List[Fold]:
+    """Split `n_rows` into walk-forward folds.
+
+    Parameters
+    ----------
+    n_rows : int
+    Number of rows in the feature table.
+    n_folds : int
+    Number of out-of-sample blocks covering rows after the first training span.
+    train_ratio : float
+    Share of rows in the first training span (same meaning as in `train_predict`).
+    train_window : int, optional
+    Fit on at most this many most recent rows (rolling window); default expanding.
+
+    Returns
+    -------
+    List[Fold]
+    (train_start, train_end, test_start, test_end) per fold; test blocks are
+    contiguous and together cover rows `int(n_rows * train_ratio):`.
+    """
+    first = int(n_rows * train_ratio)
+    if n_folds < 1:
+        raise ValueError("n_folds must be >= 1")
+    if first < 1 or n_rows - first < n_folds:
+        raise ValueError(
+            f"Cannot build {n_folds} folds from {n_rows} rows with train_ratio={train_ratio}."
+        )
+    edges = np.linspace(first, n_rows, n_folds + 1).astype(int)
+    folds = []
+    for test_start, test_end in zip(edges[:-1], edges[1:]):
+        train_start = 0 if train_window is None else max(0, test_start - train_window)
+        folds.append((train_start, int(test_start), int(test_start), int(test_end)))
+    return folds
+
+
+# ---------------- worker side ---------------- #
+_SHARED = {}
+
+
+def _attach(name: str, shape: Tuple[int, int], dtype: str = "float64") -> None:
+    """Pool initializer: map the shared feature block (X columns + y last)."""
+    shm = shared_memory.SharedMemory(name=name)
+    _SHARED["shm"] = shm  # keep the mapping alive for the worker's lifetime
+    _SHARED["data"] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _fit_chain(
+    folds: Sequence[Fold], seed: int, warm_start: bool, model_name: str = "logistic"
+) -> List[Tuple[int, int, np.ndarray]]:
+    """Fit/predict consecutive folds, optionally carrying coefficients forward."""
+    data = _SHARED["data"]
+    if model_name == "logistic":
+        model = make_model(seed, warm_start=warm_start)
+    out = []
+    for train_start, train_end, test_start, test_end in folds:
+        train = data[train_start:train_end]
+        X_test = data[test_start:test_end, :-1]
+        if model_name != "logistic":
+            backend = get_model(model_name, seed=seed).fit(train[:, :-1], train[:, -1].astype(int))
+            out.append((test_start, test_end, backend.predict_proba(X_test)))
+            continue
+        if not warm_start:
+            model = make_model(seed)
+        model.fit(train[:, :-1], train[:, -1].astype(int))
+        proba = model.predict_proba(X_test)[:, 1]
+        out.append((test_start, test_end, proba))
+    return out
+
+
+def _chains(folds: List[Fold], n_chains: int, warm_start: bool) -> List[List[Fold]]:
+    if not warm_start:
+        return [[f] for f in folds]
+    # contiguous runs so each chain can reuse its previous fold's solution
+    return [list(c) for c in np.array_split(np.array(folds), n_chains) if len(c)]
+
+
+# ---------------- public API ---------------- #
+def walk_forward_predict(
+    df: pd.DataFrame,
+    n_folds: int = 5,
+    train_ratio: float = 0.7,
+    train_window: Optional[int] = None,
+    folds: Optional[Sequence[Fold]] = None,
+    warm_start: bool = False,
+    max_workers: Optional[int] = None,
+    seed: int = 42,
+    feature_store: Optional["FeatureStore"] = None,
+    feature_spec: Union[None, str, Dict[str, Any]] = None,
+    model: str = "logistic",
+    compact: bool = False,
+) -> Tuple[pd.DatetimeIndex, pd.Series]:
+    """Walk-forward counterpart of `train_predict`.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+    OHLCV dataframe (tz-aware, HK time) with columns including `Close` and `Volume`.
+    n_folds, train_ratio, train_window :
+    Passed to `fold_bounds` unless `folds` is given.
+    folds : Sequence[Fold], optional
+    Explicit (train_start, train_end, test_start, test_end) row positions in
+    the feature table; test blocks must be disjoint and increasing.
+    warm_start : bool
+    Start each fit from the previous fold's coefficients (within a chain);
+    logistic model only.
+    max_workers : int, optional
+    Pool size; 1 runs in-process. Defaults to min(#folds, cpu count).
+    seed : int
+    Random seed for reproducibility.
+    feature_store : FeatureStore, optional
+    Reuse cached features for identical bars / feature spec.
+    feature_spec : str or dict, optional
+    Feature set (see `build_features`); defaults to FEATURE_SPEC.
+    model : str
+    Registry name (see `models.registry.available_models()`) of the backend
+    fitted per fold; defaults to the logistic baseline.
+    compact : bool
+    Build float32 features / uint8 labels and share them as a float32 block
+    (see COMPACT_FEATURE_DTYPE).
+
+    Returns
+    -------
+    Tuple[pd.DatetimeIndex, pd.Series]
+    (test_index, proba_up) covering every fold's test block in time order.
+    """
+    if model not in available_models():
+        raise ValueError(f"Unknown model {model!r}; available: {available_models()}")
+    if warm_start and model != "logistic":
+        raise ValueError(f"warm_start is only supported for the logistic model, not {model!r}.")
+    spec = resolve_spec(feature_spec)
+    if feature_store is not None:
+        key_spec = dict(spec, compact=True) if compact else spec
+        data = feature_store.get_or_build(df, lambda d: build_features(d, spec, compact), key_spec)
+    else:
+        data = build_features(df, spec, compact)
+
+    if folds is None:
+        folds = fold_bounds(len(data), n_folds, train_ratio, train_window)
+    folds = [tuple(int(v) for v in f) for f in folds]
+    if max_workers is None:
+        max_workers = min(len(folds), os.cpu_count() or 1)
+    max_workers = max(1, min(max_workers, len(folds)))
+    chains = _chains(folds, max_workers, warm_start)
+
+    # X columns followed by y, one block shared with every worker
+    dtype = "float32" if compact else "float64"
+    matrix = np.column_stack([data.drop(columns="y").to_numpy(dtype=dtype), data["y"].to_numpy(dtype=dtype)])
+    shm = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+    try:
+        np.ndarray(matrix.shape, dtype=dtype, buffer=shm.buf)[:] = matrix
+        del matrix
+        if max_workers == 1:
+            _SHARED["data"] = np.ndarray((len(data), data.shape[1]), dtype=dtype, buffer=shm.buf)
+            try:
+                results = [r for chain in chains for r in _fit_chain(chain, seed, warm_start, model)]
+            finally:
+                _SHARED.clear()
+        else:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_attach,
+                initargs=(shm.name, (len(data), data.shape[1]), dtype),
+            ) as pool:
+                futures = [pool.submit(_fit_chain, chain, seed, warm_start, model) for chain in chains]
+                results = [r for fut in futures for r in fut.result()]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # stitch out-of-sample pieces in time order
+    results.sort(key=lambda r: r[0])
+    positions = np.concatenate([np.arange(s, e) for s, e, _ in results])
+    proba = np.concatenate([p for _, _, p in results])
+    test_index = data.index[positions]
+    return test_index, pd.Series(proba, index=test_index, name="proba_up")
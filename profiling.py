@@ -0,0 +1,266 @@
+"""Per-stage timing / memory instrumentation for the pipeline.
+
+Code marks its stages with `stage(name)` (a context manager) or `@timed(name)`;
+both are no-ops unless a `StageProfiler` is active, so library code can stay
+instrumented permanently at negligible cost::
+
+    profiler = StageProfiler(cprofile=True)
+    with profiler.activate():
+        with stage("load_data") as rec:
+            df = load(...)
+            rec.rows = len(df)
+    profiler.write("profile.json")                    # structured JSON
+    profiler.write("profile.trace.json", "chrome")    # chrome://tracing / Perfetto
+
+Each record holds wall and CPU time, a row count, RSS before/after, and
+optionally the tracemalloc peak and the top cProfile functions of the stage.
+Stages nest; cProfile is only attached to top-level stages (one profiler can
+run at a time).
+"""
+from __future__ import annotations
+
+
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+def _rss_mb() -> float:
+    # current RSS from /proc (Linux); 0 where unavailable
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return 0.0
+
+
+class StageRecord:
+    """Measurements of one stage; set `rows` inside the `with` block."""
+
+    def __init__(self, name: str, depth: int, start: float) -> None:
+        self.name = name
+        self.depth = depth
+        self.start = start
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.rows: Optional[int] = None
+        self.rss_before_mb = 0.0
+        self.rss_after_mb = 0.0
+        self.tracemalloc_peak_mb: Optional[float] = None
+        self.cprofile_top: Optional[List[Dict[str, Any]]] = None
+        self.error: Optional[str] = None
+        self._tm_start = 0
+        self._tm_peak = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {
+            "name": self.name,
+            "depth": self.depth,
+            "start_s": self.start,
+            "wall_s": self.wall_s,
+            "cpu_s": self.cpu_s,
+            "rows": self.rows,
+            "rss_before_mb": self.rss_before_mb,
+            "rss_after_mb": self.rss_after_mb,
+            "rss_delta_mb": self.rss_after_mb - self.rss_before_mb,
+        }
+        if self.tracemalloc_peak_mb is not None:
+            out["tracemalloc_peak_mb"] = self.tracemalloc_peak_mb
+        if self.cprofile_top is not None:
+            out["cprofile_top"] = self.cprofile_top
+        if self.error is not None:
+            out["error"] = self.error
+        return out
+
+
+class _NullRecord:
+    """Stand-in yielded when profiling is off; attribute writes are discarded."""
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        pass
+
+
+_NULL_RECORD = _NullRecord()
+_ACTIVE: Optional["StageProfiler"] = None
+
+
+class StageProfiler:
+    """Collects `StageRecord`s from `stage()` blocks while active.
+
+    Parameters
+    ----------
+    cprofile : bool
+    Run cProfile over each top-level stage and keep its `top` functions by
+    cumulative time.
+    tracemalloc : bool
+    Trace Python allocations and record each stage's peak above its start
+    (slows allocation-heavy code noticeably).
+    top : int
+    Number of cProfile rows kept per stage.
+    """
+
+    def __init__(self, cprofile: bool = False, tracemalloc: bool = False, top: int = 15) -> None:
+        self.cprofile = cprofile
+        self.tracemalloc = tracemalloc
+        self.top = top
+        self.records: List[StageRecord] = []
+        self._stack: List[StageRecord] = []
+        self._t0 = time.perf_counter()
+
+    @contextmanager
+    def activate(self) -> Iterator["StageProfiler"]:
+        """Make this the profiler that `stage()` reports to."""
+        global _ACTIVE
+        previous, _ACTIVE = _ACTIVE, self
+        started_tm = self.tracemalloc and not tracemalloc.is_tracing()
+        if started_tm:
+            tracemalloc.start()
+        self._t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            _ACTIVE = previous
+            if started_tm:
+                tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[StageRecord]:
+        rec = StageRecord(name, len(self._stack), time.perf_counter() - self._t0)
+        rec.rows = rows
+        rec.rss_before_mb = _rss_mb()
+        tracing = self.tracemalloc and tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # fold the parent's peak so far in before resetting it
+                parent = self._stack[-1]
+                parent._tm_peak = max(parent._tm_peak, peak)
+            rec._tm_start = rec._tm_peak = current
+            tracemalloc.reset_peak()
+        prof = cProfile.Profile() if self.cprofile and not self._stack else None
+        self._stack.append(rec)
+        self.records.append(rec)
+
+        cpu0 = time.process_time()
+        t0 = time.perf_counter()
+        if prof is not None:
+            prof.enable()
+        try:
+            yield rec
+        except BaseException as exc:
+            rec.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            if prof is not None:
+                prof.disable()
+            rec.wall_s = time.perf_counter() - t0
+            rec.cpu_s = time.process_time() - cpu0
+            rec.rss_after_mb = _rss_mb()
+            self._stack.pop()
+            if tracing:
+                rec._tm_peak = max(rec._tm_peak, tracemalloc.get_traced_memory()[1])
+                rec.tracemalloc_peak_mb = (rec._tm_peak - rec._tm_start) / 2**20
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent._tm_peak = max(parent._tm_peak, rec._tm_peak)
+            if prof is not None:
+                rec.cprofile_top = _top_functions(prof, self.top)
+
+    # ---------------- output ---------------- #
+    def to_dict(self) -> Dict[str, Any]:
+        return {"pid": os.getpid(), "stages": [r.to_dict() for r in self.records]}
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Trace Event Format (complete events plus an RSS counter track)."""
+        pid = os.getpid()
+        events = []
+        for r in self.records:
+            args = {k: v for k, v in r.to_dict().items() if k not in ("name", "start_s", "wall_s", "cprofile_top")}
+            events.append(
+                {"name": r.name, "cat": "stage", "ph": "X", "pid": pid, "tid": 0,
+                 "ts": r.start * 1e6, "dur": r.wall_s * 1e6, "args": args}
+            )
+            events.append({"name": "rss_mb", "ph": "C", "pid": pid, "ts": r.start * 1e6, "args": {"rss": r.rss_before_mb}})
+            events.append(
+                {"name": "rss_mb", "ph": "C", "pid": pid, "ts": (r.start + r.wall_s) * 1e6, "args": {"rss": r.rss_after_mb}}
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str, fmt: str = "json") -> None:
+        """Write the records as `fmt` "json" (records) or "chrome" (trace events)."""
+        if fmt not in ("json", "chrome"):
+            raise ValueError(f"Unknown profile format {fmt!r}; use 'json' or 'chrome'")
+        payload = self.chrome_trace() if fmt == "chrome" else self.to_dict()
+        with open(path, "w") as fh:
+            json.dump(payload, fh, indent=2 if fmt == "json" else None)
+
+    def summary(self) -> str:
+        """Indented text table of the stages (for the console)."""
+        lines = [f"{'stage':<28}{'wall_s':>9}{'cpu_s':>9}{'rows':>10}{'rss_delta_mb':>14}"]
+        for r in self.records:
+            rows = "" if r.rows is None else str(r.rows)
+            name = "  " * r.depth + r.name
+            lines.append(f"{name:<28}{r.wall_s:>9.3f}{r.cpu_s:>9.3f}{rows:>10}{r.rss_after_mb - r.rss_before_mb:>14.1f}")
+        return "\n".join(lines)
+
+
+def _top_functions(prof: cProfile.Profile, n: int) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(prof, stream=io.StringIO())
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+        rows.append({"function": f"{os.path.basename(filename)}:{line}({func})", "ncalls": nc, "tottime_s": tt, "cumtime_s": ct})
+    rows.sort(key=lambda r: r["cumtime_s"], reverse=True)
+    return rows[:n]
+
+
+# ---------------- instrumentation API ---------------- #
+def stage(name: str, rows: Optional[int] = None):
+    """Time a block as stage `name` on the active profiler (no-op when none)."""
+    if _ACTIVE is None:
+        return nullcontext(_NULL_RECORD)
+    return _ACTIVE.stage(name, rows)
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """Decorator form of `stage`; defaults to the function's qualified name."""
+
+    def deco(fn: Callable) -> Callable:
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _ACTIVE is None:
+                return fn(*args, **kwargs)
+            with _ACTIVE.stage(label):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return deco
+
+
+def active_profiler() -> Optional[StageProfiler]:
+    return _ACTIVE
+
+
+def detach() -> None:
+    """Drop a profiler inherited through fork (call first thing in a worker).
+
+    The child's stages would only reach a copy the parent never writes, under
+    the parent's cProfile/tracemalloc hooks.
+    """
+    global _ACTIVE
+    if _ACTIVE is None:
+        return
+    _ACTIVE = None
+    sys.setprofile(None)
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
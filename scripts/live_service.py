@@ -0,0 +1,48 @@
+"""Run the live signal service over local CSV bars (replay stand-in for a feed).
+
+Usage (from project root, after `main.py --save-model` for each symbol):
+
+.venv/bin/python scripts/live_service.py --symbols 0700.HK 0005.HK --replay-bars 50
+
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from data.downloader import load_local_ohlcv
+from live.service import ReplaySource, SignalService
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--symbols", nargs="+", required=True)
+    p.add_argument("--model", default="logistic")
+    p.add_argument("--model-dir", default="data/models")
+    p.add_argument("--proba_th", type=float, default=0.55)
+    p.add_argument("--replay-bars", type=int, default=50, help="Newest bars per symbol to replay as live")
+    p.add_argument("--delay", type=float, default=0.0, help="Seconds between replayed bars")
+    args = p.parse_args()
+
+    frames = {}
+    for sym in args.symbols:
+        df = load_local_ohlcv(sym)
+        if df is None:
+            raise ValueError(f"No local CSV for {sym}")
+        frames[sym] = df
+
+    def show(signals):
+        for s in signals:
+            flag = "ENTRY" if s.entry else ("EXIT" if s.exit else "")
+            print(f"{s.time}  {s.symbol:<8} proba_up={s.proba_up:.4f} {flag}")
+
+    service = SignalService.from_artifacts(args.model_dir, args.symbols, args.model, th=args.proba_th, sink=show)
+    service.warm_up({s: df.iloc[:-args.replay_bars] for s, df in frames.items()})
+    asyncio.run(service.run(ReplaySource({s: df.iloc[-args.replay_bars:] for s, df in frames.items()}, delay=args.delay)))
+
+    print("\n===== Latency (ms) =====")
+    print(service.latency_report().round(4).to_string())
+
+
+if __name__ == "__main__":
+    main()
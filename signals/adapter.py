@@ -2,10 +2,17 @@
 from __future__ import annotations
 
 
+from typing import Optional, Sequence, Union
+
+import numpy as np
 import pandas as pd
 
 
-def to_entries_exits(signal: pd.Series, th: float) -> tuple[pd.Series, pd.Series]:
+def to_entries_exits(
+    signal: pd.Series,
+    th: float,
+    exit_th: Optional[float] = None,
+) -> tuple[pd.Series, pd.Series]:
     """Map a probability-like signal to long entries/exits.
 
 
@@ -15,6 +22,10 @@ def to_entries_exits(signal: pd.Series, th: float) -> tuple[pd.Series, pd.Series
     Probability or score aligned to tradable bars.
     th : float
     Threshold above which we enter long; below/equal triggers exit.
+    exit_th : float, optional
+    Separate exit threshold (hysteresis): exit only once the signal is
+    below/equal `exit_th`; between the two thresholds the position is kept.
+    Defaults to `th`.
 
 
     Returns
@@ -24,7 +35,243 @@ def to_entries_exits(signal: pd.Series, th: float) -> tuple[pd.Series, pd.Series
     """
     s = signal.dropna()
     entries = s > th
+    exit_th = th if exit_th is None else exit_th
     # shift exits by 1 bar to avoid same-bar enter/exit conflicts
-    exits = (~entries).shift(1).fillna(False)
+    exits = (s <= exit_th).shift(1, fill_value=False)
+    return entries, exits
+
+
+
+def entries_exits_array(
+    proba: np.ndarray,
+    th: Union[float, np.ndarray],
+    exit_th: Union[float, np.ndarray, None] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """`to_entries_exits` for a (bars, columns) array in one vectorized pass.
+
+
+    Parameters
+    ----------
+    proba : np.ndarray
+    Signal per bar and column (e.g. symbols, or symbols x thresholds); NaN
+    bars are skipped per column, as `dropna` does for a single series.
+    th, exit_th : float or np.ndarray
+    Entry/exit thresholds, scalar or one per column.
+
+
+    Returns
+    -------
+    (entries, exits) : tuple[np.ndarray, np.ndarray]
+    Boolean arrays shaped like `proba`; column j equals `to_entries_exits`
+    on `proba[:, j]`, with False on NaN bars.
+    """
+    p = np.asarray(proba, dtype=np.float64)
+    if p.ndim == 1:
+        p = p[:, None]
+    th = np.asarray(th, dtype=np.float64)
+    exit_th = th if exit_th is None else np.asarray(exit_th, dtype=np.float64)
+    valid = ~np.isnan(p)
+    entries = p > th
+    # below exit_th on the previous *valid* bar of the column
+    below = pd.DataFrame(np.where(valid, p <= exit_th, np.nan)).ffill().to_numpy()
+    exits = np.zeros_like(entries)
+    exits[1:] = (below[:-1] == 1.0) & valid[1:]
     return entries, exits
 
+
+
+class StatefulSignalAdapter:
+    """Bar-by-bar form of `to_entries_exits` for streaming use.
+
+    Keeps, per column, whether the previous bar was below the exit threshold
+    and the resulting long/flat position, so each `update` needs only the
+    newest probabilities. Replayed over a history, its entries/exits equal
+    `to_entries_exits` (or `entries_exits_array` for many columns) and its
+    `weights` equal `entries_exits_to_weights` of those signals.
+
+    Parameters
+    ----------
+    th : float or np.ndarray
+    Entry threshold(s), one per column or shared.
+    exit_th : float or np.ndarray, optional
+    Exit threshold(s) for hysteresis; defaults to `th`.
+    position_size : float or np.ndarray
+    Target weight of a held column.
+    n_columns : int
+    Number of symbols/parameter columns tracked.
+    """
+
+    def __init__(
+        self,
+        th: Union[float, np.ndarray],
+        exit_th: Union[float, np.ndarray, None] = None,
+        position_size: Union[float, np.ndarray] = 1.0,
+        n_columns: int = 1,
+    ) -> None:
+        self.th = np.broadcast_to(np.asarray(th, dtype=np.float64), (n_columns,)).copy()
+        exit_th = self.th if exit_th is None else exit_th
+        self.exit_th = np.broadcast_to(np.asarray(exit_th, dtype=np.float64), (n_columns,)).copy()
+        self.position_size = np.broadcast_to(np.asarray(position_size, dtype=np.float64), (n_columns,)).copy()
+        # 1.0/0.0 = previous valid bar was (not) below exit_th, NaN = no bar yet
+        self.prev_below = np.full(n_columns, np.nan)
+        self.position = np.zeros(n_columns, dtype=bool)
+
+    @property
+    def n_columns(self) -> int:
+        return len(self.th)
+
+    @property
+    def weights(self) -> np.ndarray:
+        """Current target weight per column."""
+        return np.where(self.position, self.position_size, 0.0)
+
+    def extend(
+        self,
+        n: int,
+        th: Union[float, np.ndarray, None] = None,
+        exit_th: Union[float, np.ndarray, None] = None,
+        position_size: Union[float, np.ndarray, None] = None,
+    ) -> None:
+        """Append `n` flat columns (new symbols); parameters default to the last column's."""
+        def grow(arr, value):
+            value = arr[-1] if value is None else value
+            return np.concatenate([arr, np.broadcast_to(np.asarray(value, dtype=arr.dtype), (n,))])
+
+        self.th = grow(self.th, th)
+        self.exit_th = grow(self.exit_th, exit_th if exit_th is not None else th)
+        self.position_size = grow(self.position_size, position_size)
+        self.prev_below = np.concatenate([self.prev_below, np.full(n, np.nan)])
+        self.position = np.concatenate([self.position, np.zeros(n, dtype=bool)])
+
+    def update(self, proba: Union[float, np.ndarray], cols: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+        """Ingest one bar of probabilities; return its (entries, exits).
+
+        `proba` holds one value per column, or per index in `cols` when only
+        some columns have a new bar. NaN values leave their column untouched
+        and produce no signal.
+        """
+        cols = np.arange(self.n_columns) if cols is None else np.asarray(cols)
+        p = np.broadcast_to(np.asarray(proba, dtype=np.float64), cols.shape)
+        valid = ~np.isnan(p)
+        entries = p > self.th[cols]
+        exits = (self.prev_below[cols] == 1.0) & valid
+        self.prev_below[cols] = np.where(valid, p <= self.exit_th[cols], self.prev_below[cols])
+        # from_signals semantics: a bar with both signals does nothing
+        pos = self.position[cols]
+        self.position[cols] = np.where(entries & ~exits, True, np.where(exits & ~entries, False, pos))
+        return entries, exits
+
+    def update_block(self, proba: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Ingest a (bars, columns) block at once; same result as `update` per row.
+
+        Vectorized over the block, so long histories can be fed chunk by chunk
+        (see `models.streaming`) at array speed while state carries over.
+        """
+        p = np.asarray(proba, dtype=np.float64).reshape(len(proba), -1)
+        if len(p) == 0:
+            return np.zeros(p.shape, dtype=bool), np.zeros(p.shape, dtype=bool)
+        valid = ~np.isnan(p)
+        entries = p > self.th
+        # previous valid bar's below-exit state, seeded with the carried one
+        below = pd.DataFrame(np.vstack([self.prev_below, np.where(valid, p <= self.exit_th, np.nan)])).ffill().to_numpy()
+        exits = (below[:-1] == 1.0) & valid
+        self.prev_below = below[-1].copy()
+        marks = np.where(entries & ~exits, 1.0, np.where(exits & ~entries, 0.0, np.nan))
+        held = pd.DataFrame(np.vstack([self.position.astype(np.float64), marks])).ffill().to_numpy()
+        self.position = held[-1] == 1.0
+        return entries, exits
+
+    def replay(self, proba: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Feed a (bars, columns) history bar by bar; return entries, exits, weights."""
+        p = np.asarray(proba, dtype=np.float64).reshape(len(proba), -1)
+        entries = np.zeros(p.shape, dtype=bool)
+        exits = np.zeros(p.shape, dtype=bool)
+        weights = np.zeros(p.shape)
+        for i in range(len(p)):
+            entries[i], exits[i] = self.update(p[i])
+            weights[i] = self.weights
+        return entries, exits, weights
+
+
+
+def to_entries_exits_grid(
+    signal: Union[pd.Series, pd.DataFrame],
+    thresholds: Sequence[float],
+    exit_thresholds: Optional[Sequence[float]] = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Vectorized `to_entries_exits` over a grid of thresholds.
+
+
+    Parameters
+    ----------
+    signal : pd.Series or pd.DataFrame
+    Probability-like signal; a DataFrame holds one signal per column (e.g. one
+    per train_ratio). Rows with NaN in any column are dropped.
+    thresholds : Sequence[float]
+    Entry thresholds to evaluate.
+    exit_thresholds : Sequence[float], optional
+    Exit threshold paired with each entry threshold (hysteresis); defaults
+    to the entry thresholds.
+
+
+    Returns
+    -------
+    (entries, exits) : tuple[pd.DataFrame, pd.DataFrame]
+    Boolean frames with one column per (signal column, threshold); column k
+    equals `to_entries_exits(signal_col, th, exit_th)` for that pair, ready to be
+    broadcast by vectorbt.from_signals in a single call.
+    """
+    frame = signal.to_frame() if isinstance(signal, pd.Series) else signal
+    frame = frame.dropna()
+    th = np.asarray(thresholds, dtype=float)
+    exit_th = th if exit_thresholds is None else np.asarray(exit_thresholds, dtype=float)
+
+    # (bars, signals, thresholds) -> (bars, signals * thresholds)
+    p = frame.to_numpy()[:, :, None]
+    entries = (p > th[None, None, :]).reshape(len(frame), -1)
+    below = (p <= exit_th[None, None, :]).reshape(len(frame), -1)
+    exits = np.zeros_like(entries)
+    exits[1:] = below[:-1]
+
+    th_index = pd.Index(th, name="proba_th")
+    if isinstance(signal, pd.Series):
+        columns = th_index
+    else:
+        columns = pd.MultiIndex.from_product(
+            [frame.columns, th_index], names=[frame.columns.name, "proba_th"]
+        )
+    return (
+        pd.DataFrame(entries, index=frame.index, columns=columns),
+        pd.DataFrame(exits, index=frame.index, columns=columns),
+    )
+
+
+def entries_exits_to_weights(
+    entries: pd.DataFrame,
+    exits: pd.DataFrame,
+    position_size: float = 1.0,
+) -> pd.DataFrame:
+    """Turn wide entries/exits into per-symbol target weights.
+
+
+    Parameters
+    ----------
+    entries, exits : pd.DataFrame
+    Boolean frames (time x symbol). A symbol is held from an entry until the
+    next exit; a bar with both is ignored, as in vectorbt.from_signals.
+    position_size : float
+    Target weight (fraction of portfolio equity) of each held symbol.
+
+
+    Returns
+    -------
+    pd.DataFrame
+    `position_size` where a symbol is held, 0 elsewhere. Weights only change
+    on entry/exit bars, so open positions are never re-balanced; when more
+    symbols are held than cash allows, later entries are filled partially.
+    """
+    en = entries.to_numpy(dtype=bool)
+    ex = exits.reindex_like(entries).fillna(False).to_numpy(dtype=bool)
+    marks = np.where(en & ~ex, position_size, np.where(ex & ~en, 0.0, np.nan))
+    held = pd.DataFrame(marks).ffill().fillna(0.0).to_numpy()
+    return pd.DataFrame(held, index=entries.index, columns=entries.columns)
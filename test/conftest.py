@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _make_ohlcv(n=600, seed=0, tz='hk', decimals=None, volume_dtype=float):
+    """Hourly random-walk OHLCV bars from 2024-01-02 09:30.
+
+    `tz='hk'` stamps the index in Asia/Hong_Kong, `tz=None` leaves it naive;
+    `decimals` rounds the prices (e.g. 3 for HKEX ticks).
+    """
+    from data.store import HK_TZ
+
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2024-01-02 09:30', periods=n, freq='h', tz=HK_TZ if tz == 'hk' else tz)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    volume = rng.integers(1_000, 100_000, n).astype(volume_dtype)
+    spread = np.abs(rng.normal(0, 0.003, n))
+    prices = {'Open': close, 'High': close * (1 + spread), 'Low': close * (1 - spread), 'Close': close}
+    if decimals is not None:
+        prices = {k: v.round(decimals) for k, v in prices.items()}
+    return pd.DataFrame({**prices, 'Volume': volume}, index=idx)
+
+
+@pytest.fixture
+def make_ohlcv():
+    """Factory of synthetic OHLCV frames: `make_ohlcv(n, seed, tz, decimals, volume_dtype)`."""
+    return _make_ohlcv
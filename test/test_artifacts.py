@@ -0,0 +1,57 @@
+import json
+
+import numpy as np
+import pytest
+
+
+def test_predict_only_matches_train_predict(tmp_path, make_ohlcv):
+    from models.artifacts import load_artifact, train_artifact
+    from models.logistic_model import train_predict
+
+    df = make_ohlcv()
+    test_index, proba = train_predict(df, train_ratio=0.7)
+
+    artifact = train_artifact(df, train_ratio=0.7)
+    artifact.save(str(tmp_path), '0700.HK')
+    loaded = load_artifact(str(tmp_path), '0700.HK', 'logistic')
+    assert loaded._model is None  # estimator not unpickled yet
+
+    scored = loaded.predict(df)  # every bar after the training range
+    assert scored.index.equals(test_index)
+    np.testing.assert_allclose(scored.to_numpy(), proba.to_numpy(), rtol=1e-9)
+
+    latest = loaded.predict(df, n_bars=3)
+    assert latest.index.equals(test_index[-3:])
+    np.testing.assert_allclose(latest.to_numpy(), proba.to_numpy()[-3:], rtol=1e-9)
+
+
+def test_versions_increment_and_meta(tmp_path, make_ohlcv):
+    from models.artifacts import list_versions, load_artifact, train_artifact
+    from models.feature_store import data_fingerprint
+
+    df = make_ohlcv()
+    first = train_artifact(df.iloc[:500], model='hgb')
+    first.save(str(tmp_path), '0005.HK')
+    second = train_artifact(df, model='hgb')
+    second.save(str(tmp_path), '0005.HK')
+    assert list_versions(str(tmp_path), '0005.HK', 'hgb') == [1, 2]
+
+    latest = load_artifact(str(tmp_path), '0005.HK', 'hgb')
+    assert latest.meta['version'] == 2
+    assert latest.trained_until == df.index[-1]
+    assert latest.meta['data_fingerprint'] == data_fingerprint(df)
+    assert load_artifact(str(tmp_path), '0005.HK', 'hgb', version=1).meta['n_train'] < latest.meta['n_train']
+
+
+def test_stale_feature_spec_is_rejected(tmp_path, make_ohlcv):
+    from models.artifacts import load_artifact, train_artifact
+
+    path = train_artifact(make_ohlcv()).save(str(tmp_path), '0941.HK')
+    meta_path = f'{path}/meta.json'
+    meta = json.load(open(meta_path))
+    meta['feature_spec'] = {'name': 'logistic_minimal', 'version': 0}
+    json.dump(meta, open(meta_path, 'w'))
+    with pytest.raises(ValueError):
+        load_artifact(str(tmp_path), '0941.HK')
+    with pytest.raises(ValueError):
+        load_artifact(str(tmp_path), 'MISSING.HK')
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def _frame(n=50, tz='Asia/Hong_Kong'):
+    idx = pd.date_range('2025-01-02 09:30', periods=n, freq='60min', tz=tz)
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            'Open': rng.random(n), 'High': rng.random(n), 'Low': rng.random(n), 'Close': rng.random(n),
+            'Volume': rng.integers(0, 1000, n),
+        },
+        index=idx,
+    )
+
+
+def test_roundtrip_is_memory_mapped(tmp_path):
+    from data.bar_cache import read_bar_cache, write_bar_cache
+
+    df = _frame()
+    path = str(tmp_path / 'x.bars')
+    write_bar_cache(df, path)
+    out = read_bar_cache(path)
+    pd.testing.assert_frame_equal(out, df, check_freq=False)
+    # read-only columns mean pandas adopted the mapped pages without copying
+    assert not out['Close'].to_numpy().flags.writeable
+    assert not out['Volume'].to_numpy().flags.writeable
+
+
+def test_stale_source_is_rebuilt(tmp_path):
+    from data.downloader import load_local_ohlcv
+
+    csv = tmp_path / '0700.HK.csv'
+    csv.write_text('date,Close,High,Low,Open,Volume\n2025-01-02,1,2,0.5,1,100\n')
+    cache = str(tmp_path / 'bars')
+
+    first = load_local_ohlcv('0700.HK', data_dir=str(tmp_path), bar_cache_dir=cache)
+    cached = load_local_ohlcv('0700.HK', data_dir=str(tmp_path), bar_cache_dir=cache)
+    pd.testing.assert_frame_equal(first, cached)
+    assert not cached['Close'].to_numpy().flags.writeable
+
+    # touching without changing content keeps the entry
+    os.utime(csv, ns=(0, 0))
+    assert not load_local_ohlcv('0700.HK', data_dir=str(tmp_path), bar_cache_dir=cache)['Close'].to_numpy().flags.writeable
+
+    csv.write_text('date,Close,High,Low,Open,Volume\n2025-01-02,1,2,0.5,1,100\n2025-01-03,3,4,2.5,3,200\n')
+    fresh = load_local_ohlcv('0700.HK', data_dir=str(tmp_path), bar_cache_dir=cache)
+    assert fresh['Close'].tolist() == [1.0, 3.0]
+    assert fresh['Volume'].dtype == np.int64
+
+
+def test_rewrite_replaces_entry_atomically(tmp_path):
+    import pytest
+
+    from data.bar_cache import read_bar_cache, write_bar_cache
+
+    path = str(tmp_path / 'x.bars')
+    old = _frame()
+    write_bar_cache(old, path)
+    mapped = read_bar_cache(path)
+
+    new = _frame(80) * 2
+    write_bar_cache(new, path)
+    pd.testing.assert_frame_equal(read_bar_cache(path), new, check_freq=False)
+    # a reader mapping the previous entry still sees it intact
+    pd.testing.assert_frame_equal(mapped, old, check_freq=False)
+
+    # a failed write leaves the published entry untouched
+    with pytest.raises(ValueError):
+        write_bar_cache(new.assign(Close='x'), path)
+    pd.testing.assert_frame_equal(read_bar_cache(path), new, check_freq=False)
+    assert sorted(os.listdir(tmp_path)) == ['x.bars']
@@ -0,0 +1,63 @@
+import numpy as np
+
+
+def test_compact_local_load(tmp_path, make_ohlcv):
+    from data.downloader import load_local_ohlcv
+
+    df = make_ohlcv(50, tz=None, decimals=3, volume_dtype=np.int64)
+    df.to_csv(tmp_path / '0700.HK.csv', index_label='Date')
+    full = load_local_ohlcv('0700.HK', data_dir=str(tmp_path))
+    compact = load_local_ohlcv('0700.HK', data_dir=str(tmp_path), compact=True)
+    assert compact.dtypes.tolist() == [np.float32] * 4 + [np.int32]
+    assert compact['Volume'].tolist() == full['Volume'].tolist()
+    np.testing.assert_allclose(compact['Close'], full['Close'], rtol=2**-24)
+
+    # volumes beyond int32 are kept exact rather than wrapped
+    df['Volume'] = df['Volume'] * 100_000
+    df.to_csv(tmp_path / '0005.HK.csv', index_label='Date')
+    big = load_local_ohlcv('0005.HK', data_dir=str(tmp_path), compact=True)
+    assert big['Close'].dtype == np.float32
+    assert big['Volume'].astype(np.int64).tolist() == df['Volume'].tolist()
+
+
+def test_compact_features_within_documented_bounds(make_ohlcv):
+    from data.downloader import to_compact
+    from models.logistic_model import build_features
+
+    df = make_ohlcv(2000, tz=None, decimals=3, volume_dtype=np.int64)
+    for spec in (None, 'technical'):
+        ref = build_features(df, spec)
+        got = build_features(to_compact(df), spec, compact=True)
+        assert got.index.equals(ref.index) and list(got.columns) == list(ref.columns)
+        assert got['y'].dtype == np.uint8 and (got['y'].to_numpy() == ref['y'].to_numpy()).all()
+        X, X_ref = got.drop(columns='y'), ref.drop(columns='y')
+        assert (X.dtypes == np.float32).all()
+        absolute = [c for c in X if c not in ('volchg', 'rsi14')]
+        np.testing.assert_allclose(X[absolute], X_ref[absolute], rtol=0, atol=2**-22)
+        np.testing.assert_allclose(X['volchg'], X_ref['volchg'], rtol=2**-22)
+        if 'rsi14' in X:
+            np.testing.assert_allclose(X['rsi14'], X_ref['rsi14'], rtol=0, atol=1e-3)
+
+
+def test_compact_table_is_one_preallocated_block(make_ohlcv):
+    from models.logistic_model import build_features, feature_block
+
+    df = make_ohlcv(2000, tz=None, decimals=3, volume_dtype=np.int64)
+    block, names = feature_block(df, 'technical', dtype=np.float32)
+    assert block.shape == (len(df), len(names)) and np.isnan(block[0]).all()
+    data = build_features(df, 'technical', compact=True)
+    # features are a view of the kernel's output, not a concat/dropna copy
+    X = data.iloc[:, :-1]
+    assert X.to_numpy().base is not None
+    assert data.memory_usage(index=False).sum() == data.shape[0] * (4 * len(names) + 1)
+
+
+def test_compact_train_predict_matches_float64(make_ohlcv):
+    from data.downloader import to_compact
+    from models.logistic_model import train_predict
+
+    df = make_ohlcv(2000, tz=None, decimals=3, volume_dtype=np.int64)
+    idx, proba = train_predict(df)
+    idx_c, proba_c = train_predict(to_compact(df), compact=True)
+    assert idx_c.equals(idx)
+    np.testing.assert_allclose(proba_c, proba, atol=1e-5)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def make_inputs(n=400, seed=0):
+    from signals.adapter import to_entries_exits
+
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2024-01-02 09:30', periods=n, freq='h', tz='Asia/Hong_Kong')
+    close = pd.Series(300 * np.exp(np.cumsum(rng.normal(0, 0.01, n))), index=idx)
+    volume = pd.Series(rng.integers(100_000, 1_000_000, n).astype(float), index=idx)
+    entries, exits = to_entries_exits(pd.Series(rng.random(n), index=idx), 0.5)
+    return close, volume, entries, exits.astype(bool)
+
+
+def test_order_cost_schedule():
+    from backtest.costs import HKEXCostModel
+
+    costs = HKEXCostModel()
+    # 100k: 30 commission + 100 stamp + 8.5 levies/fees + 2 settlement (min)
+    # 1k: minimum commission 3 + stamp rounded up to 1 + 0.085 + 2
+    np.testing.assert_allclose(costs.order_cost([100_000.0, 1_000.0]), [140.5, 6.085])
+    assert costs.order_cost(0.0) == 0.0
+    assert HKEXCostModel.zero().order_cost(1e6) == 0.0
+
+
+def test_slippage_grows_with_participation_and_is_capped():
+    from backtest.costs import HKEXCostModel
+
+    costs = HKEXCostModel(slippage_base=0.0005, slippage_impact=0.1, slippage_max=0.02)
+    slip = costs.slippage([100, 10_000, 1e6, 100], [1e6, 1e6, 1e6, np.nan])
+    np.testing.assert_allclose(slip, [0.0005 + 0.001, 0.0005 + 0.01, 0.02, 0.02])
+
+
+def test_zero_cost_kernel_matches_from_signals_in_whole_shares():
+    import vectorbt as vbt
+    from backtest.costs import HKEXCostModel
+    from backtest.vectorbt_engine import simulate_with_costs
+
+    close, _, entries, exits = make_inputs()
+    ref = vbt.Portfolio.from_signals(close, entries, exits, init_cash=100_000.0, size_granularity=1, freq='h')
+    pf = simulate_with_costs(close, entries, exits, HKEXCostModel.zero(), cash=100_000.0, freq='h')
+    np.testing.assert_allclose(pf.value().to_numpy(), ref.value().to_numpy())
+
+
+def test_costs_are_charged_in_kernel_on_board_lots():
+    from backtest.costs import HKEXCostModel
+    from backtest.vectorbt_engine import run_backtest
+
+    close, volume, entries, exits = make_inputs()
+    costs = HKEXCostModel()
+    pf, _, _ = run_backtest(close, entries, exits, costs=costs, volume=volume, lot_size=100)
+    orders = pf.orders.records
+    assert len(orders) > 0
+    assert (orders['size'] % 100 == 0).all()
+    np.testing.assert_allclose(orders['fees'], costs.order_cost(orders['size'] * orders['price']))
+    assert (pf.cash() >= 0).all()
+
+    free, _, _ = run_backtest(close, entries, exits)
+    assert pf.total_return() < free.total_return()
+
+
+def test_lot_sizes_by_symbol_and_validation():
+    from backtest.costs import lot_array
+
+    cols = pd.Index(['0700.HK', '0005.HK'])
+    np.testing.assert_array_equal(lot_array(pd.Series({'0005.HK': 400, '0700.HK': 100}), cols, 2), [100, 400])
+    with pytest.raises(ValueError):
+        lot_array(0, None, 1)
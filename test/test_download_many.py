@@ -0,0 +1,97 @@
+import threading
+
+import pandas as pd
+
+
+def _make_sample_df():
+    idx = pd.date_range('2025-01-02 01:30', periods=4, freq='60min')
+    return pd.DataFrame(
+        {'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0, 'Volume': 1.0}, index=idx
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, sec):
+        self.now += sec
+
+
+def test_token_bucket_rate_and_backoff():
+    from data.rate_limit import TokenBucket
+
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2.0, clock=clock, sleep=clock.sleep)
+
+    # burst of 2 is free, then one token every 0.5s
+    for _ in range(6):
+        bucket.acquire()
+    assert clock.now == 2.0
+
+    # a backoff pauses everyone and drains the bucket: no burst on resume
+    bucket.backoff(5.0)
+    bucket.acquire()
+    assert clock.now == 7.5
+    bucket.acquire()
+    assert clock.now == 8.0
+
+
+def test_download_many_concurrent_with_isolated_failure(monkeypatch):
+    from data.downloader import download_many
+
+    monkeypatch.setattr('data.downloader.load_local_ohlcv', lambda s: None)
+
+    def fake_download(symbol, period, interval, auto_adjust, progress):
+        if symbol == 'BAD.HK':
+            raise RuntimeError('delisted')
+        return _make_sample_df()
+
+    monkeypatch.setattr('yfinance.download', fake_download)
+
+    symbols = ['0700.HK', '0005.HK', 'BAD.HK', '0941.HK', '0700.HK']
+    frames, errors = download_many(
+        symbols, period='5d', interval='60m', max_workers=4,
+        rate_per_sec=1000.0, max_retries=2, backoff_sec=0.0,
+    )
+    assert sorted(frames) == ['0005.HK', '0700.HK', '0941.HK']
+    assert list(errors) == ['BAD.HK']
+    assert all(len(df) == 4 for df in frames.values())
+
+
+def test_rate_limit_error_triggers_shared_backoff(monkeypatch):
+    from data.downloader import download_many
+    from data.rate_limit import TokenBucket
+
+    monkeypatch.setattr('data.downloader.load_local_ohlcv', lambda s: None)
+    calls = {'n': 0}
+    lock = threading.Lock()
+
+    def fake_download(symbol, period, interval, auto_adjust, progress):
+        with lock:
+            calls['n'] += 1
+            first = calls['n'] == 1
+        if first:
+            raise RuntimeError('429 Too Many Requests')
+        return _make_sample_df()
+
+    monkeypatch.setattr('yfinance.download', fake_download)
+
+    class SpyBucket(TokenBucket):
+        backoffs = []
+
+        def backoff(self, seconds):
+            self.backoffs.append(seconds)
+            super().backoff(seconds)
+
+    limiter = SpyBucket(rate=1000.0)
+    frames, errors = download_many(
+        ['0700.HK', '0005.HK', '0941.HK'], period='5d', max_workers=3,
+        limiter=limiter, max_retries=3, backoff_sec=0.01,
+    )
+    assert not errors and len(frames) == 3
+    assert limiter.backoffs == [0.01]
+    assert calls['n'] == 4
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+ALL_KINDS = [
+    {'kind': 'ret', 'window': 1},
+    {'kind': 'ret', 'window': 5},
+    {'kind': 'ma_gap', 'fast': 5, 'slow': 20},
+    {'kind': 'ma_gap', 'fast': 20, 'slow': 5},
+    {'kind': 'ma_slope', 'window': 5},
+    {'kind': 'vol', 'window': 20},
+    {'kind': 'volchg'},
+    {'kind': 'rsi', 'window': 14},
+    {'kind': 'atr', 'window': 14},
+    {'kind': 'bb_width', 'window': 20, 'k': 1.5},
+    {'kind': 'obv', 'window': 10},
+]
+
+
+def test_kernel_matches_pandas_reference(make_ohlcv):
+    from models.factors import REFRESH_EVERY, compute_factors, compute_factors_pandas
+
+    # long enough to cross a rolling-sum refresh; a gap exercises NaN handling
+    df = make_ohlcv(REFRESH_EVERY + 500)
+    df.iloc[50:53] = np.nan
+    df.iloc[0, df.columns.get_loc('Close')] = np.nan
+    got = compute_factors(df, ALL_KINDS)
+    expected = compute_factors_pandas(df, ALL_KINDS)
+    assert list(got.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(got, expected, rtol=1e-7, atol=1e-12)
+
+
+def test_build_features_with_factor_spec(make_ohlcv):
+    from models.logistic_model import TECHNICAL_SPEC, build_features, feature_frame, feature_lookback
+
+    df = make_ohlcv(3000)
+    data = build_features(df, 'technical')
+    assert data.shape[1] == len(TECHNICAL_SPEC['factors']) + 1 and data.columns[-1] == 'y'
+    assert not data.isna().any().any()
+    # no lookahead: changing the last bar leaves every earlier feature row unchanged
+    bumped = df.copy()
+    bumped.iloc[-1] *= 1.5
+    pd.testing.assert_frame_equal(
+        feature_frame(bumped, 'technical').iloc[:-1].dropna(), data.drop(columns='y').iloc[:-1].dropna()
+    )
+    # the newest rows only need feature_lookback bars of history
+    tail = feature_frame(df.iloc[-feature_lookback('technical'):], 'technical').iloc[-3:]
+    pd.testing.assert_frame_equal(tail, feature_frame(df, 'technical').iloc[-3:], rtol=1e-8)
+
+
+def test_factor_spec_round_trips_through_artifacts(tmp_path, make_ohlcv):
+    from models.artifacts import load_artifact, train_artifact
+    from models.logistic_model import train_predict
+
+    df = make_ohlcv(1200)
+    test_index, proba = train_predict(df, train_ratio=0.7, feature_spec='technical')
+    artifact = train_artifact(df, train_ratio=0.7, feature_spec='technical')
+    assert 'factor_library' in artifact.meta
+    artifact.save(str(tmp_path), '0700.HK')
+    scored = load_artifact(str(tmp_path), '0700.HK').predict(df)
+    assert scored.index.equals(test_index)
+    np.testing.assert_allclose(scored.to_numpy(), proba.to_numpy(), rtol=1e-9)
+
+
+def test_bad_specs_raise(make_ohlcv):
+    from models.factors import compute_factors
+    from models.logistic_model import build_features
+
+    df = make_ohlcv(300)
+    with pytest.raises(ValueError, match='Unknown factor kind'):
+        compute_factors(df, [{'kind': 'macd', 'window': 3}])
+    with pytest.raises(ValueError, match='Duplicate'):
+        compute_factors(df, [{'kind': 'ret', 'window': 1}, {'kind': 'ret', 'window': 1}])
+    with pytest.raises(ValueError, match='High'):
+        compute_factors(df[['Close', 'Volume']], [{'kind': 'atr', 'window': 14}])
+    with pytest.raises(ValueError, match='Unknown feature spec'):
+        build_features(df, 'nope')
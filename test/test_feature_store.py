@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def test_hit_on_same_data_and_spec(tmp_path, make_ohlcv):
+    from models.feature_store import FeatureStore
+    from models.logistic_model import FEATURE_SPEC, build_features
+
+    store = FeatureStore(str(tmp_path))
+    df = make_ohlcv(300)
+    first = store.get_or_build(df, build_features, FEATURE_SPEC)
+    second = store.get_or_build(df.copy(), build_features, FEATURE_SPEC)
+    assert (store.misses, store.hits) == (1, 1)
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+    assert second.index.tz == df.index.tz
+
+    # changed bars or a bumped spec version are misses
+    changed = df.copy()
+    changed.iloc[-1, 0] += 1.0
+    store.get_or_build(changed, build_features, FEATURE_SPEC)
+    store.get_or_build(df, build_features, {**FEATURE_SPEC, 'version': FEATURE_SPEC['version'] + 1})
+    assert store.misses == 3
+
+
+def test_lru_eviction_keeps_recent_entries(tmp_path, make_ohlcv):
+    from models.feature_store import FeatureStore
+    from models.logistic_model import FEATURE_SPEC, build_features
+
+    store = FeatureStore(str(tmp_path), max_entries=2)
+    frames = [make_ohlcv(300, seed=s) for s in range(3)]
+    keys = [store.key(df, FEATURE_SPEC) for df in frames]
+
+    for i, df in enumerate(frames[:2]):
+        store.get_or_build(df, build_features, FEATURE_SPEC)
+        os.utime(tmp_path / f'{keys[i]}.parquet', ns=(i * 10**9, i * 10**9))
+    # touch entry 0 so entry 1 becomes least recently used
+    store.get_or_build(frames[0], build_features, FEATURE_SPEC)
+    store.get_or_build(frames[2], build_features, FEATURE_SPEC)
+
+    left = sorted(p.stem for p in tmp_path.glob('*.parquet'))
+    assert left == sorted([keys[0], keys[2]])
+
+
+def test_train_predict_with_feature_store(tmp_path, make_ohlcv):
+    from models.feature_store import FeatureStore
+    from models.logistic_model import train_predict
+
+    df = make_ohlcv(400)
+    idx_a, proba_a = train_predict(df)
+    store = FeatureStore(str(tmp_path))
+    train_predict(df, feature_store=store)
+    idx_b, proba_b = train_predict(df, feature_store=store)
+    assert store.hits == 1
+    assert idx_a.equals(idx_b)
+    np.testing.assert_allclose(proba_a.to_numpy(), proba_b.to_numpy())
+
+
+def test_high_low_change_is_a_miss(tmp_path, make_ohlcv):
+    from models.feature_store import FeatureStore
+    from models.logistic_model import TECHNICAL_SPEC, build_features
+
+    store = FeatureStore(str(tmp_path))
+    df = make_ohlcv(300)
+    builder = lambda d: build_features(d, TECHNICAL_SPEC)  # noqa: E731
+    first = store.get_or_build(df, builder, TECHNICAL_SPEC)
+
+    # only High/Low move, which only the ATR reads
+    wider = df.assign(High=df['Close'] * 1.03, Low=df['Close'] * 0.97)
+    second = store.get_or_build(wider, builder, TECHNICAL_SPEC)
+    assert (store.misses, store.hits) == (2, 0)
+    assert not np.allclose(first['atr14'], second['atr14'])
+
+
+def test_eviction_tolerates_entries_removed_by_another_process(tmp_path, monkeypatch, make_ohlcv):
+    import models.feature_store as fs
+    from models.logistic_model import FEATURE_SPEC, build_features
+
+    store = fs.FeatureStore(str(tmp_path), max_entries=1)
+    store.get_or_build(make_ohlcv(300), build_features, FEATURE_SPEC)
+
+    real_listdir, real_remove = os.listdir, os.remove
+
+    def remove_twice(path):
+        real_remove(path)  # another worker evicted it first
+        real_remove(path)
+
+    # a listed entry that is gone by stat time, and one gone by remove time
+    monkeypatch.setattr(fs.os, 'listdir', lambda d: real_listdir(d) + ['ghost.parquet'])
+    monkeypatch.setattr(fs.os, 'remove', remove_twice)
+    store.get_or_build(make_ohlcv(300, seed=1), build_features, FEATURE_SPEC)
+    monkeypatch.undo()
+
+    # writes go through unique temp names that never linger
+    assert [p.suffix for p in tmp_path.iterdir()] == ['.parquet']
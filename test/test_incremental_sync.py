@@ -0,0 +1,101 @@
+import pandas as pd
+
+
+def _hk(ts):
+    from data.calendar import HK_TZ
+
+    return pd.Timestamp(ts).tz_localize(HK_TZ)
+
+
+def _bars(labels):
+    idx = pd.DatetimeIndex(labels).tz_convert('UTC')
+    return pd.DataFrame(
+        {'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0, 'Volume': 1.0}, index=idx
+    )
+
+
+def test_calendar_sessions_and_gaps():
+    from data.calendar import HKEXCalendar
+
+    cal = HKEXCalendar(holidays={pd.Timestamp('2025-10-01').date()}, half_days=set())
+    labels = cal.bar_labels(pd.Timestamp('2025-09-30').date(), '60m')
+    assert [ts.strftime('%H:%M') for ts in labels] == ['09:30', '10:30', '11:30', '13:00', '14:00', '15:00']
+    # the 11:30 bar is cut at the lunch break
+    assert cal.bar_end(labels[2], '60m') == _hk('2025-09-30 12:00')
+
+    # lunch break: nothing new until 13:00 bar completes at 14:00
+    assert not cal.has_new_bar(_hk('2025-09-30 11:30'), _hk('2025-09-30 13:45'), '60m')
+    assert cal.has_new_bar(_hk('2025-09-30 11:30'), _hk('2025-09-30 14:00'), '60m')
+
+    # holiday (Oct 1) is skipped: next bar is Oct 2 09:30
+    assert cal.next_bar_label(_hk('2025-09-30 15:00'), '60m') == _hk('2025-10-02 09:30')
+    assert not cal.has_new_bar(_hk('2025-09-30 15:00'), _hk('2025-10-01 23:00'), '60m')
+
+
+def test_sync_fetches_only_missing_tail(tmp_path, monkeypatch):
+    from data.calendar import HKEXCalendar
+    from data.downloader import sync_ohlcv
+
+    day1 = HKEXCalendar().bar_labels(pd.Timestamp('2025-09-30').date(), '60m')
+    day2 = HKEXCalendar().bar_labels(pd.Timestamp('2025-10-02').date(), '60m')
+    calls = []
+
+    def fake_download(symbol, interval, auto_adjust, progress, **window):
+        calls.append(window)
+        if 'period' in window:
+            return _bars(day1)
+        # the tail request returns the last stored day plus the new bars,
+        # including the still-running 11:30 bar
+        return _bars(day1 + day2[:3])
+
+    monkeypatch.setattr('yfinance.download', fake_download)
+    kwargs = dict(interval='60m', period='30d', store_dir=str(tmp_path))
+
+    first = sync_ohlcv('0700.HK', now=_hk('2025-09-30 16:30'), **kwargs)
+    assert len(first) == 6 and 'period' in calls[0]
+
+    # next morning is a holiday: no fetch at all
+    sync_ohlcv('0700.HK', now=_hk('2025-10-01 10:30'), **kwargs)
+    assert len(calls) == 1
+
+    out = sync_ohlcv('0700.HK', now=_hk('2025-10-02 11:45'), **kwargs)
+    assert len(calls) == 2 and calls[1]['start'] == '2025-09-30'
+    # 09:30 and 10:30 are complete; 11:30 is still in progress and not persisted
+    assert list(out.index[-2:]) == day2[:2]
+    assert out.index.is_unique and out.index.is_monotonic_increasing
+
+
+def test_calendar_warns_outside_listed_years():
+    import warnings
+
+    import pytest
+
+    from data.calendar import HOLIDAY_YEARS, HKEXCalendar
+
+    cal = HKEXCalendar()
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        cal.trading_days(pd.Timestamp(f'{HOLIDAY_YEARS[0]}-01-01').date(), pd.Timestamp(f'{HOLIDAY_YEARS[-1]}-12-31').date())
+    # once per unlisted year, then weekdays only
+    with pytest.warns(UserWarning, match='only listed for') as record:
+        days = cal.trading_days(pd.Timestamp('2027-12-20').date(), pd.Timestamp('2028-01-05').date())
+    assert len(record) == 2
+    assert len(days) == 13
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        HKEXCalendar(years=None).is_trading_day(pd.Timestamp('2030-01-02').date())
+
+
+def test_completed_matches_bar_end():
+    from data.calendar import HKEXCalendar
+
+    cal = HKEXCalendar(
+        holidays={pd.Timestamp('2025-10-01').date()}, half_days={pd.Timestamp('2025-10-03').date()}
+    )
+    # 30m grid across a full day, a holiday, a half-day and a weekend, lunch and nights included
+    index = pd.date_range('2025-09-30 08:00', '2025-10-05 18:00', freq='30min', tz='Asia/Hong_Kong').tz_convert('UTC')
+    for interval in ('60m', '15m', '1d'):
+        for now in (_hk('2025-09-30 12:10'), _hk('2025-10-02 15:30'), _hk('2025-10-03 12:00'), _hk('2025-10-06 09:00')):
+            expected = [cal.bar_end(ts, interval) <= now for ts in index]
+            assert cal.completed(index, now, interval).tolist() == expected
+    assert cal.completed(index[:0], _hk('2025-10-06 09:00'), '60m').empty
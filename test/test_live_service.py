@@ -0,0 +1,74 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+
+def test_replay_matches_batch_pipeline(make_ohlcv):
+    from live.service import ReplaySource, SignalService
+    from models.artifacts import train_artifact
+    from models.logistic_model import build_features
+    from signals.adapter import to_entries_exits
+
+    frames = {'0700.HK': make_ohlcv(500, seed=0), '0005.HK': make_ohlcv(500, seed=1)}
+    split = 400
+    artifact = train_artifact(frames['0700.HK'].iloc[:split])
+
+    emitted = []
+    service = SignalService(artifact, th=0.5, sink=emitted.extend)
+    service.warm_up({s: df.iloc[:split] for s, df in frames.items()})
+    n = asyncio.run(service.run(ReplaySource({s: df.iloc[split:] for s, df in frames.items()})))
+    assert n == len(emitted) == 2 * (500 - split)
+
+    for sym, df in frames.items():
+        got = pd.DataFrame([s for s in emitted if s.symbol == sym]).set_index('time')
+        # the signal emitted when bar t closes is the batch row of bar t+1
+        X = build_features(df).drop(columns='y').loc[df.index[split + 1]:]
+        proba = pd.Series(artifact.model.predict_proba(X), index=X.index)
+        np.testing.assert_allclose(got['proba_up'].to_numpy()[:-1], proba.to_numpy(), rtol=1e-9)
+
+        entries, exits = to_entries_exits(proba, 0.5)
+        assert (got['entry'].to_numpy()[:-1] == entries.to_numpy()).all()
+        assert (got['exit'].to_numpy()[:-1] == exits.to_numpy()).all()
+
+
+def test_queue_source_async_sink_and_latency(make_ohlcv):
+    from live.service import Bar, QueueSource, SignalService
+    from models.artifacts import train_artifact
+
+    df = make_ohlcv(300)
+    service_out = []
+
+    async def sink(signals):
+        service_out.extend(signals)
+
+    service = SignalService({'0700.HK': train_artifact(df.iloc[:250]).model}, th=0.5, sink=sink)
+    service.warm_up({'0700.HK': df.iloc[:250]})
+
+    async def feed_and_run():
+        source = QueueSource()
+        for ts, row in df.iloc[250:].iterrows():
+            source.queue.put_nowait(Bar('0700.HK', ts, row['Close'], row['Volume']))
+        source.queue.put_nowait(Bar('0700.HK', df.index[100], 1.0, 1.0))  # stale, ignored
+        source.queue.put_nowait(None)
+        return await service.run(source)
+
+    assert asyncio.run(feed_and_run()) == 50
+    assert len(service_out) == 50 and service.n_stale == 1
+    # the whole queue was drained as one batch
+    assert service.latency['tick'].count == 1
+    assert service.latency['per_bar'].count == 51
+
+    report = service.latency_report()
+    assert (report.loc['per_bar', 'p50_ms'] <= report.loc['per_bar', 'max_ms'])
+
+
+def test_latency_histogram_percentiles():
+    from live.service import LatencyHistogram
+
+    h = LatencyHistogram()
+    for us in range(1, 1001):
+        h.record(us * 1e-6)
+    assert h.count == 1000
+    assert 400e-6 <= h.percentile(50) <= 700e-6
+    assert h.percentile(100) == h.max == 1000e-6
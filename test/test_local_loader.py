@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+
+ROWS = [
+    ('2025-01-02', 101.0, 102.0, 99.0, 100.0, 1000),
+    ('2025-01-03', 102.5, 103.0, 100.5, 101.0, 1100),
+    ('2025-01-06', 101.5, 104.0, 101.0, 102.0, 1200),
+]
+
+
+def _write(path, header_lines):
+    body = '\n'.join(','.join(str(v) for v in row) for row in ROWS)
+    path.write_text(''.join(h + '\n' for h in header_lines) + body + '\n')
+
+
+def test_load_yfinance_multiline_header(tmp_path):
+    from data.downloader import load_local_ohlcv
+
+    _write(
+        tmp_path / '0700.HK_historical_data.csv',
+        ['Price,Close,High,Low,Open,Volume', 'Ticker,0700.HK,0700.HK,0700.HK,0700.HK,0700.HK', 'Date,,,,,'],
+    )
+    df = load_local_ohlcv('0700.HK', data_dir=str(tmp_path))
+    assert list(df.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+    assert isinstance(df.index, pd.DatetimeIndex) and len(df) == 3
+    assert df['Close'].tolist() == [101.0, 102.5, 101.5]
+    assert df['Volume'].dtype == np.int64
+
+
+def test_load_headerless_and_float32(tmp_path):
+    from data.downloader import load_local_ohlcv
+
+    _write(tmp_path / '0005.HK.csv', [])
+    df = load_local_ohlcv('0005.HK', data_dir=str(tmp_path), price_dtype=np.float32)
+    assert df['Open'].dtype == np.float32
+    assert df['Open'].tolist() == [100.0, 101.0, 102.0]
+
+
+def test_load_lowercase_header_in_other_order(tmp_path):
+    from data.downloader import load_local_ohlcv
+
+    (tmp_path / '0941.HK.csv').write_text(
+        'Date,volume,open,high,low,close\n2025-01-02,1000.0,1,2,0.5,1.5\n'
+    )
+    df = load_local_ohlcv('0941.HK', data_dir=str(tmp_path))
+    assert df.iloc[0].tolist() == [1.0, 2.0, 0.5, 1.5, 1000.0]
+
+
+def test_iter_local_matches_full_load(tmp_path):
+    from data.downloader import iter_local_ohlcv, load_local_ohlcv
+
+    _write(tmp_path / '0700.HK.csv', ['date,Close,High,Low,Open,Volume'])
+    full = load_local_ohlcv('0700.HK', data_dir=str(tmp_path))
+    chunks = list(iter_local_ohlcv('0700.HK', data_dir=str(tmp_path), chunksize=2))
+    assert [len(c) for c in chunks] == [2, 1]
+    pd.testing.assert_frame_equal(pd.concat(chunks), full, check_dtype=False)
+
+
+def test_missing_file_returns_none(tmp_path):
+    from data.downloader import load_local_ohlcv
+
+    assert load_local_ohlcv('NOPE.HK', data_dir=str(tmp_path)) is None
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def make_pf(n_cols=3, group=False):
+    import vectorbt as vbt
+
+    rng = np.random.default_rng(0)
+    idx = pd.date_range('2024-01-02 09:30', periods=500, freq='h', tz='Asia/Hong_Kong')
+    cols = list('abcdefgh'[:n_cols])
+    close = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (500, n_cols)), axis=0)), index=idx, columns=cols)
+    entries = pd.DataFrame(rng.random((500, n_cols)) > 0.9, index=idx, columns=cols)
+    exits = pd.DataFrame(rng.random((500, n_cols)) > 0.9, index=idx, columns=cols)
+    kwargs = dict(group_by=[0, 0, 1, 1], cash_sharing=True) if group else {}
+    return vbt.Portfolio.from_signals(close, entries, exits, init_cash=100_000.0, freq='H', **kwargs)
+
+
+@pytest.mark.parametrize('group', [False, True])
+def test_metrics_match_vectorbt_accessors(group):
+    from backtest.metrics import portfolio_metrics, portfolio_value
+
+    pf = make_pf(4 if group else 3, group=group)
+    np.testing.assert_allclose(portfolio_value(pf), pf.value().to_numpy(), rtol=1e-12)
+    got = portfolio_metrics(pf).to_frame()
+    ref = pd.DataFrame(
+        {
+            'total_return': pf.total_return(),
+            'cagr': pf.annualized_return(),
+            'max_drawdown': pf.max_drawdown(),
+            'win_rate': pf.trades.win_rate(),
+            'sharpe_ratio': pf.sharpe_ratio(),
+        }
+    )
+    pd.testing.assert_frame_equal(got, ref, check_names=False, rtol=1e-10)
+
+
+def test_only_requested_metrics_are_computed():
+    from backtest.metrics import compute_metrics
+
+    value = np.array([[100.0, 100.0], [110.0, 90.0], [99.0, 95.0]])
+    m = compute_metrics(value, 100.0, 'h', metrics=['total_return', 'max_drawdown'])
+    assert m.cagr is None and m.sharpe_ratio is None and m.win_rate is None
+    np.testing.assert_allclose(m.total_return, [-0.01, -0.05])
+    np.testing.assert_allclose(m.max_drawdown, [-0.1, -0.1])
+    assert list(m.to_frame().columns) == ['total_return', 'max_drawdown']
+    with pytest.raises(ValueError):
+        compute_metrics(value, 100.0, 'h', metrics=['sortino'])
+
+
+def test_run_backtest_lightweight_path():
+    from backtest.vectorbt_engine import run_backtest
+
+    pf = make_pf(1)
+    close = pf.close.iloc[:, 0]
+    entries = close.pct_change() > 0
+    exits = ~entries
+    pf_full, stats_full, win_full = run_backtest(close, entries, exits)
+    _, stats, win_rate = run_backtest(close, entries, exits, metrics=['total_return', 'sharpe_ratio'])
+    assert list(stats.index) == ['total_return', 'sharpe_ratio']
+    assert np.isclose(stats['total_return'] * 100, stats_full['Total Return [%]'])
+    assert win_rate == win_full
+
+
+def test_portfolio_value_without_orders():
+    import vectorbt as vbt
+    from backtest.metrics import portfolio_metrics, portfolio_value
+
+    close = pd.Series(np.linspace(100, 110, 50), index=pd.date_range('2024-01-02', periods=50, freq='h'))
+    never = pd.Series(False, index=close.index)
+    pf = vbt.Portfolio.from_signals(close, never, never, init_cash=1_000.0, freq='H')
+    np.testing.assert_array_equal(portfolio_value(pf)[:, 0], np.full(50, 1_000.0))
+    assert portfolio_metrics(pf, ['total_return']).total_return[0] == 0.0
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def make_universe(n_symbols=4, n_bars=400, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2024-01-02 09:30', periods=n_bars, freq='h', tz='Asia/Hong_Kong')
+    out = {}
+    for i in range(n_symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+        out[f'{i:04d}.HK'] = pd.DataFrame({'Close': close, 'Volume': rng.integers(1, 1000, n_bars).astype(float)}, index=idx)
+    return out
+
+
+def test_registry_lists_and_rejects_names():
+    from models.registry import HistGBModel, available_models, get_model
+
+    assert {'logistic', 'hgb'} <= set(available_models())
+    assert isinstance(get_model('hgb', max_iter=5), HistGBModel)
+    with pytest.raises(ValueError):
+        get_model('nope')
+
+
+def test_logistic_backend_matches_pipeline():
+    from models.logistic_model import build_features, make_model
+    from models.registry import get_model
+
+    data = build_features(make_universe(1)['0000.HK'])
+    X, y = data.drop(columns='y'), data['y']
+    ref = make_model(42).fit(X, y).predict_proba(X)[:, 1]
+    got = get_model('logistic').fit(X, y).predict_proba(X)
+    np.testing.assert_allclose(got, ref)
+
+
+@pytest.mark.parametrize('name', ['logistic', 'hgb'])
+def test_save_load_roundtrip(tmp_path, name):
+    from models.logistic_model import build_features
+    from models.registry import Model, get_model
+
+    data = build_features(make_universe(1)['0000.HK'])
+    X, y = data.drop(columns='y'), data['y']
+    model = get_model(name, **({'max_iter': 10} if name == 'hgb' else {})).fit(X, y)
+    path = tmp_path / f'{name}.joblib'
+    model.save(str(path))
+    loaded = Model.load(str(path))
+    np.testing.assert_array_equal(loaded.predict_proba(X), model.predict_proba(X))
+
+
+def test_train_predict_with_hgb_and_panel_inference():
+    from models.logistic_model import train_predict
+    from models.panel_features import build_features_panel
+    from models.registry import get_model, predict_panel
+
+    data = make_universe()
+    idx, proba = train_predict(data['0000.HK'], model='hgb')
+    assert proba.between(0, 1).all() and len(proba) == len(idx)
+
+    panel = build_features_panel(data)
+    model = get_model('hgb', max_iter=20, n_threads=2).fit(panel.drop(columns='y'), panel['y'])
+    scored = predict_panel(model, panel)
+    assert scored.index.equals(panel.index)
+    per_symbol = model.predict_proba(panel.xs('0002.HK').drop(columns='y'))
+    np.testing.assert_allclose(scored.xs('0002.HK').to_numpy(), per_symbol)
+    np.testing.assert_array_equal(predict_panel(model, panel, batch_rows=100).to_numpy(), scored.to_numpy())
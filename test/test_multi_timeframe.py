@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def session_bars(interval='60m', start='2024-01-02', end='2024-12-31', seed=0, skip=0):
+    """OHLCV bars on the HKEX session grid of `interval` (first `skip` dropped)."""
+    from data.calendar import HKEXCalendar
+
+    cal = HKEXCalendar()
+    days = cal.trading_days(pd.Timestamp(start).date(), pd.Timestamp(end).date())
+    idx = pd.DatetimeIndex([t for d in days for t in cal.bar_labels(d, interval)])[skip:]
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(idx))))
+    spread = np.abs(rng.normal(0, 0.003, len(idx)))
+    return pd.DataFrame(
+        {
+            'Open': close * (1 + rng.normal(0, 0.002, len(idx))),
+            'High': close * (1 + spread),
+            'Low': close * (1 - spread),
+            'Close': close,
+            'Volume': rng.integers(1_000, 100_000, len(idx)).astype(float),
+        },
+        index=idx,
+    )
+
+
+def mtf_spec(base_interval='60m', interval='1d', spec='logistic_minimal'):
+    return {
+        'name': 'test_mtf', 'version': 1, 'base': 'logistic_minimal',
+        'base_interval': base_interval, 'timeframes': [{'interval': interval, 'spec': spec}],
+    }
+
+
+@pytest.mark.parametrize('base_interval,interval', [('60m', '1d'), ('15m', '60m')])
+def test_no_lookahead_under_future_perturbation(base_interval, interval):
+    from models.logistic_model import feature_frame
+
+    df = session_bars(base_interval, end='2024-04-30')
+    spec = mtf_spec(base_interval, interval)
+    ref = feature_frame(df, spec)
+    rng = np.random.default_rng(1)
+    for t in rng.choice(np.arange(300, len(df)), size=5, replace=False):
+        future = df.copy()
+        # rewrite bar t and everything after it
+        future.iloc[t:] *= rng.uniform(0.5, 2.0, size=(len(df) - t, 1))
+        got = feature_frame(future, spec)
+        pd.testing.assert_frame_equal(got.iloc[:t + 1], ref.iloc[:t + 1])
+        assert not got.iloc[t + 1:].equals(ref.iloc[t + 1:])
+
+
+@pytest.mark.parametrize('base_interval,interval', [('60m', '1d'), ('15m', '60m'), ('5m', '15m')])
+def test_matches_merge_asof_on_bar_end(base_interval, interval):
+    from data.calendar import HKEXCalendar
+    from data.resample import resample_ohlcv
+    from models.logistic_model import feature_frame
+
+    cal = HKEXCalendar()
+    df = session_bars(base_interval, end='2024-03-28')
+    got = feature_frame(df, mtf_spec(base_interval, interval))
+    higher = [c for c in got if c.endswith(f'_{interval}')]
+
+    # reference: per-bar merge_asof on the time each higher bar completes;
+    # a bar is visible from the first base bar starting at or after its end
+    bars = resample_ohlcv(df, interval)
+    raw = feature_frame(bars).shift(-1)  # unshifted: row L uses bars up to L
+    raw.columns = [f'{c}_{interval}' for c in raw]
+    raw['end'] = [cal.bar_end(label, interval) for label in bars.index]
+    ref = pd.merge_asof(
+        pd.DataFrame({'ts': df.index}), raw.iloc[:-1], left_on='ts', right_on='end', direction='backward'
+    ).set_index('ts')[higher]
+    np.testing.assert_array_equal(got[higher].to_numpy(), ref.to_numpy())
+
+
+def test_auction_print_does_not_see_its_own_day():
+    from data.calendar import HK_TZ
+    from models.logistic_model import feature_frame
+
+    df = session_bars('60m', end='2024-03-28')
+    auction = pd.Timestamp('2024-03-27 16:00').tz_localize(HK_TZ)
+    df = pd.concat([df, df.iloc[[-1]].set_axis([auction])]).sort_index()
+    got = feature_frame(df, mtf_spec())
+    # the 16:00 print belongs to that day's daily bar: still the previous day's features
+    assert got.loc[auction, 'ret1_1d'] == got.loc[auction - pd.Timedelta(hours=1), 'ret1_1d']
+
+
+@pytest.mark.parametrize('spec', ['mtf_daily', 'technical'])
+def test_panel_matches_per_symbol_build_features(spec, tmp_path):
+    from data.resample import ResampledBars
+    from data.store import OHLCVStore
+    from models.logistic_model import build_features
+    from models.multi_timeframe import build_features_mtf
+
+    if spec == 'technical':
+        spec = dict(mtf_spec(spec='technical'), base='technical')
+    data = {f'{i:04d}.HK': session_bars(seed=i, skip=i * 97) for i in range(5)}
+    data['9999.HK'] = session_bars(seed=9, end='2024-02-15')  # too short: left out
+    panel = build_features_mtf(data, spec)
+    assert '9999.HK' not in panel.index.get_level_values(0)
+    for sym, df in data.items():
+        if sym == '9999.HK':
+            continue
+        pd.testing.assert_frame_equal(
+            panel.xs(sym), build_features(df, spec), check_exact=True, check_names=False, check_freq=False
+        )
+
+    # cached 1d bars from a 60m store give the same table
+    store = OHLCVStore(str(tmp_path))
+    for sym, df in data.items():
+        store.append(sym, '60m', df)
+    cache = ResampledBars(store, base_interval='60m')
+    daily = pd.concat({sym: cache.get(sym, '1d') for sym in data})
+    cached = build_features_mtf(data, spec, higher={'1d': daily})
+    pd.testing.assert_frame_equal(cached, panel, check_names=False)
+
+
+def test_lookback_window_reproduces_latest_rows():
+    from models.artifacts import train_artifact
+    from models.logistic_model import feature_frame, feature_lookback
+
+    df = session_bars()
+    spec = 'mtf_daily'
+    full = feature_frame(df, spec)
+    window = feature_frame(df.iloc[-feature_lookback(spec) - 5:], spec)
+    # equal up to the rounding of rolling accumulators started elsewhere
+    pd.testing.assert_frame_equal(window.iloc[-5:], full.iloc[-5:], check_exact=False, rtol=0, atol=1e-10)
+
+    # artifact scoring only rebuilds features from that window
+    artifact = train_artifact(df, feature_spec=spec)
+    proba = artifact.predict(df, n_bars=5)
+    np.testing.assert_allclose(proba, artifact.predict_features(full.iloc[-5:]), rtol=1e-12)
+
+
+def test_completed_rows_across_symbols():
+    from models.multi_timeframe import completed_rows
+
+    bar_codes = np.array([0, 0, 0, 2, 2])
+    bar_labels = np.array([10, 20, 30, 5, 25])
+    base_codes = np.array([2, 0, 1, 0, 2, 0, 2])
+    buckets = np.array([30, 20, 40, 10, 5, 31, 25])
+    rows = completed_rows(base_codes, buckets, bar_codes, bar_labels)
+    assert rows.tolist() == [4, 0, -1, -1, -1, 2, 3]
+
+
+def test_bars_finer_than_base_interval_are_rejected():
+    from models.logistic_model import feature_frame
+    from models.multi_timeframe import build_features_mtf
+
+    df = session_bars('15m', end='2024-02-29')
+    # mtf_daily sizes its lookback for 60m bars: 15m bars would be cut short
+    with pytest.raises(ValueError, match='60m bars'):
+        feature_frame(df, 'mtf_daily')
+    with pytest.raises(ValueError, match='60m bars'):
+        build_features_mtf({'0001.HK': df, '0002.HK': df}, 'mtf_daily')
+    # coarser bars only over-size the window
+    feature_frame(session_bars('60m', end='2024-02-29'), mtf_spec('15m'))
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+
+def test_online_matches_batch_build_features(make_ohlcv):
+    from models.logistic_model import build_features
+    from models.online_features import OnlineFeatures
+
+    df = make_ohlcv(400, tz=None)
+    batch = build_features(df).drop(columns='y')
+
+    calc = OnlineFeatures()
+    rows = {}
+    for ts, close, vol in zip(df.index, df['Close'], df['Volume']):
+        row = calc.update(close, vol)
+        if not np.isnan(row).any():
+            rows[ts] = row
+    online = pd.DataFrame.from_dict(rows, orient='index', columns=OnlineFeatures.columns)
+
+    assert list(online.index) == list(batch.index)
+    np.testing.assert_allclose(online.to_numpy(), batch.to_numpy(), rtol=1e-10, atol=1e-12)
+
+
+def test_next_row_is_row_for_following_bar(make_ohlcv):
+    from models.online_features import OnlineFeatures
+
+    df = make_ohlcv(60, seed=1, tz=None)
+    calc = OnlineFeatures.from_history(df.iloc[:-1])
+    assert calc.ready
+    expected = calc.next_row()
+    got = calc.update(df['Close'].iloc[-1], df['Volume'].iloc[-1])
+    np.testing.assert_array_equal(got, expected)
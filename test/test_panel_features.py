@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+
+def make_universe(n_symbols=6, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(n_symbols):
+        n = int(rng.integers(150, 400))
+        idx = pd.date_range('2024-01-01', periods=n, freq='h') + pd.Timedelta(hours=int(rng.integers(0, 30)))
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+        vol = rng.integers(1, 1000, n).astype(float)
+        data[f'{i:04d}.HK'] = pd.DataFrame({'Close': close, 'Volume': vol}, index=idx)
+    return data
+
+
+def _assert_matches_per_symbol(panel, data):
+    from models.logistic_model import build_features
+
+    for sym, df in data.items():
+        try:
+            expected = build_features(df)
+        except ValueError:
+            assert sym not in panel.index.get_level_values('symbol')
+            continue
+        pd.testing.assert_frame_equal(
+            panel.xs(sym), expected, check_exact=True, check_names=False, check_freq=False
+        )
+
+
+def test_panel_matches_build_features_from_mapping_and_long():
+    from models.panel_features import build_features_panel
+
+    data = make_universe()
+    _assert_matches_per_symbol(build_features_panel(data), data)
+
+    long = pd.concat(data, names=['symbol', 'ts'])
+    _assert_matches_per_symbol(build_features_panel(long), data)
+
+
+def test_panel_matches_build_features_from_wide():
+    from models.panel_features import build_features_panel
+
+    data = make_universe(seed=1)
+    close = pd.DataFrame({s: df['Close'] for s, df in data.items()})
+    volume = pd.DataFrame({s: df['Volume'] for s, df in data.items()})
+    _assert_matches_per_symbol(build_features_panel(close, volume), data)
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+
+def test_stages_are_noops_without_profiler():
+    from profiling import active_profiler, stage, timed
+
+    @timed()
+    def double(x):
+        return 2 * x
+
+    assert active_profiler() is None
+    with stage('anything') as rec:
+        rec.rows = 10  # discarded
+    assert double(3) == 6
+
+
+def test_nested_stages_rows_and_outputs(tmp_path):
+    from profiling import StageProfiler, stage, timed
+
+    @timed('square')
+    def square(n):
+        return [i * i for i in range(n)]
+
+    profiler = StageProfiler(cprofile=True, tracemalloc=True)
+    with profiler.activate():
+        with stage('outer') as rec:
+            rec.rows = len(square(50_000))
+            with stage('inner', rows=3):
+                buf = bytearray(8 * 2**20)
+                del buf
+    records = {r.name: r for r in profiler.records}
+    assert [r.name for r in profiler.records] == ['outer', 'square', 'inner']
+    assert records['outer'].rows == 50_000 and records['inner'].rows == 3
+    assert records['square'].depth == 1
+    assert records['outer'].wall_s >= records['square'].wall_s + records['inner'].wall_s
+    # the inner allocation counts towards both peaks
+    assert records['inner'].tracemalloc_peak_mb >= 7.9
+    assert records['outer'].tracemalloc_peak_mb >= records['inner'].tracemalloc_peak_mb
+    # cProfile only on top-level stages
+    assert records['outer'].cprofile_top and records['inner'].cprofile_top is None
+
+    profiler.write(str(tmp_path / 'p.json'))
+    data = json.load(open(tmp_path / 'p.json'))
+    assert [s['name'] for s in data['stages']] == ['outer', 'square', 'inner']
+
+    profiler.write(str(tmp_path / 'p.trace.json'), 'chrome')
+    events = json.load(open(tmp_path / 'p.trace.json'))['traceEvents']
+    spans = [e for e in events if e['ph'] == 'X']
+    assert {e['name'] for e in spans} == {'outer', 'square', 'inner'}
+    assert all(e['dur'] >= 0 for e in spans)
+
+
+def test_failed_stage_is_recorded():
+    from profiling import StageProfiler, stage
+
+    profiler = StageProfiler()
+    with pytest.raises(ValueError):
+        with profiler.activate():
+            with stage('load_data'):
+                raise ValueError('no data')
+    assert profiler.records[0].to_dict()['error'] == 'ValueError: no data'
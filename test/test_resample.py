@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+
+def minute_bars(start='2024-12-20', end='2025-01-03', extra=(), seed=0):
+    """1m bars of every session minute in [start, end] (plus `extra` stamps)."""
+    from data.calendar import HK_TZ, HKEXCalendar
+
+    cal = HKEXCalendar()
+    days = cal.trading_days(pd.Timestamp(start).date(), pd.Timestamp(end).date())
+    idx = pd.DatetimeIndex([t for d in days for t in cal.bar_labels(d, '1m')])
+    if extra:
+        idx = idx.append(pd.DatetimeIndex([pd.Timestamp(t).tz_localize(HK_TZ) for t in extra])).sort_values()
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, len(idx))))
+    return pd.DataFrame(
+        {
+            'Open': close * (1 + rng.normal(0, 0.0005, len(idx))),
+            'High': close * 1.001,
+            'Low': close * 0.999,
+            'Close': close,
+            'Volume': rng.integers(1, 1_000, len(idx)).astype(float),
+        },
+        index=idx,
+    )
+
+
+def test_resample_follows_hkex_sessions():
+    from data.calendar import HKEXCalendar
+    from data.resample import resample_ohlcv
+
+    cal = HKEXCalendar()
+    # a pre-open print (dropped) and a closing-auction print (folded into 15:00)
+    df = minute_bars(extra=['2024-12-23 09:00', '2024-12-23 16:00'])
+    days = cal.trading_days(pd.Timestamp('2024-12-20').date(), pd.Timestamp('2025-01-03').date())
+    for interval in ('5m', '15m', '60m', '1d'):
+        got = resample_ohlcv(df, interval)
+        # holidays (Dec 25/26, Jan 1) are absent, half-days (Dec 24/31) morning-only
+        assert got.index.equals(pd.DatetimeIndex([t for d in days for t in cal.bar_labels(d, interval)]))
+
+    hourly = resample_ohlcv(df, '60m')
+    assert [t.strftime('%H:%M') for t in hourly.loc['2024-12-24'].index] == ['09:30', '10:30', '11:30']
+    kept = df.drop(pd.Timestamp('2024-12-23 09:00', tz='Asia/Hong_Kong'))
+    assert hourly['Volume'].sum() == kept['Volume'].sum()
+
+    # every coarse bar matches a plain groupby over its own fine bars
+    closing = hourly.loc['2024-12-23 15:00']
+    rows = kept.loc['2024-12-23 15:00':'2024-12-23 16:00']
+    assert closing['Open'] == rows['Open'].iloc[0] and closing['Close'] == rows['Close'].iloc[-1]
+    assert closing['High'] == rows['High'].max() and closing['Low'] == rows['Low'].min()
+    assert closing['Volume'] == rows['Volume'].sum()
+
+
+def test_resample_keeps_dtypes_and_naive_index():
+    from data.downloader import to_compact
+    from data.resample import resample_ohlcv
+
+    df = to_compact(minute_bars(end='2024-12-23'))
+    got = resample_ohlcv(df, '15m')
+    assert got.dtypes.tolist() == [np.float32] * 4 + [np.int64]
+    naive = resample_ohlcv(df.tz_localize(None), '15m')
+    assert naive.index.tz is None and naive.index.equals(got.index.tz_localize(None))
+    pd.testing.assert_frame_equal(naive.set_axis(got.index), got)
+
+
+def test_resampled_bars_cache_incrementally(tmp_path, monkeypatch):
+    import data.resample
+    from data.resample import ResampledBars, resample_ohlcv
+    from data.store import OHLCVStore
+
+    store = OHLCVStore(str(tmp_path))
+    df = minute_bars()
+    # stop mid-bar: 10:44 leaves the 10:30 hourly bar incomplete
+    cut = df.index.get_loc(pd.Timestamp('2024-12-30 10:44', tz='Asia/Hong_Kong'))
+    store.append('0700.HK', '1m', df.iloc[:cut + 1])
+    bars = ResampledBars(store, base_interval='1m')
+
+    first = bars.get('0700.HK', '60m')
+    assert first.index[-1] == pd.Timestamp('2024-12-30 09:30', tz='Asia/Hong_Kong')
+
+    seen = []
+    monkeypatch.setattr(data.resample, 'resample_ohlcv', lambda frame, *a: seen.append(len(frame)) or resample_ohlcv(frame, *a))
+    # nothing new: the cached bars are read back, no fine bar is aggregated twice
+    assert bars.refresh('0700.HK', '60m') == 0
+    store.append('0700.HK', '1m', df.iloc[cut + 1:])
+    full = bars.get('0700.HK', '60m')
+    # only the fine bars from the last cached hour on were aggregated
+    assert seen == [len(df.loc['2024-12-30 09:30':])]
+    pd.testing.assert_frame_equal(full, resample_ohlcv(df, '60m').rename_axis('timestamp'), check_freq=False)
+
+
+def test_download_derives_interval_from_synced_minutes(tmp_path, monkeypatch):
+    from data.downloader import download_ohlcv
+    from data.resample import resample_ohlcv
+
+    df = minute_bars(end='2024-12-24')
+    requested = []
+
+    def fake_download(symbol, interval, auto_adjust, progress, **window):
+        requested.append(interval)
+        return df.tz_convert('UTC')
+
+    monkeypatch.setattr('yfinance.download', fake_download)
+    monkeypatch.chdir(tmp_path)
+    store_dir = str(tmp_path / 'bars')
+    got = download_ohlcv('0700.HK', period='max', interval='15m', resample_from='1m', store_dir=store_dir)
+    assert requested == ['1m']
+    assert sorted(p.name for p in (tmp_path / 'bars' / '0700.HK').iterdir()) == ['15m.from-1m', '1m']
+    assert not (tmp_path / 'data' / 'cache').exists()
+    pd.testing.assert_frame_equal(got, resample_ohlcv(df, '15m').rename_axis('timestamp'), check_freq=False)
+    daily = download_ohlcv('0700.HK', period='max', interval='1d', resample_from='1m', store_dir=store_dir)
+    # only the 1m base is ever requested (the second call syncs its tail)
+    assert set(requested) == {'1m'} and len(daily) == 3
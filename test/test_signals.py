@@ -17,3 +17,53 @@ def test_to_entries_exits_basic():
     # exits should equal (~entries).shift(1).fillna(False)
     assert exits.equals((~entries).shift(1).fillna(False))
 
+
+
+def test_stateful_adapter_replays_batch_with_hysteresis():
+    import numpy as np
+    from signals.adapter import StatefulSignalAdapter, entries_exits_to_weights, to_entries_exits
+
+    rng = np.random.default_rng(0)
+    idx = pd.date_range('2025-01-01', periods=300, freq='h')
+    s = pd.Series(rng.random(300), index=idx)
+    s.iloc[[5, 6, 40]] = np.nan
+
+    for th, exit_th in [(0.55, None), (0.6, 0.4)]:
+        entries, exits = to_entries_exits(s, th, exit_th)
+        adapter = StatefulSignalAdapter(th, exit_th, position_size=0.25)
+        got = [adapter.update(p) for p in s.to_numpy()]
+        got_en = pd.Series([bool(e[0]) for e, _ in got], index=idx)
+        got_ex = pd.Series([bool(x[0]) for _, x in got], index=idx)
+        assert got_en.loc[entries.index].equals(entries)
+        assert got_ex.loc[exits.index].equals(exits)
+        assert not got_en[s.isna()].any() and not got_ex[s.isna()].any()
+
+        weights = entries_exits_to_weights(entries.to_frame(), exits.to_frame(), position_size=0.25)
+        _, _, w = StatefulSignalAdapter(th, exit_th, position_size=0.25).replay(s.to_numpy())
+        np.testing.assert_array_equal(w[~s.isna().to_numpy(), 0], weights.iloc[:, 0].to_numpy())
+
+
+def test_entries_exits_array_many_symbols_and_thresholds():
+    import numpy as np
+    from signals.adapter import StatefulSignalAdapter, entries_exits_array, to_entries_exits, to_entries_exits_grid
+
+    rng = np.random.default_rng(1)
+    proba = rng.random((200, 4))
+    proba[rng.random((200, 4)) < 0.05] = np.nan
+    th = np.array([0.5, 0.55, 0.6, 0.65])
+    exit_th = th - 0.1
+
+    entries, exits = entries_exits_array(proba, th, exit_th)
+    stream_en, stream_ex, _ = StatefulSignalAdapter(th, exit_th, n_columns=4).replay(proba)
+    np.testing.assert_array_equal(entries, stream_en)
+    np.testing.assert_array_equal(exits, stream_ex)
+    for j in range(4):
+        s = pd.Series(proba[:, j])
+        e, x = to_entries_exits(s, th[j], exit_th[j])
+        np.testing.assert_array_equal(entries[e.index, j], e.to_numpy())
+        np.testing.assert_array_equal(exits[x.index, j], x.to_numpy())
+
+    s = pd.Series(rng.random(100))
+    grid_en, grid_ex = to_entries_exits_grid(s, [0.5, 0.6], exit_thresholds=[0.45, 0.5])
+    e, x = to_entries_exits(s, 0.6, 0.5)
+    assert grid_en[0.6].equals(e) and grid_ex[0.6].equals(x)
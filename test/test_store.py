@@ -0,0 +1,131 @@
+import pandas as pd
+
+
+def _bars(start, periods, freq='60min'):
+    from data.store import HK_TZ
+
+    idx = pd.date_range(start, periods=periods, freq=freq, tz=HK_TZ)
+    base = pd.Series(range(periods), index=idx, dtype=float) + 100
+    return pd.DataFrame(
+        {'Open': base, 'High': base + 1, 'Low': base - 1, 'Close': base, 'Volume': 1000.0},
+        index=idx,
+    )
+
+
+def test_append_is_idempotent_and_read_is_sorted(tmp_path):
+    from data.store import OHLCVStore
+
+    store = OHLCVStore(str(tmp_path))
+    df = _bars('2023-12-31 20:00', 10)
+
+    assert store.append('0700.HK', '60m', df.iloc[3:7]) == 4
+    # overlapping tail + new rows on both sides: only the uncovered rows land
+    assert store.append('0700.HK', '60m', df.iloc[5:]) == 3
+    assert store.append('0700.HK', '60m', df.iloc[:5]) == 3
+    assert store.append('0700.HK', '60m', df) == 0
+
+    out = store.read('0700.HK', '60m')
+    assert out.index.is_monotonic_increasing
+    pd.testing.assert_frame_equal(out, df, check_names=False, check_freq=False)
+
+    # data spanning a year boundary lands in two year partitions
+    years = sorted(p.name for p in (tmp_path / '0700.HK' / '60m').iterdir())
+    assert years == ['year=2023', 'year=2024']
+
+
+def test_read_time_range_and_compact(tmp_path):
+    from data.store import OHLCVStore
+
+    store = OHLCVStore(str(tmp_path))
+    df = _bars('2024-01-02 09:30', 48)
+    for i in range(0, 48, 8):
+        store.append('0005.HK', '60m', df.iloc[i:i + 8])
+
+    start, end = df.index[10], df.index[30]
+    out = store.read('0005.HK', '60m', start=start, end=end)
+    pd.testing.assert_frame_equal(out, df.loc[start:end], check_names=False, check_freq=False)
+
+    store.compact('0005.HK', '60m')
+    parts = list((tmp_path / '0005.HK' / '60m' / 'year=2024').iterdir())
+    assert len(parts) == 1
+    pd.testing.assert_frame_equal(store.read('0005.HK', '60m'), df, check_names=False, check_freq=False)
+
+
+def test_read_missing_series_returns_empty(tmp_path):
+    from data.store import OHLCVStore
+
+    out = OHLCVStore(str(tmp_path)).read('9999.HK', '1d')
+    assert out.empty
+    assert list(out.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def test_chunked_download_uses_store(tmp_path, monkeypatch):
+    from data.downloader import download_ohlcv_chunked
+
+    calls = {'n': 0}
+
+    def fake_download(symbol, start, end, interval, auto_adjust, progress):
+        calls['n'] += 1
+        # daily HK bars come back stamped at local midnight
+        idx = pd.date_range(start, end, freq='D', inclusive='left', tz='Asia/Hong_Kong')
+        return pd.DataFrame(
+            {'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0, 'Volume': 1.0}, index=idx
+        )
+
+    monkeypatch.setattr('yfinance.download', fake_download)
+
+    kwargs = dict(start='2020-01-01', end='2023-12-31', interval='1d', cache_dir=str(tmp_path))
+    first = download_ohlcv_chunked('0700.HK', **kwargs)
+    assert calls['n'] == 4
+    assert first.index.is_monotonic_increasing and first.index.is_unique
+
+    # every chunk was fetched in full: a second run downloads nothing
+    second = download_ohlcv_chunked('0700.HK', **kwargs)
+    assert calls['n'] == 4
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_backfill_fills_interior_gap(tmp_path):
+    from data.store import OHLCVStore
+
+    store = OHLCVStore(str(tmp_path))
+    df = _bars('2020-01-01', 1461, freq='D')
+    y2023, y2020, middle = df.loc['2023'], df.loc['2020'], df.loc['2021':'2022']
+
+    assert store.append('0700.HK', '1d', y2023) == 365
+    assert store.append('0700.HK', '1d', y2020) == 366
+    assert store.append('0700.HK', '1d', middle) == 730
+    assert store.append('0700.HK', '1d', df) == 0
+    pd.testing.assert_frame_equal(store.read('0700.HK', '1d'), df, check_names=False, check_freq=False)
+
+    # a hole inside a compacted part is filled by rewriting that part
+    store.compact('0700.HK', '1d')
+    store.append('0700.HK', '1d', df.iloc[:100].drop(df.index[50]))
+    assert store.append('0700.HK', '1d', df) == 0
+    (tmp_path / '0700.HK' / '1d' / 'notes').mkdir()  # compact skips non-year entries
+    store.compact('0700.HK', '1d')
+    pd.testing.assert_frame_equal(store.read('0700.HK', '1d'), df, check_names=False, check_freq=False)
+
+
+def test_chunked_download_backfills_earlier_start(tmp_path, monkeypatch):
+    from data.downloader import download_ohlcv_chunked
+    from data.store import HK_TZ
+
+    fetched = []
+
+    def fake_download(symbol, start, end, interval, auto_adjust, progress):
+        fetched.append(start)
+        idx = pd.date_range(start, end, freq='D', inclusive='left', tz='Asia/Hong_Kong')
+        return pd.DataFrame(
+            {'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0, 'Volume': 1.0}, index=idx
+        )
+
+    monkeypatch.setattr('yfinance.download', fake_download)
+
+    download_ohlcv_chunked('0700.HK', start='2023-01-01', end='2023-12-31', cache_dir=str(tmp_path))
+    out = download_ohlcv_chunked('0700.HK', start='2020-01-01', end='2023-12-31', cache_dir=str(tmp_path))
+    # the three earlier years are fetched, the stored one is not
+    assert fetched == ['2023-01-01', '2020-01-01', '2021-01-01', '2022-01-01']
+    pd.testing.assert_index_equal(
+        out.index, pd.date_range('2020-01-01', '2023-12-31', freq='D', tz=HK_TZ), check_names=False
+    )
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def chunked(df, size):
+    return (df.iloc[i:i + size] for i in range(0, len(df), size))
+
+
+@pytest.mark.parametrize('spec', [None, 'technical'])
+@pytest.mark.parametrize('size', [7, 500, 5000])
+def test_iter_features_matches_build_features(spec, size, make_ohlcv):
+    from data.downloader import to_compact
+    from models.logistic_model import build_features
+    from models.streaming import iter_features
+
+    df = make_ohlcv(3000)
+    ref = build_features(df, spec)
+    got = pd.concat(list(iter_features(chunked(df, size), spec)))
+    assert got.index.equals(ref.index) and (got.dtypes == ref.dtypes).all()
+    assert (got['y'] == ref['y']).all()
+    # only the rounding of rolling accumulators differs
+    pd.testing.assert_frame_equal(got, ref, check_exact=False, rtol=0, atol=1e-10)
+
+    # float32 storage absorbs that rounding: compact chunks are bit-identical
+    compact = to_compact(df)
+    ref_c = build_features(compact, spec, compact=True)
+    pd.testing.assert_frame_equal(pd.concat(list(iter_features(chunked(compact, size), spec, compact=True))), ref_c)
+
+
+def test_streamed_signals_match_in_memory_path(make_ohlcv):
+    from models.artifacts import train_artifact
+    from models.streaming import iter_features, iter_predict, iter_signals
+    from signals.adapter import to_entries_exits
+
+    df = make_ohlcv(3000)
+    artifact = train_artifact(df, train_ratio=0.5)
+    proba = artifact.predict(df)
+    entries, exits = to_entries_exits(proba, 0.5, exit_th=0.45)
+
+    feats = iter_features(chunked(df, 333), artifact.meta['feature_spec'])
+    parts = list(iter_signals(iter_predict(feats, artifact, since=artifact.trained_until), 0.5, exit_th=0.45))
+    assert len(parts) > 1
+    got_proba, got_entries, got_exits = (pd.concat([p[k] for p in parts]) for k in range(3))
+    assert got_proba.index.equals(proba.index)
+    np.testing.assert_allclose(got_proba, proba, rtol=1e-9)
+    assert got_entries.equals(entries) and got_exits.equals(exits)
+
+
+def test_update_block_matches_bar_by_bar():
+    from signals.adapter import StatefulSignalAdapter
+
+    rng = np.random.default_rng(1)
+    proba = rng.uniform(0, 1, (400, 3))
+    proba[rng.uniform(size=proba.shape) < 0.1] = np.nan
+    ref = StatefulSignalAdapter(0.55, 0.45, n_columns=3)
+    entries, exits, _ = ref.replay(proba)
+    blocks = StatefulSignalAdapter(0.55, 0.45, n_columns=3)
+    got = [blocks.update_block(proba[i:i + 37]) for i in range(0, len(proba), 37)]
+    assert (np.vstack([g[0] for g in got]) == entries).all()
+    assert (np.vstack([g[1] for g in got]) == exits).all()
+    assert (blocks.position == ref.position).all()
+
+
+def test_store_iter_read_matches_read(tmp_path, make_ohlcv):
+    from data.store import OHLCVStore
+
+    store = OHLCVStore(str(tmp_path))
+    df = make_ohlcv(2000)[['Open', 'High', 'Low', 'Close', 'Volume']]
+    store.append('0700.HK', '60m', df)
+    start, end = df.index[100], df.index[1500]
+    ref = store.read('0700.HK', '60m', start=start, end=end)
+    chunks = list(store.iter_read('0700.HK', '60m', start=start, end=end, batch_rows=256))
+    assert max(len(c) for c in chunks) <= 256
+    pd.testing.assert_frame_equal(pd.concat(chunks), ref)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+
+def test_grid_columns_match_single_threshold():
+    from signals.adapter import to_entries_exits, to_entries_exits_grid
+
+    idx = pd.date_range('2024-01-01', periods=8, freq='h')
+    s = pd.Series([0.4, 0.6, np.nan, 0.7, 0.5, 0.56, 0.3, 0.9], index=idx)
+    entries, exits = to_entries_exits_grid(s, [0.5, 0.55])
+    for th in (0.5, 0.55):
+        e, x = to_entries_exits(s, th)
+        assert entries[th].tolist() == e.tolist()
+        assert exits[th].tolist() == x.astype(bool).tolist()
+
+
+def test_sweep_matches_individual_backtests(make_ohlcv):
+    from backtest.vectorbt_engine import run_backtest, run_sweep
+    from signals.adapter import to_entries_exits, to_entries_exits_grid
+
+    df = make_ohlcv(700, seed=1)
+    rng = np.random.default_rng(0)
+    proba = pd.Series(rng.random(300), index=df.index[-300:])
+    thresholds = [0.4, 0.5, 0.6]
+    entries, exits = to_entries_exits_grid(proba, thresholds)
+    _, table = run_sweep(df['Close'], entries, exits)
+
+    assert table['rank'].tolist() == [1, 2, 3]
+    assert table['sharpe_ratio'].is_monotonic_decreasing
+    for th in thresholds:
+        e, x = to_entries_exits(proba, th)
+        pf, _, _ = run_backtest(df['Close'].reindex(e.index), e, x)
+        assert np.isclose(table.loc[th, 'total_return'], pf.total_return())
+
+
+def test_run_param_sweep_ranks_grid(make_ohlcv):
+    from main import run_param_sweep
+
+    table = run_param_sweep(make_ohlcv(700, seed=1), [0.6, 0.7], [0.5, 0.55])
+    assert len(table) == 4
+    assert table.index.names == ['train_ratio', 'proba_th']
+
+
+def test_sweep_with_costs_and_metrics_matches_individual_backtests(make_ohlcv):
+    from backtest.costs import HKEXCostModel
+    from backtest.vectorbt_engine import run_backtest, run_sweep
+    from signals.adapter import to_entries_exits, to_entries_exits_grid
+
+    df = make_ohlcv(700, seed=1)
+    rng = np.random.default_rng(0)
+    proba = pd.Series(rng.random(300), index=df.index[-300:])
+    thresholds = [0.4, 0.6]
+    entries, exits = to_entries_exits_grid(proba, thresholds)
+    kwargs = dict(costs=HKEXCostModel(), volume=df['Volume'].reindex(proba.index), lot_size=100)
+    _, table = run_sweep(df['Close'], entries, exits, sort_by='total_return', metrics=['total_return', 'cagr'], **kwargs)
+
+    assert list(table.columns) == ['rank', 'total_return', 'cagr', 'trades']
+    _, frictionless = run_sweep(df['Close'], entries, exits)
+    for th in thresholds:
+        e, x = to_entries_exits(proba, th)
+        _, stats, _ = run_backtest(df['Close'].reindex(e.index), e, x, metrics=['total_return'], **kwargs)
+        assert np.isclose(table.loc[th, 'total_return'], stats['total_return'])
+        assert table.loc[th, 'total_return'] < frictionless.loc[th, 'total_return']
+
+
+def test_run_param_sweep_passes_costs_and_metrics(make_ohlcv):
+    from backtest.costs import HKEXCostModel
+    from main import run_param_sweep
+
+    df = make_ohlcv(700, seed=1)
+    table = run_param_sweep(df, [0.7], [0.5, 0.55], costs=HKEXCostModel(), lot_size=100, metrics=['total_return'])
+    assert list(table.columns) == ['rank', 'total_return', 'trades']
+    free = run_param_sweep(df, [0.7], [0.5, 0.55], metrics=['total_return'])
+    assert (table['total_return'] < free.loc[table.index, 'total_return']).all()
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+
+def make_universe(n_bars=400, n_symbols=5, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2024-01-02 09:30', periods=n_bars, freq='h', tz='Asia/Hong_Kong')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_bars, n_symbols)), axis=0))
+    cols = [f'{i:04d}.HK' for i in range(n_symbols)]
+    proba = pd.DataFrame(rng.random((n_bars, n_symbols)), index=idx, columns=cols)
+    return pd.DataFrame(close, index=idx, columns=cols), proba
+
+
+def test_entries_exits_to_weights_holds_until_exit():
+    from signals.adapter import entries_exits_to_weights
+
+    entries = pd.DataFrame({'a': [1, 0, 0, 0], 'b': [0, 1, 0, 1], 'c': [0, 1, 0, 0]}).astype(bool)
+    exits = pd.DataFrame({'a': [0, 0, 1, 0], 'b': [0, 0, 0, 1], 'c': [0, 0, 0, 0]}).astype(bool)
+    w = entries_exits_to_weights(entries, exits, position_size=0.4)
+    assert w.loc[0].tolist() == [0.4, 0.0, 0.0]
+    assert w.loc[1].tolist() == [0.4, 0.4, 0.4]
+    assert w.loc[2].tolist() == [0.0, 0.4, 0.4]
+    # entry and exit on the same bar are ignored: b stays held
+    assert w.loc[3].tolist() == [0.0, 0.4, 0.4]
+
+
+def test_single_symbol_matches_run_backtest():
+    from backtest.vectorbt_engine import run_backtest, run_universe_backtest
+    from signals.adapter import to_entries_exits
+
+    close, proba = make_universe(n_symbols=1)
+    sym = close.columns[0]
+    entries, exits = to_entries_exits(proba[sym], 0.5)
+    pf_single, _, _ = run_backtest(close[sym], entries, exits.astype(bool))
+    _, asset_stats, stats = run_universe_backtest(
+        close, entries.to_frame(sym), exits.astype(bool).to_frame(sym), max_position=1.0
+    )
+    assert np.isclose(stats['total_return'], pf_single.total_return())
+    assert asset_stats.loc[sym, 'trades'] == pf_single.trades.count()
+
+
+def test_shared_cash_respects_position_limit():
+    from backtest.vectorbt_engine import run_universe_backtest
+
+    close, proba = make_universe()
+    close.iloc[50:60, 2] = np.nan  # a halted symbol
+    weights = proba.where(proba > 0.5, 0.0)  # gross can exceed 1 before limits
+    pf, asset_stats, stats = run_universe_backtest(close, weights=weights, max_position=0.3)
+
+    value = pf.value()
+    asset_value = pf.asset_value(group_by=False)
+    assert (pf.cash() >= -1e-6).all()
+    assert (asset_value.div(value, axis=0).max() <= 0.3 + 0.05).all()  # drift between rebalances
+    assert list(asset_stats.index) == list(close.columns)
+    assert np.isclose(asset_stats['pnl'].sum(), value.iloc[-1] - 100_000.0, rtol=1e-6)
+    assert np.isfinite(stats['total_return'])
+
+
+def test_signals_do_not_rebalance_open_positions():
+    from backtest.vectorbt_engine import run_universe_backtest
+
+    close, proba = make_universe()
+    entries, exits = proba > 0.9, proba < 0.1
+    pf, asset_stats, _ = run_universe_backtest(close, entries, exits, max_position=0.2)
+    # one buy per entry and one sell per exit: orders never exceed 2 per trade
+    n_orders = pf.orders.count(group_by=False)
+    assert (n_orders <= 2 * asset_stats['trades']).all()
@@ -0,0 +1,111 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def fake_download(symbol, **kwargs):
+    if symbol == 'DIE.HK':
+        os._exit(1)  # a worker killed outright, as by the OOM killer
+    if symbol == 'BAD.HK':
+        raise ValueError('no data for BAD.HK')
+    rng = np.random.default_rng(int(symbol[:4]))
+    idx = pd.date_range('2024-01-02 09:30', periods=800, freq='h', tz='Asia/Hong_Kong')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 800)))
+    return pd.DataFrame({'Close': close, 'Volume': rng.integers(1_000, 10_000, 800).astype(float)}, index=idx)
+
+
+def make_args(**overrides):
+    args = argparse.Namespace(
+        period='730d', interval='60m', force_remote=False, incremental=False, resample_from=None, bar_cache=False,
+        feature_cache=False, walk_forward=0, train_window=None, warm_start=False, train_ratio=0.7,
+        model='logistic', feature_spec='logistic_minimal', compact=False, proba_th=0.5, hkex_costs=False, lot_size=100, metrics=None,
+    )
+    vars(args).update(overrides)
+    return args
+
+
+def test_read_universe(tmp_path):
+    from main import read_universe
+
+    path = tmp_path / 'hsi.txt'
+    path.write_text('symbol,name\n0700.HK,Tencent\n# comment\n\n0005.HK  # HSBC\n0700.HK\n0941.HK\n')
+    assert read_universe(str(path)) == ['0700.HK', '0005.HK', '0941.HK']
+
+
+def test_universe_matches_single_symbol_runs_and_isolates_failures(monkeypatch):
+    import main
+    from backtest.vectorbt_engine import run_backtest
+    from models.logistic_model import train_predict
+    from signals.adapter import to_entries_exits
+
+    monkeypatch.setattr(main, 'download_ohlcv', fake_download)
+    args = make_args()
+    symbols = ['0001.HK', 'BAD.HK', '0002.HK']
+    # fork-based pool workers inherit the patched loader
+    table = main.run_universe(symbols, args, max_workers=2)
+
+    assert sorted(table.index) == sorted(symbols)
+    assert table.loc['BAD.HK', 'status'] == 'error' and 'no data' in table.loc['BAD.HK', 'error']
+    for sym in ['0001.HK', '0002.HK']:
+        df = fake_download(sym)
+        test_index, proba = train_predict(df)
+        entries, exits = to_entries_exits(proba, 0.5)
+        _, stats, _ = run_backtest(df['Close'].reindex(test_index), entries, exits, metrics=['total_return'])
+        assert table.loc[sym, 'status'] == 'ok'
+        assert table.loc[sym, 'test_bars'] == len(test_index)
+        np.testing.assert_allclose(table.loc[sym, 'total_return'], stats['total_return'])
+
+    serial = main.run_universe(symbols, args, max_workers=1)
+    pd.testing.assert_frame_equal(
+        serial.drop(columns='elapsed_s').sort_index(), table.drop(columns='elapsed_s').sort_index()
+    )
+
+
+def test_universe_survives_a_crashing_worker(monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, 'download_ohlcv', fake_download)
+    symbols = ['0001.HK', 'DIE.HK', '0002.HK', '0003.HK', 'BAD.HK']
+    table = main.run_universe(symbols, make_args(), max_workers=2)
+
+    assert sorted(table.index) == sorted(symbols)
+    assert table.loc['DIE.HK', 'status'] == 'error' and 'crashed' in table.loc['DIE.HK', 'error']
+    assert table.loc['BAD.HK', 'status'] == 'error' and 'no data' in table.loc['BAD.HK', 'error']
+    assert (table.loc[['0001.HK', '0002.HK', '0003.HK'], 'status'] == 'ok').all()
+
+
+def test_profile_covers_universe_mode(tmp_path, monkeypatch):
+    import json
+    import sys
+
+    import main
+
+    monkeypatch.setattr(main, 'download_ohlcv', fake_download)
+    base = ['main.py', '--symbols', '0001.HK', '0002.HK', '--results', str(tmp_path / 'results.csv')]
+
+    monkeypatch.setattr(sys, 'argv', base + ['--workers', '1', '--profile', str(tmp_path / 'serial.json')])
+    main.main()
+    stages = json.loads((tmp_path / 'serial.json').read_text())['stages']
+    top = [(s['name'], s['rows']) for s in stages if s['depth'] == 0]
+    assert top == [('warm_up', None), ('symbols', 2), ('report', 2)]
+    # serial runs record each symbol's pipeline stages under "symbols"
+    names = [s['name'] for s in stages]
+    assert names[names.index('symbols'):names.index('report')].count('fit') == 2
+
+    # pooled workers drop the inherited profiler and its cProfile hook
+    monkeypatch.setattr(sys, 'argv', base + ['--workers', '2', '--profile', str(tmp_path / 'pool.json'), '--profile-cprofile'])
+    main.main()
+    stages = json.loads((tmp_path / 'pool.json').read_text())['stages']
+    assert [s['name'] for s in stages if s['depth'] == 0] == ['warm_up', 'symbols', 'report']
+    assert pd.read_csv(tmp_path / 'results.csv')['status'].tolist() == ['ok', 'ok']
+
+
+def test_warm_up_compiles_the_configured_spec():
+    import main
+    from models.factors import factor_kernel_nb
+
+    main._warm_worker(False, ['total_return'], 'technical', 'hgb', True)
+    # float32 (compact) bars of the technical spec already have a compiled kernel
+    assert any('float32' in str(sig) for sig in factor_kernel_nb.signatures)
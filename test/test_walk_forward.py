@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+
+def test_fold_bounds_expanding_and_rolling():
+    from models.walk_forward import fold_bounds
+
+    folds = fold_bounds(100, n_folds=3, train_ratio=0.7)
+    assert folds == [(0, 70, 70, 80), (0, 80, 80, 90), (0, 90, 90, 100)]
+    rolling = fold_bounds(100, n_folds=3, train_ratio=0.7, train_window=50)
+    assert [f[0] for f in rolling] == [20, 30, 40]
+    with pytest.raises(ValueError):
+        fold_bounds(10, n_folds=5, train_ratio=0.9)
+
+
+def test_single_fold_matches_train_predict(make_ohlcv):
+    from models.logistic_model import train_predict
+    from models.walk_forward import walk_forward_predict
+
+    df = make_ohlcv(900)
+    idx_a, proba_a = train_predict(df)
+    idx_b, proba_b = walk_forward_predict(df, n_folds=1, max_workers=1)
+    assert idx_a.equals(idx_b)
+    np.testing.assert_allclose(proba_a.to_numpy(), proba_b.to_numpy(), rtol=1e-10)
+
+
+def test_parallel_matches_serial_and_covers_oos_range(make_ohlcv):
+    from models.logistic_model import build_features
+    from models.walk_forward import walk_forward_predict
+
+    df = make_ohlcv(900)
+    idx_s, proba_s = walk_forward_predict(df, n_folds=4, max_workers=1)
+    idx_p, proba_p = walk_forward_predict(df, n_folds=4, max_workers=2)
+    assert idx_s.equals(idx_p)
+    np.testing.assert_array_equal(proba_s.to_numpy(), proba_p.to_numpy())
+
+    data = build_features(df)
+    assert idx_s.equals(data.index[int(len(data) * 0.7):])
+
+
+def test_warm_start_close_to_cold_fits(make_ohlcv):
+    from models.walk_forward import walk_forward_predict
+
+    df = make_ohlcv(900)
+    _, cold = walk_forward_predict(df, n_folds=4, max_workers=1)
+    _, warm = walk_forward_predict(df, n_folds=4, max_workers=2, warm_start=True)
+    np.testing.assert_allclose(cold.to_numpy(), warm.to_numpy(), atol=1e-3)
+
+
+def test_model_and_compact_reach_the_folds(make_ohlcv):
+    from models.logistic_model import train_predict
+    from models.walk_forward import walk_forward_predict
+
+    df = make_ohlcv(900)
+    idx_a, proba_a = train_predict(df, model='hgb')
+    idx_b, proba_b = walk_forward_predict(df, n_folds=1, max_workers=1, model='hgb')
+    assert idx_a.equals(idx_b)
+    np.testing.assert_allclose(proba_a.to_numpy(), proba_b.to_numpy(), rtol=1e-10)
+
+    _, full = walk_forward_predict(df, n_folds=2, max_workers=2)
+    _, compact = walk_forward_predict(df, n_folds=2, max_workers=2, compact=True)
+    np.testing.assert_allclose(compact.to_numpy(), full.to_numpy(), atol=1e-3)
+    with pytest.raises(ValueError, match='warm_start'):
+        walk_forward_predict(df, n_folds=2, model='hgb', warm_start=True)